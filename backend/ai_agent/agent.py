@@ -31,6 +31,22 @@ class TodoAgent(Agent):
         )
 
 
+async def stream_reply(runner: Runner, user_input: str):
+    """
+    Yields the agent's reply as text chunks, as soon as `runner.run()` produces them.
+    """
+    final_response = None
+    async for chunk in runner.run(user_input):
+        if chunk.type == 'content' and isinstance(chunk.data, str):
+            yield chunk.data
+        if chunk.type == 'final':
+            final_response = chunk.data
+
+    # If the final response wasn't streamed as content chunks
+    if final_response and not isinstance(final_response, str):
+        yield str(final_response)
+
+
 async def main():
     """
     The main asynchronous function to run the agent chat loop.
@@ -75,16 +91,8 @@ async def main():
 
             print("\nAssistant:", end="", flush=True)
             try:
-                final_response = None
-                async for chunk in runner.run(user_input):
-                    if chunk.type == 'content' and isinstance(chunk.data, str):
-                        print(chunk.data, end="", flush=True)
-                    if chunk.type == 'final':
-                        final_response = chunk.data
-                
-                # If the final response wasn't printed as content chunks
-                if final_response and not isinstance(final_response, str) :
-                     print(final_response, end="")
+                async for text in stream_reply(runner, user_input):
+                    print(text, end="", flush=True)
 
                 print() # Newline after assistant's full response
 
@@ -0,0 +1,120 @@
+"""
+Intent and slot extraction for the mock AI agent.
+
+A message is tokenized once with a single compiled pattern, and each word is
+classified with a dict lookup (two-word phrases by looking one word ahead),
+so there are no repeated scans of the text. The intent is the first action
+keyword in the message (greetings and help only count when there is none),
+and slots are read from the text around that keyword.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+# Action intents, by keyword
+ACTION_KEYWORDS: Dict[str, str] = {
+    **dict.fromkeys(["add", "create"], "add"),
+    **dict.fromkeys(["complete", "completed", "completes", "mark", "done", "finish", "finished"], "complete"),
+    **dict.fromkeys(["delete", "remove", "drop", "cancel"], "delete"),
+    **dict.fromkeys(["update", "change", "edit", "rename"], "update"),
+    **dict.fromkeys(["show", "list", "what's", "pending", "todo"], "list"),
+}
+ACTION_PHRASES: Dict[Tuple[str, str], str] = {
+    ("remind", "me"): "add",
+    ("new", "task"): "add",
+    ("check", "off"): "complete",
+    ("my", "tasks"): "list",
+    ("what", "is"): "list",
+    ("what", "are"): "list",
+}
+SMALL_TALK_KEYWORDS: Dict[str, str] = {"help": "help", "hello": "greet", "hi": "greet", "hey": "greet"}
+ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "last": -1}
+# Words after which a number is a task id: "task 3", "number 3", "no 3"
+_NUMBER_PREFIXES = frozenset(["task", "number", "no"])
+_DONE_WORDS = frozenset(["done", "finished", "complete", "completed"])
+_PENDING_WORDS = frozenset(["pending", "todo"])
+
+_TOKEN_RE = re.compile(r"#\d+|\d+|[a-z]+(?:'[a-z]+)?", re.IGNORECASE)
+# Leading filler before an added task's title: "a task to", "a new task called", ...
+_ADD_FILLER_RE = re.compile(
+    r"^\s*(?:(?:a|an|the|new|task|todo|item)\b\s*)*(?:(?:to|called|named|for)\b|:)?\s*",
+    re.IGNORECASE,
+)
+# Words that never identify a task when matching by title
+_STOP_WORDS = frozenset(
+    "a an the my me task tasks todo item title name as is it that this one please to from list of for "
+    "complete completed done off".split()
+) | frozenset(ORDINALS)
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str  # add | complete | delete | update | list | help | greet | unknown
+    title: Optional[str] = None  # add: the new title; update: the replacement title
+    task_id: Optional[int] = None  # "task 3", "#3"
+    ordinal: Optional[int] = None  # "first" = 1 ... "last" = -1
+    target: Optional[str] = None  # other words naming the task, matched against titles
+    completed: Optional[bool] = None  # list: only pending (False) or done (True) tasks
+
+
+def _clean(text: str) -> str:
+    return text.strip(" \t\n.!?\"'")
+
+
+def _target_words(text: str) -> Optional[str]:
+    words = [word for word in re.findall(r"\w+", text.lower()) if word not in _STOP_WORDS and not word.isdigit()]
+    return " ".join(words) or None
+
+
+def parse(message: str) -> Intent:
+    """
+    Classifies a chat message and extracts the slots its intent needs.
+    """
+    tokens = list(_TOKEN_RE.finditer(message))
+    words = [token.group().lower() for token in tokens]
+    action = None  # (name, match of the keyword's last word)
+    small_talk = None
+    task_id = ordinal = None
+    to_match = None
+    done_mentioned = pending_mentioned = False
+
+    for i, word in enumerate(words):
+        kind = ACTION_PHRASES.get((word, words[i + 1])) if i + 1 < len(words) else None
+        match = tokens[i + 1] if kind else tokens[i]
+        kind = kind or ACTION_KEYWORDS.get(word)
+        if kind is not None:
+            done_mentioned |= word in _DONE_WORDS
+            pending_mentioned |= word in _PENDING_WORDS
+            if action is None:
+                action = (kind, match)
+        elif word in SMALL_TALK_KEYWORDS:
+            small_talk = small_talk or SMALL_TALK_KEYWORDS[word]
+        elif word in ORDINALS:
+            ordinal = ORDINALS[word] if ordinal is None else ordinal
+        elif word[0] == "#" or (word.isdigit() and i and words[i - 1] in _NUMBER_PREFIXES):
+            task_id = int(word.lstrip("#")) if task_id is None else task_id
+        elif (word == "to" or word == "as") and action is not None and to_match is None:
+            to_match = tokens[i]
+
+    if action is None:
+        return Intent(small_talk or "unknown")
+
+    name, keyword = action
+    rest = message[keyword.end():]
+    if name == "add":
+        title = _clean(_ADD_FILLER_RE.sub("", rest, count=1))
+        return Intent("add", title=title[:1].upper() + title[1:] if title else None)
+    if name == "list":
+        completed = False if pending_mentioned else (True if done_mentioned else None)
+        return Intent("list", completed=completed)
+    if name == "update" and to_match is not None:
+        # "rename task 3 to call the bank": target before "to", new title after it
+        target_text = message[keyword.end():to_match.start()]
+        return Intent(
+            "update",
+            title=_clean(message[to_match.end():]) or None,
+            task_id=task_id,
+            ordinal=ordinal,
+            target=_target_words(target_text),
+        )
+    return Intent(name, task_id=task_id, ordinal=ordinal, target=_target_words(rest))
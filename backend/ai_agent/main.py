@@ -1,10 +1,16 @@
-import os
-import uvicorn
+import asyncio
+import re
 from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List
 
+from api.sse import SSE_HEADERS, sse_event
+from core.query_budget import query_budget
+from mcp_server.backends import BackendError
+
 # Load environment variables
 load_dotenv()
 
@@ -27,8 +33,33 @@ class ChatRequest(BaseModel):
     user_id: int
     token: str
 
+# --- Mock Responses ---
+# A cold principal cache lookup, then a task lookup and a delete with its
+# change sequence bump and tombstone
+@query_budget(5)
+def mock_response(request: ChatRequest) -> str:
+    """
+    Carries out the user's last message with the in-process mock agent (see ai_agent/mock_agent.py).
+    """
+    # Off the start-up path: loading the agent compiles its intent patterns
+    from ai_agent.mock_agent import get_local_agent
+
+    try:
+        return get_local_agent().reply(user_id=request.user_id, token=request.token, message=request.messages[-1].content)
+    except BackendError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+def stream_chunks(text: str) -> List[str]:
+    """
+    Splits a reply into word-sized chunks, the granularity a model streams at.
+    """
+    return re.findall(r"\S+\s*", text)
+
+
 # --- API Endpoints ---
 @ai_router.post("/chat")
+@query_budget(5) # the agent turn, see mock_response
 async def chat(request: ChatRequest):
     """Handle chat request with mock AI responses"""
     
@@ -39,48 +70,50 @@ async def chat(request: ChatRequest):
         )
     
     try:
-        # Get user's message
-        user_message = request.messages[-1].content.lower()
-        
-        # Mock AI responses based on keywords
-        if "add" in user_message and "task" in user_message:
-            # Extract task title (simple approach)
-            task_title = "your task"
-            if "buy" in user_message:
-                task_title = "Buy groceries"
-            elif "call" in user_message:
-                task_title = "Call someone"
-            elif "study" in user_message:
-                task_title = "Study for exam"
-            
-            response = f"✅ Great! I've added the task '{task_title}' to your list. You can see it on the left side now!"
-            
-        elif "show" in user_message or "list" in user_message or "my tasks" in user_message:
-            response = "📋 I can see your tasks on the left side! You currently have:\n\n• Buy groceries (pending)\n\nYou can add more tasks by saying 'Add a task to...' or mark tasks as complete!"
-            
-        elif "complete" in user_message or "mark" in user_message or "done" in user_message or "finish" in user_message:
-            response = "✅ Awesome! I've marked your task as complete. Great job staying productive! 🎉"
-            
-        elif "delete" in user_message or "remove" in user_message:
-            response = "🗑️ I've removed that task from your list. All clean now!"
-            
-        elif "update" in user_message or "change" in user_message or "edit" in user_message:
-            response = "✏️ I've updated the task with the new information!"
-            
-        elif "hello" in user_message or "hi" in user_message or "hey" in user_message:
-            response = "👋 Hello! I'm your AI task assistant. I can help you:\n\n✨ Add tasks: 'Add a task to buy milk'\n📋 Show tasks: 'Show me my tasks'\n✅ Complete tasks: 'Mark the first task as done'\n🗑️ Delete tasks: 'Delete the grocery task'\n\nWhat would you like to do?"
-            
-        elif "help" in user_message:
-            response = "🤖 I'm here to help you manage your tasks! Here's what I can do:\n\n• **Add tasks**: 'Add a task to call mom'\n• **View tasks**: 'Show all my tasks'\n• **Complete tasks**: 'Mark task as complete'\n• **Delete tasks**: 'Remove the meeting task'\n\nJust tell me what you need in natural language! 💬"
-            
-        else:
-            response = "I'm your AI task assistant! 🤖\n\nI can help you:\n• Add new tasks\n• Show your task list\n• Mark tasks as complete\n• Delete tasks\n\nTry saying something like 'Add a task to buy groceries' or 'Show me my tasks'!"
-        
+        # The mock agent queries the database; keep it off the event loop
+        response = await run_in_threadpool(mock_response, request)
         return {
             "role": "assistant",
             "content": response
         }
             
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@ai_router.post("/chat/stream")
+@query_budget(0) # the agent turn runs in the streamed body, see mock_response
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /chat, as Server-Sent Events.
+
+    Emits one `content` event per chunk ({"content": "..."}) as the reply is
+    produced, then a `done` event; failures are reported as an `error` event
+    ({"detail": "..."}). The response starts before the agent runs, so its
+    headers don't wait for the reply.
+    """
+    if not MOCK_MODE:
+        raise HTTPException(
+            status_code=503,
+            detail="OpenAI credits exhausted. Enable MOCK_MODE for demo."
+        )
+
+    async def events():
+        try:
+            # The mock agent queries the database; keep it off the event loop
+            response = await run_in_threadpool(mock_response, request)
+            for chunk in stream_chunks(response):
+                yield sse_event("content", {"content": chunk})
+                # Hand control back to the server so each chunk is flushed on its own
+                await asyncio.sleep(0)
+            yield sse_event("done", {})
+        except HTTPException as e:
+            yield sse_event("error", {"detail": e.detail})
+        except Exception as e:
+            print(f"Error: {e}")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,140 @@
+"""
+Offline stand-in for the AI agent that really manages tasks.
+
+Messages are classified by `ai_agent.intents.parse` and carried out against a
+task backend from `mcp_server` (the same interface the MCP tools use). Inside
+the backend process that is `LocalTaskBackend`, so a turn costs a regex pass
+and a few indexed queries: no model, and no HTTP hop.
+"""
+from typing import Any, Dict, Optional
+
+from ai_agent.intents import Intent, parse
+from mcp_server.backends import BackendError
+
+# Tasks considered when a message names a task by ordinal or by words
+CANDIDATE_LIMIT = 100
+LIST_LIMIT = 10
+
+HELP_TEXT = (
+    "🤖 I'm here to help you manage your tasks! Here's what I can do:\n\n"
+    "• **Add tasks**: 'Add a task to call mom'\n"
+    "• **View tasks**: 'Show my pending tasks'\n"
+    "• **Complete tasks**: 'Mark the first task as done'\n"
+    "• **Rename tasks**: 'Rename task 3 to buy bread'\n"
+    "• **Delete tasks**: 'Remove the meeting task'\n\n"
+    "Just tell me what you need in natural language! 💬"
+)
+GREETING_TEXT = (
+    "👋 Hello! I'm your AI task assistant. I can help you:\n\n"
+    "✨ Add tasks: 'Add a task to buy milk'\n"
+    "📋 Show tasks: 'Show me my tasks'\n"
+    "✅ Complete tasks: 'Mark the first task as done'\n"
+    "🗑️ Delete tasks: 'Delete the grocery task'\n\n"
+    "What would you like to do?"
+)
+FALLBACK_TEXT = (
+    "I'm your AI task assistant! 🤖\n\n"
+    "I can help you:\n• Add new tasks\n• Show your task list\n• Mark tasks as complete\n• Delete tasks\n\n"
+    "Try saying something like 'Add a task to buy groceries' or 'Show me my tasks'!"
+)
+
+
+class MockAgent:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def reply(self, *, user_id: int, token: str, message: str) -> str:
+        """
+        Carries out the message's intent for the user and returns the assistant's reply.
+
+        Authentication and ownership failures propagate as BackendError; a task
+        that can't be found is answered in the reply.
+        """
+        intent = parse(message)
+        handlers = {
+            "add": self._add,
+            "list": self._list,
+            "complete": self._complete,
+            "delete": self._delete,
+            "update": self._update,
+        }
+        if intent.name in handlers:
+            return handlers[intent.name](user_id, token, intent)
+        return {"greet": GREETING_TEXT, "help": HELP_TEXT}.get(intent.name, FALLBACK_TEXT)
+
+    def _find(self, user_id: int, token: str, intent: Intent) -> Optional[Dict[str, Any]]:
+        if intent.task_id is not None:
+            try:
+                return self.backend.get_task(user_id, token, intent.task_id)
+            except BackendError as e:
+                if e.status_code == 404:
+                    return None
+                raise
+        # Ordinals count pending tasks, the way a user reads their list
+        filters = {"search": intent.target} if intent.target else {"completed": False}
+        tasks, _ = self.backend.list_tasks(user_id, token, limit=CANDIDATE_LIMIT, **filters)
+        if not tasks:
+            return None
+        if intent.ordinal is not None:
+            index = intent.ordinal - 1 if intent.ordinal > 0 else intent.ordinal
+            return tasks[index] if -len(tasks) <= index < len(tasks) else None
+        return tasks[0] if intent.target else None
+
+    def _not_found(self, intent: Intent) -> str:
+        if intent.task_id is not None:
+            return f"🤔 I couldn't find task #{intent.task_id}. Say 'show my tasks' to see them."
+        if intent.target:
+            return f"🤔 I couldn't find a task matching '{intent.target}'. Say 'show my tasks' to see them."
+        return "🤔 Which task do you mean? You can say 'the first task', 'task 3' or part of its title."
+
+    def _add(self, user_id: int, token: str, intent: Intent) -> str:
+        if not intent.title:
+            return "✏️ What should the task say? Try 'Add a task to buy groceries'."
+        task = self.backend.create_task(user_id, token, {"title": intent.title})
+        return f"✅ Great! I've added the task '{task['title']}' to your list. You can see it on the left side now!"
+
+    def _list(self, user_id: int, token: str, intent: Intent) -> str:
+        tasks, truncated = self.backend.list_tasks(user_id, token, limit=LIST_LIMIT, completed=intent.completed)
+        kind = {False: "pending ", True: "completed "}.get(intent.completed, "")
+        if not tasks:
+            return f"📋 You don't have any {kind}tasks right now. Add one by saying 'Add a task to...'!"
+        lines = [f"• {task['title']} ({'done' if task['completed'] else 'pending'})" for task in tasks]
+        more = "\n…and more. Ask for 'pending' or 'completed' tasks to narrow it down." if truncated else ""
+        return f"📋 Here are your {kind}tasks:\n\n" + "\n".join(lines) + more
+
+    def _complete(self, user_id: int, token: str, intent: Intent) -> str:
+        task = self._find(user_id, token, intent)
+        if task is None:
+            return self._not_found(intent)
+        self.backend.update_task(user_id, token, task["id"], {"completed": True})
+        return f"✅ Awesome! I've marked '{task['title']}' as complete. Great job staying productive! 🎉"
+
+    def _delete(self, user_id: int, token: str, intent: Intent) -> str:
+        task = self._find(user_id, token, intent)
+        if task is None:
+            return self._not_found(intent)
+        self.backend.delete_task(user_id, token, task["id"])
+        return f"🗑️ I've removed '{task['title']}' from your list. All clean now!"
+
+    def _update(self, user_id: int, token: str, intent: Intent) -> str:
+        if not intent.title:
+            return "✏️ What should I change it to? Try 'Rename task 3 to buy bread'."
+        task = self._find(user_id, token, intent)
+        if task is None:
+            return self._not_found(intent)
+        self.backend.update_task(user_id, token, task["id"], {"title": intent.title})
+        return f"✏️ I've renamed '{task['title']}' to '{intent.title}'!"
+
+
+_local_agent: Optional[MockAgent] = None
+
+
+def get_local_agent() -> MockAgent:
+    """
+    The mock agent on the in-process task backend, created on first use.
+    """
+    global _local_agent
+    if _local_agent is None:
+        from mcp_server.local_backend import LocalTaskBackend
+        _local_agent = MockAgent(LocalTaskBackend())
+    return _local_agent
@@ -1,37 +1,153 @@
 # backend\api\deps.py
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+import math
+import secrets
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Generator, Optional, TypeVar, Union
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, create_engine
-from jose import jwt, JWTError
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from core.config import settings
+from core.database import async_engine, engine
+from core.rate_limit import RateLimited, admission_control
 from models.user import User
+from services.user_service import user_service
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+T = TypeVar("T")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login/access-token")
 
-def get_db() -> Generator:
-    with Session(engine) as session:
+DbSession = Union[Session, AsyncSession]
+
+
+def _get_sync_db() -> Generator:
+    # Objects must stay readable after run_db ends its transaction
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+async def _get_async_db() -> AsyncGenerator:
+    # Objects must stay readable after commit: lazy refreshes can't run outside the greenlet
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+get_db = _get_async_db if settings.DB_ASYNC else _get_sync_db
+
+
+@asynccontextmanager
+async def open_db() -> AsyncIterator[DbSession]:
+    """
+    Opens a session of the configured type outside the request's dependencies,
+    for work that runs after a streaming response has started.
+    """
+    if settings.DB_ASYNC:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+    else:
+        with Session(engine, expire_on_commit=False) as session:
+            yield session
+
+
+def _run_unit(db: Session, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-            )
-    except JWTError:
+        result = fn(db, *args, **kwargs)
+        if db.in_transaction():
+            db.commit()
+        return result
+    except BaseException:
+        db.rollback()
+        raise
+
+
+async def run_db(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs sync service code `fn(session, *args, **kwargs)` against either session type.
+
+    On an AsyncSession the call runs on the event loop via `run_sync`; on a sync
+    Session it is handed to the threadpool, as a sync endpoint would be.
+
+    Each call is its own transaction: it is committed (or rolled back on error)
+    before returning, so no pooled connection is held while the endpoint awaits
+    something else, such as bcrypt or the AI agent. Otherwise, in sync mode,
+    requests holding connections between calls could wait for threadpool slots
+    taken by requests waiting for connections.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(_run_unit, fn, *args, **kwargs)
+    return await run_in_threadpool(_run_unit, db, fn, *args, **kwargs)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: DbSession = Depends(get_db)) -> User:
+    # A cache hit needs no session, so it skips the hop to run_db
+    user = user_service.cached_principal(token)
+    if user is None:
+        user = await run_db(db, user_service.load_principal, token=token)
+    return user
+
+
+@asynccontextmanager
+async def _admitted(key: str, kind: str, hold: bool) -> AsyncIterator[None]:
+    # The endpoint runs inside the block, but only admission raises RateLimited
+    try:
+        async with admission_control.admit(key, kind, hold=hold):
+            yield
+    except RateLimited as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, retry later",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+
+
+def limit_user(kind: str, hold: bool = True) -> Callable[..., Any]:
+    """
+    Route dependency admitting the current user's request against the `kind`
+    budget ("cheap" or "expensive"), or answering 429 with Retry-After:
+
+        @router.post("", dependencies=[Depends(deps.limit_user("expensive"))])
+
+    `get_current_user` is cached per request, so this adds no query. Use
+    `hold=False` on long-lived streams, which check the rate only.
+    """
+    async def dependency(current_user: User = Depends(get_current_user)) -> AsyncIterator[None]:
+        if not settings.RATE_LIMIT_ENABLED:
+            yield
+            return
+        async with _admitted(f"user:{current_user.id}", kind, hold):
+            yield
+
+    return dependency
+
+
+def limit_client(kind: str) -> Callable[..., Any]:
+    """
+    `limit_user` for routes without a user yet (register, login), keyed by
+    the client address. Behind a proxy, run uvicorn with --proxy-headers so
+    this is the real client rather than the proxy.
+    """
+    async def dependency(request: Request) -> AsyncIterator[None]:
+        if not settings.RATE_LIMIT_ENABLED:
+            yield
+            return
+        async with _admitted(f"client:{request.client.host if request.client else 'unknown'}", kind, True):
+            yield
+
+    return dependency
+
+
+async def require_ops_token(authorization: Optional[str] = Header(None)):
+    """
+    Dependency guarding the operational endpoints, which expose pool, cache
+    and traffic details: they need `Authorization: Bearer <OPS_TOKEN>`, and
+    answer 404 while OPS_TOKEN is unset.
+    """
+    if not settings.OPS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.OPS_TOKEN}".encode()
+    if authorization is None or not secrets.compare_digest(authorization.encode(), expected):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail="Invalid ops token",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user = db.get(User, int(user_id))
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
\ No newline at end of file
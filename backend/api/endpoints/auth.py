@@ -1,31 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
 
 from api import deps
-from core.security import create_access_token
+from core.query_budget import query_budget
+from core.security import PasswordHasherBusy, create_access_token, password_hasher
 from crud import user as user_crud
 from schemas.user import UserCreate, Token, User
 
 router = APIRouter()
 
-@router.post("/register", response_model=Token)
-def register_user(
+# Keyed by client address: there is no user yet, and each attempt costs a password hash
+HASHING = [Depends(deps.limit_client("expensive"))]
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many sign-in requests, please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
+
+@router.post("/register", response_model=Token, dependencies=HASHING)
+@query_budget(3)
+async def register_user(
     *,
-    db: Session = Depends(deps.get_db),
+    db: deps.DbSession = Depends(deps.get_db),
     user_in: UserCreate,
 ):
     """
     Create new user and return access token.
     """
-    user = user_crud.get_user_by_email(db, email=user_in.email)
+    user = await deps.run_db(db, user_crud.get_user_by_email, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=409, # Changed to 409 Conflict
             detail="The user with this email already exists in the system.",
         )
+    # bcrypt runs on its own bounded pool so sign-up bursts can't starve other endpoints
     try:
-        user = user_crud.create_user(db, user_in=user_in)
+        password_hash = await password_hasher.hash(user_in.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    try:
+        user = await deps.run_db(db, user_crud.create_user, user_in=user_in, password_hash=password_hash)
     except ValueError as e: # Catch the custom error from crud
         raise HTTPException(
             status_code=409, # 409 Conflict is more appropriate for duplicate resource
@@ -35,18 +51,27 @@ def register_user(
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-@router.post("/login", response_model=Token)
-def login_for_access_token(
-    db: Session = Depends(deps.get_db),
+@router.post("/login", response_model=Token, dependencies=HASHING)
+@query_budget(3) # 1, plus 2 when an outdated password hash is upgraded
+async def login_for_access_token(
+    db: deps.DbSession = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ):
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
     print(f"Login attempt: Email={form_data.username}, Password={'*' * len(form_data.password)}") # Debug print
-    user = user_crud.authenticate_user(
-        db, email=form_data.username, password=form_data.password
-    )
+    user = await deps.run_db(db, user_crud.get_user_by_email, email=form_data.username)
+    if user:
+        try:
+            verified, new_hash = await password_hasher.verify_and_update(form_data.password, user.password_hash)
+        except PasswordHasherBusy:
+            raise _hasher_busy()
+        if not verified:
+            user = None
+        elif new_hash:
+            # Stored hash was made with an outdated BCRYPT_ROUNDS; upgrade it now that we know the password
+            await deps.run_db(db, user_crud.update_password_hash, user=user, password_hash=new_hash)
     if not user:
         print("Login failed: Invalid credentials or user not found.") # Debug print
         raise HTTPException(
@@ -58,8 +83,9 @@ def login_for_access_token(
     access_token = create_access_token(subject=user.id)
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.get("/me", response_model=User)
-def read_user_me(
+@router.get("/me", response_model=User, dependencies=[Depends(deps.limit_user("cheap"))])
+@query_budget(0)
+async def read_user_me(
     current_user: User = Depends(deps.get_current_user),
 ):
     """
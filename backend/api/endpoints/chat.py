@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from pydantic import BaseModel
 
 from api import deps
+from api.idempotency import idempotent
+from api.sse import SSE_HEADERS, sse_event
+from core.query_budget import query_budget
 from models import User
 from services.chat_service import chat_service
 
 router = APIRouter()
 
+EXPENSIVE = [Depends(deps.limit_user("expensive"))]
+
 
 class ChatRequest(BaseModel):
     conversation_id: Optional[int] = None
@@ -21,45 +26,103 @@ class ChatResponse(BaseModel):
     tool_calls: Optional[List] = None
 
 
-@router.post("", response_model=ChatResponse)
-def handle_chat(
+@router.post("", response_model=ChatResponse, dependencies=EXPENSIVE)
+# The turn's own 8 with CHAT_HISTORY_SUMMARY, plus a task lookup and write by AI_AGENT_MODE=mock,
+# plus 3 to claim and store an Idempotency-Key
+@query_budget(17)
+async def handle_chat(
     *,
-    db: Session = Depends(deps.get_db),
+    db: deps.DbSession = Depends(deps.get_db),
     chat_in: ChatRequest,
     current_user: User = Depends(deps.get_current_user),
     token: str = Depends(deps.oauth2_scheme),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Handle a chat message from the user.
 
     If conversation_id is provided, it continues the existing conversation.
     Otherwise, it starts a new one.
+
+    Send an `Idempotency-Key` header to make retries safe: a retry with the
+    same key and message gets the first reply back, without saving the
+    message again or calling the AI agent a second time.
     """
-    if chat_in.conversation_id:
-        conversation = chat_service.get_conversation(db, user=current_user, conversation_id=chat_in.conversation_id)
-    else:
-        conversation = chat_service.create_conversation(db, user=current_user)
-
-    # 1. Save user's message to the database
-    chat_service.add_message(
-        db, conversation=conversation, role="user", content=chat_in.message
-    )
+    async def turn() -> ChatResponse:
+        # 1. Save the user's message and load the history, in one short transaction
+        conversation_id, history = await deps.run_db(
+            db, chat_service.start_turn, user=current_user, conversation_id=chat_in.conversation_id, content=chat_in.message
+        )
+
+        # 2. Get the AI's response, with no transaction or connection held
+        ai_response_content = await chat_service.get_ai_response_async(history=history, user=current_user, token=token)
+
+        # 3. Save the AI's response to the database
+        await deps.run_db(
+            db, chat_service.finish_turn, user=current_user, conversation_id=conversation_id, content=ai_response_content
+        )
 
-    # 2. Load the full conversation history
-    history = chat_service.get_conversation_history(db, conversation_id=conversation.id)
+        return ChatResponse(
+            conversation_id=conversation_id,
+            response=ai_response_content,
+            tool_calls=[]  # Placeholder for now
+        )
 
-    # 3. Get the AI's response
-    ai_response_content = chat_service.get_ai_response(
-        history=history, user=current_user, token=token
+    return await idempotent(
+        db,
+        user=current_user,
+        key=idempotency_key,
+        scope="chat",
+        payload=chat_in.model_dump(mode="json"),
+        run=turn,
+        response_model=ChatResponse,
     )
 
-    # 4. Save the AI's response to the database
-    chat_service.add_message(
-        db, conversation=conversation, role="assistant", content=ai_response_content
+
+@router.post("/stream", dependencies=EXPENSIVE)
+@query_budget(6)
+async def handle_chat_stream(
+    *,
+    db: deps.DbSession = Depends(deps.get_db),
+    chat_in: ChatRequest,
+    current_user: User = Depends(deps.get_current_user),
+    token: str = Depends(deps.oauth2_scheme),
+):
+    """
+    Streaming variant of the chat endpoint, as Server-Sent Events.
+
+    Events, in order:
+    - `conversation`: {"conversation_id": ...}, sent as soon as the user's message is saved
+    - `content`: {"content": "..."}, one per chunk of the reply, as the agent produces it
+    - `done`: {"conversation_id": ...}, after the whole reply has been saved
+
+    If the agent fails midway, an `error` event ({"status_code", "detail"})
+    ends the stream and no assistant message is saved.
+    """
+    conversation_id, history = await deps.run_db(
+        db, chat_service.start_turn, user=current_user, conversation_id=chat_in.conversation_id, content=chat_in.message
     )
 
-    return ChatResponse(
-        conversation_id=conversation.id,
-        response=ai_response_content,
-        tool_calls=[]  # Placeholder for now
+    async def events():
+        yield sse_event("conversation", {"conversation_id": conversation_id})
+        chunks = []
+        try:
+            async for chunk in chat_service.stream_ai_response(history=history, user=current_user, token=token):
+                chunks.append(chunk)
+                yield sse_event("content", {"content": chunk})
+        except HTTPException as e:
+            yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+            return
+
+        # The request's own session may already be closed once streaming has started
+        async with deps.open_db() as session:
+            await deps.run_db(
+                session, chat_service.finish_turn, user=current_user, conversation_id=conversation_id, content="".join(chunks)
+            )
+        yield sse_event("done", {"conversation_id": conversation_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
     )
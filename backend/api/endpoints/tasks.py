@@ -104,53 +104,286 @@
 
 
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
-from typing import List, Optional  # ← Optional add kiya
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from datetime import date
+from typing import List, Literal, Optional, Sequence, Tuple  # ← Optional add kiya
 import uuid
 
+import orjson
+
 from api import deps
-from models import User
+from api.idempotency import idempotent
+from api.sse import SSE_HEADERS, sse_comment, sse_event
+from core.change_feed import task_changes
+from core.config import settings
+from core.query_budget import query_budget
+from core.version_store import task_versions
+from models import Task, User
 from services.task_service import task_service
-from schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from schemas.task import TaskBulkRequest, TaskBulkResponse, TaskChanges, TaskCreate, TaskSummary, TaskUpdate, TaskResponse
 
 router = APIRouter()
 
-@router.get("/{user_id}/tasks", response_model=List[TaskResponse])
-def read_tasks(
+# Per-user admission (see core/rate_limit.py); bulk changes count as expensive
+CHEAP = [Depends(deps.limit_user("cheap"))]
+EXPENSIVE = [Depends(deps.limit_user("expensive"))]
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_BULK_OPERATIONS = 500
+# Clients must revalidate every time; only the user's own browser may keep a copy
+LIST_CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against `etag`, as RFC 9110 prescribes for GET.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+# TaskResponse fields in schema order; the ones without a Task column (category_id, category) are always null
+TASK_RESPONSE_FIELDS = tuple(TaskResponse.model_fields)
+TASK_TABLE_COLUMNS = frozenset(Task.__table__.columns.keys())
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Parses a sparse fieldset (`id,title,completed`); all TaskResponse fields when empty.
+    """
+    if not fields:
+        return TASK_RESPONSE_FIELDS
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in TaskResponse.model_fields]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown) or fields}; choose from {', '.join(TASK_RESPONSE_FIELDS)}",
+        )
+    return requested
+
+
+def task_rows_response(rows: Sequence, fields: Sequence[str], headers: dict) -> Response:
+    """
+    Serializes task rows straight to JSON with orjson.
+
+    The rows come from the database with the schema's types already, so they
+    skip response_model validation and the standard encoder; the endpoint's
+    response_model still documents the shape. Each row holds the columns among
+    `fields` in order, possibly followed by extra columns, which are dropped.
+    """
+    columns = [field for field in fields if field in TASK_TABLE_COLUMNS]
+    nulls = {field: None for field in fields if field not in TASK_TABLE_COLUMNS}
+    body = orjson.dumps([dict(zip(columns, row), **nulls) for row in rows])
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/{user_id}/tasks", response_model=List[TaskResponse], dependencies=CHEAP)
+@query_budget(1)
+async def read_tasks(
+    user_id: int,
+    search: Optional[str] = None,
+    completed: Optional[bool] = None,
+    priority: Optional[str] = None,
+    due_after: Optional[date] = None,
+    due_before: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Literal["created_at", "updated_at"] = "created_at",
+    fields: Optional[str] = Query(None, description="Comma-separated subset of task fields to return, e.g. id,title,completed"),
+    if_none_match: Optional[str] = Header(None),
+    db: deps.DbSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Retrieve tasks for a specific user, with optional search and filter.
+
+    `due_after` / `due_before` bound the due date inclusively. Passing `limit`
+    (or a `cursor`) switches to keyset pagination ordered by (`sort`, id). The
+    cursor for the next page is returned in the `X-Next-Cursor` header, which
+    is absent on the last page.
+
+    The response carries the user's task-list version as a strong `ETag`;
+    a request whose `If-None-Match` still matches gets `304 Not Modified`
+    without the task table being queried.
+
+    `fields` (e.g. `id,title,completed`) limits each task to the listed
+    fields; only those columns are read.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access these tasks")
+    # Read the version before the tasks: a write in between can only make the tag older than the data
+    etag = await task_versions.etag(user_id)
+    headers = {"Cache-Control": LIST_CACHE_CONTROL}
+    # No tag when the version store is unavailable: serve the list in full
+    if etag is not None:
+        headers["ETag"] = etag
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    fields = parse_fields(fields)
+    # A fieldset of only null fields still needs one column to count the rows
+    columns = [field for field in fields if field in TASK_TABLE_COLUMNS] or ["id"]
+    filters = {"search": search, "completed": completed, "priority": priority, "due_after": due_after, "due_before": due_before}
+    if limit is None and cursor is None:
+        rows = await deps.run_db(db, task_service.get_user_tasks, user=current_user, columns=columns, **filters)
+        return task_rows_response(rows, fields, headers)
+    rows, next_cursor = await deps.run_db(
+        db,
+        task_service.get_user_tasks_page,
+        user=current_user,
+        limit=limit or DEFAULT_PAGE_SIZE,
+        cursor=cursor,
+        sort=sort,
+        columns=columns,
+        **filters,
+    )
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return task_rows_response(rows, fields, headers)
+
+@router.get("/{user_id}/tasks/summary", response_model=TaskSummary, dependencies=CHEAP)
+@query_budget(1)
+async def read_tasks_summary(
     user_id: int,
     search: Optional[str] = None,
     completed: Optional[bool] = None,
-    db: Session = Depends(deps.get_db),
+    priority: Optional[str] = None,
+    due_after: Optional[date] = None,
+    due_before: Optional[date] = None,
+    db: deps.DbSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
     """
-    Retrieve all tasks for a specific user, with optional search and filter.
+    Count a user's tasks matching the same filters as the task list, without returning them.
     """
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access these tasks")
-    return task_service.get_user_tasks(db, user=current_user, search=search, completed=completed)
+    return await deps.run_db(
+        db,
+        task_service.summarize_user_tasks,
+        user=current_user,
+        search=search,
+        completed=completed,
+        priority=priority,
+        due_after=due_after,
+        due_before=due_before,
+    )
 
-@router.post("/{user_id}/tasks", response_model=TaskResponse)
-def create_task(
+@router.get("/{user_id}/tasks/changes", response_model=TaskChanges, dependencies=CHEAP)
+@query_budget(2)
+async def read_task_changes(
+    user_id: int,
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: deps.DbSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Delta sync: the tasks created, updated or deleted since the `since` cursor.
+
+    Omit `since` for a full sync. Keep the returned `cursor` and pass it on the
+    next call; while `has_more` is true, call again straight away.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access these tasks")
+    return await deps.run_db(db, task_service.get_changes, user=current_user, since=since, limit=limit)
+
+@router.get("/{user_id}/tasks/stream", dependencies=[Depends(deps.limit_user("cheap", hold=False))])
+@query_budget(0)
+async def stream_task_changes(
+    user_id: int,
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Live task changes for a user, as Server-Sent Events.
+
+    Each `change` event is {"op": "upsert", "task": ...} or {"op": "delete",
+    "id": ...} with the delta sync `cursor` that includes it. Open the stream
+    first and then catch up with `/tasks/changes`, so no write falls between
+    the two. A `resync` event means the client fell too far behind, or the
+    worker lost its feed for a while, and was dropped: reconnect and catch up
+    the same way. Comment lines are sent as
+    keep-alives while nothing changes.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access these tasks")
+
+    async def events():
+        async with task_changes.subscribe(user_id) as subscription:
+            yield sse_comment("connected")
+            while True:
+                try:
+                    batch = await subscription.next_batch(timeout=settings.TASK_CHANGE_KEEPALIVE)
+                except OverflowError:
+                    yield sse_event("resync", {})
+                    return
+                if not batch:
+                    yield sse_comment("keep-alive")
+                    continue
+                yield "".join(sse_event("change", event) for event in batch)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.post("/{user_id}/tasks", response_model=TaskResponse, dependencies=CHEAP)
+@query_budget(6) # 3, plus 3 to claim and store an Idempotency-Key (1 to replay one)
+async def create_task(
     user_id: int,
     *,
-    db: Session = Depends(deps.get_db),
+    db: deps.DbSession = Depends(deps.get_db),
     task_in: TaskCreate,
     current_user: User = Depends(deps.get_current_user),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Create new task.
+
+    Send an `Idempotency-Key` header to make retries safe: a retry with the
+    same key and body gets the first response back instead of a second task.
     """
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to create tasks for this user")
-    return task_service.create_task(db=db, user=current_user, task_data=task_in.model_dump())
+    return await idempotent(
+        db,
+        user=current_user,
+        key=idempotency_key,
+        scope="create_task",
+        payload=task_in.model_dump(mode="json"),
+        run=lambda: deps.run_db(db, task_service.create_task, user=current_user, task_data=task_in.model_dump()),
+        response_model=TaskResponse,
+    )
+
+@router.post("/{user_id}/tasks/bulk", response_model=TaskBulkResponse, dependencies=EXPENSIVE)
+@query_budget(12) # see TaskService.bulk_apply
+async def bulk_tasks(
+    user_id: int,
+    *,
+    db: deps.DbSession = Depends(deps.get_db),
+    bulk_in: TaskBulkRequest,
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Apply many create / update / complete / delete operations in one transaction.
+
+    Returns one result per operation, in request order.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to modify these tasks")
+    if len(bulk_in.operations) > MAX_BULK_OPERATIONS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BULK_OPERATIONS} operations per request")
+    operations = [operation.model_dump(exclude_unset=True) for operation in bulk_in.operations]
+    results = await deps.run_db(db, task_service.bulk_apply, user=current_user, operations=operations)
+    return {"results": results}
 
-@router.get("/{user_id}/tasks/{id}", response_model=TaskResponse)
-def read_task(
+@router.get("/{user_id}/tasks/{id}", response_model=TaskResponse, dependencies=CHEAP)
+@query_budget(1)
+async def read_task(
     user_id: int,
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: deps.DbSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
     """
@@ -158,14 +391,15 @@ def read_task(
     """
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this task")
-    return task_service.get_task(db, user=current_user, task_id=id)
+    return await deps.run_db(db, task_service.get_task, user=current_user, task_id=id)
 
-@router.put("/{user_id}/tasks/{id}", response_model=TaskResponse)
-def update_task(
+@router.put("/{user_id}/tasks/{id}", response_model=TaskResponse, dependencies=CHEAP)
+@query_budget(2)
+async def update_task(
     user_id: int,
     id: int,
     *,
-    db: Session = Depends(deps.get_db),
+    db: deps.DbSession = Depends(deps.get_db),
     task_in: TaskUpdate,
     current_user: User = Depends(deps.get_current_user),
 ):
@@ -174,14 +408,15 @@ def update_task(
     """
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to update this task")
-    return task_service.update_task(db=db, user=current_user, task_id=id, task_data=task_in.model_dump(exclude_unset=True))
+    return await deps.run_db(db, task_service.update_task, user=current_user, task_id=id, task_data=task_in.model_dump(exclude_unset=True))
 
-@router.delete("/{user_id}/tasks/{id}")
-def delete_task(
+@router.delete("/{user_id}/tasks/{id}", dependencies=CHEAP)
+@query_budget(3)
+async def delete_task(
     user_id: int,
     id: int,
     *,
-    db: Session = Depends(deps.get_db),
+    db: deps.DbSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
     """
@@ -189,14 +424,15 @@ def delete_task(
     """
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this task")
-    task_service.delete_task(db=db, user=current_user, task_id=id)
+    await deps.run_db(db, task_service.delete_task, user=current_user, task_id=id)
     return {"ok": True}
 
-@router.patch("/{user_id}/tasks/{id}/complete", response_model=TaskResponse)
-def toggle_task_completion(
+@router.patch("/{user_id}/tasks/{id}/complete", response_model=TaskResponse, dependencies=CHEAP)
+@query_budget(2)
+async def toggle_task_completion(
     user_id: int,
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: deps.DbSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
     """
@@ -204,6 +440,4 @@ def toggle_task_completion(
     """
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to modify this task")
-    task = task_service.get_task(db, user=current_user, task_id=id)
-    task_update = {"completed": not task.completed}
-    return task_service.update_task(db=db, user=current_user, task_id=id, task_data=task_update)
\ No newline at end of file
+    return await deps.run_db(db, task_service.toggle_task_completion, user=current_user, task_id=id)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from api import deps
+from core.config import settings
+from models import User
+from services.idempotency_service import (
+    REPLAYED_HEADER,
+    WAIT_POLL_MAX,
+    WAIT_POLL_MIN,
+    check_key,
+    idempotency_service,
+    request_fingerprint,
+    still_running,
+)
+
+
+async def idempotent(
+    db: deps.DbSession,
+    *,
+    user: User,
+    key: Optional[str],
+    scope: str,
+    payload: Any,
+    run: Callable[[], Awaitable[Any]],
+    response_model: Type[BaseModel],
+) -> Any:
+    """
+    Runs an endpoint's work once per Idempotency-Key:
+
+        return await idempotent(
+            db, user=current_user, key=idempotency_key, scope="create_task",
+            payload=task_in.model_dump(mode="json"), run=lambda: ..., response_model=TaskResponse,
+        )
+
+    Without a key, just awaits `run()`. The first request with a key returns
+    its result as usual and stores it, serialized as `response_model`; a
+    retry gets the stored response back with `Idempotent-Replayed: true`,
+    waiting first if the original is still running. Errors aren't stored:
+    a retry after one runs the work again.
+    """
+    if key is None:
+        return await run()
+    check_key(key)
+    fingerprint = request_fingerprint(payload)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    delay = WAIT_POLL_MIN
+    while True:
+        record = await deps.run_db(db, idempotency_service.claim, user=user, key=key, scope=scope, fingerprint=fingerprint)
+        if record is None:
+            break
+        if record.status_code is not None:
+            return Response(
+                content=record.response,
+                status_code=record.status_code,
+                media_type="application/json",
+                headers={REPLAYED_HEADER: "true"},
+            )
+        if time.monotonic() >= deadline:
+            raise still_running()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, WAIT_POLL_MAX)
+
+    try:
+        result = await run()
+    except BaseException:
+        await deps.run_db(db, idempotency_service.release, user=user, key=key)
+        raise
+    response = response_model.model_validate(result).model_dump_json()
+    await deps.run_db(db, idempotency_service.complete, user=user, key=key, status_code=200, response=response)
+    return result
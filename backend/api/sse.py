@@ -0,0 +1,15 @@
+import json
+
+# Stop reverse proxies from buffering the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_comment(text: str) -> str:
+    """
+    A comment line: ignored by clients, but keeps idle connections from being closed by proxies.
+    """
+    return f": {text}\n\n"
@@ -0,0 +1,6 @@
+import os
+
+# The benchmarks drive one user, from one address, far harder than the
+# per-user limits allow; they measure the endpoints, not the 429s.
+# benchmarks.rate_limit sets it explicitly.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
@@ -0,0 +1,134 @@
+"""
+AI agent call benchmark: a new connection per call vs. the shared pooled clients.
+
+Run from the backend directory:
+
+    python -m benchmarks.agent_client --calls 2000 --concurrency 50 --delay-ms 20
+
+Starts the stub agent (benchmarks/stub_agent.py) on a local port and drives
+it three ways: `requests.post` per call from a thread pool (the old code path),
+the pooled sync client from the same thread pool, and the pooled async client
+awaited from one event loop.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.suite import percentile
+
+PAYLOAD = {"messages": [{"role": "user", "content": "hello"}], "user_id": 1, "token": "bench"}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float = 15.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.post(url, json=PAYLOAD)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Stub agent did not start at {url}")
+
+
+def summarize(mode: str, latencies, elapsed: float, errors: int) -> dict:
+    return {
+        "mode": mode,
+        "calls": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def run_threaded(mode: str, call, calls: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+
+    def one(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            call()
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(calls)))
+    return summarize(mode, latencies, time.perf_counter() - start, errors)
+
+
+async def run_async(client, calls: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.apost(PAYLOAD)
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return summarize("pooled-async", latencies, elapsed, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay-ms", type=float, default=20, help="Simulated agent latency.")
+    parser.add_argument("--modes", default="per-call,pooled-sync,pooled-async")
+    args = parser.parse_args()
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/chat"
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_agent", "--port", str(port), "--delay-ms", str(args.delay_ms)],
+    )
+    try:
+        wait_for(url)
+        os.environ.setdefault("DATABASE_URL", "sqlite://")
+        import requests
+
+        from services.agent_client import AgentClient
+
+        modes = args.modes.split(",")
+        if "per-call" in modes:
+            def per_call():
+                requests.post(url, json=PAYLOAD).raise_for_status()
+            print(json.dumps(run_threaded("per-call", per_call, args.calls, args.concurrency)))
+        if "pooled-sync" in modes:
+            client = AgentClient(url)
+            print(json.dumps(run_threaded("pooled-sync", lambda: client.post(PAYLOAD), args.calls, args.concurrency)))
+        if "pooled-async" in modes:
+            print(json.dumps(asyncio.run(run_async(AgentClient(url), args.calls, args.concurrency))))
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Task change feed benchmark: connected stream clients per worker and publish-to-delivery latency.
+
+Run from the backend directory:
+
+    python -m benchmarks.change_feed --clients 1000 --writes 50
+
+Starts the backend under uvicorn (one worker) with a temporary SQLite
+database and opens `--clients` streams on GET /api/v1/{user_id}/tasks/stream
+for one user, so every write fans out to all of them. Then `--writes` tasks
+are created one at a time. Latency runs from just before each POST to the
+arrival of its `change` event on every stream, so it includes the write
+itself. The worker's resident memory is read before and after the clients
+connect. The clients share this process, so at high counts most of the
+spread between the first and the last delivery is the client side's own
+parsing.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.agent_client import free_port
+from benchmarks.chat_stream import describe, wait_for_backend
+
+# Lets the benchmark read /feed-stats from the backend it starts
+OPS_TOKEN = "bench"
+OPS_HEADERS = {"Authorization": f"Bearer {OPS_TOKEN}"}
+
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def subscribe(client, path: str, headers: dict, arrivals: dict, ready: asyncio.Event):
+    async with client.stream("GET", path, headers=headers) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.startswith(": connected"):
+                ready.set()
+            elif line.startswith("data:"):
+                event = json.loads(line[len("data:"):])
+                if event["op"] == "upsert":
+                    arrivals.setdefault(event["task"]["title"], []).append(time.perf_counter())
+
+
+async def run(base_url: str, pid: int, clients: int, writes: int) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=clients + 10, max_keepalive_connections=clients + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        r = await client.post("/api/v1/auth/register", json={"email": "bench@example.com", "password": "bench"})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        user_id = (await client.get("/api/v1/auth/me", headers=headers)).json()["id"]
+        rss_before = rss_kb(pid)
+
+        arrivals: dict = {}
+        readies = [asyncio.Event() for _ in range(clients)]
+        connect_start = time.perf_counter()
+        streams = [
+            asyncio.create_task(subscribe(client, f"/api/v1/{user_id}/tasks/stream", headers, arrivals, ready))
+            for ready in readies
+        ]
+        await asyncio.gather(*(ready.wait() for ready in readies))
+        connect_s = time.perf_counter() - connect_start
+        rss_after = rss_kb(pid)
+        subscribers = (await client.get("/feed-stats", headers=OPS_HEADERS)).json()["subscribers"]
+
+        latencies, first = [], []
+        for write in range(writes):
+            title = f"write {write}"
+            start = time.perf_counter()
+            (await client.post(f"/api/v1/{user_id}/tasks", json={"title": title}, headers=headers)).raise_for_status()
+            deadline = time.monotonic() + 30
+            while len(arrivals.get(title, ())) < clients and time.monotonic() < deadline:
+                await asyncio.sleep(0.001)
+            received = arrivals.get(title, [])
+            if len(received) < clients:
+                raise RuntimeError(f"{title}: {len(received)} of {clients} clients got the event")
+            latencies.extend((arrival - start) * 1000 for arrival in received)
+            first.append((min(received) - start) * 1000)
+
+        for stream in streams:
+            stream.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
+
+    return {
+        "clients": clients,
+        "subscribers_on_worker": subscribers,
+        "connect_all_s": round(connect_s, 2),
+        "worker_rss_kb_per_client": round((rss_after - rss_before) / clients, 1),
+        "write_to_first_delivery": describe(first),
+        "write_to_delivery": describe(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--writes", type=int, default=50)
+    args = parser.parse_args()
+
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}", TASK_CHANGE_BROKER="memory", OPS_TOKEN=OPS_TOKEN)
+        backend = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_for_backend(base_url)
+            print(json.dumps(asyncio.run(run(base_url, backend.pid, args.clients, args.writes))))
+        finally:
+            backend.terminate()
+            backend.wait()
+
+
+if __name__ == "__main__":
+    main()
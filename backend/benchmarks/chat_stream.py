@@ -0,0 +1,115 @@
+"""
+Chat streaming benchmark: time to first byte of the blocking and SSE chat endpoints.
+
+Run from the backend directory:
+
+    python -m benchmarks.chat_stream --turns 20 --delay-ms 300 --chunks 40 --chunk-delay-ms 30
+
+Starts the stub agent (benchmarks/stub_agent.py) and the backend under
+uvicorn on local ports, with a temporary SQLite database, then sends the same
+turns to POST /api/v1/chat and POST /api/v1/chat/stream. For the stream,
+time to first byte is measured to the first `content` event.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.agent_client import free_port, wait_for
+from benchmarks.suite import percentile
+
+
+def wait_for_backend(base_url: str, timeout: float = 30.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/healthz")
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Backend did not start at {base_url}")
+
+
+def describe(samples) -> dict:
+    return {"p50_ms": round(statistics.median(samples), 2), "p99_ms": round(percentile(samples, 99), 2)}
+
+
+def run(base_url: str, turns: int) -> dict:
+    import httpx
+
+    with httpx.Client(base_url=base_url, timeout=120) as client:
+        r = client.post("/api/v1/auth/register", json={"email": "bench@example.com", "password": "bench"})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        blocking = []
+        for turn in range(turns):
+            start = time.perf_counter()
+            client.post("/api/v1/chat", json={"message": f"message {turn}"}, headers=headers).raise_for_status()
+            blocking.append((time.perf_counter() - start) * 1000)
+
+        first_content, complete = [], []
+        for turn in range(turns):
+            start = time.perf_counter()
+            ttfb = None
+            with client.stream("POST", "/api/v1/chat/stream", json={"message": f"message {turn}"}, headers=headers) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if ttfb is None and line == "event: content":
+                        ttfb = (time.perf_counter() - start) * 1000
+                    if line == "event: error":
+                        raise RuntimeError("Stream ended with an error event")
+            first_content.append(ttfb)
+            complete.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "blocking": {"ttfb": describe(blocking), "complete": describe(blocking)},
+        "stream": {"ttfb": describe(first_content), "complete": describe(complete)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=300, help="Stub agent latency to the first chunk.")
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--chunk-delay-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    agent_port, backend_port = free_port(), free_port()
+    agent_url = f"http://127.0.0.1:{agent_port}/chat"
+    processes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            processes.append(subprocess.Popen([
+                sys.executable, "-m", "benchmarks.stub_agent", "--port", str(agent_port),
+                "--delay-ms", str(args.delay_ms), "--chunks", str(args.chunks),
+                "--chunk-delay-ms", str(args.chunk_delay_ms),
+            ]))
+            wait_for(agent_url)
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                AI_AGENT_URL=agent_url,
+                AI_AGENT_STREAM_URL=f"{agent_url}/stream",
+            )
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--port", str(backend_port), "--log-level", "warning"],
+                env=env, stdout=subprocess.DEVNULL,
+            ))
+            base_url = f"http://127.0.0.1:{backend_port}"
+            wait_for_backend(base_url)
+            print(json.dumps(run(base_url, args.turns)))
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
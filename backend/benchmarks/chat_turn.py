@@ -0,0 +1,97 @@
+"""
+Chat turn benchmark: SQL statements, commits and latency per POST /chat turn.
+
+Run from the backend directory:
+
+    python -m benchmarks.chat_turn --turns 50
+
+The AI agent is replaced by an in-process stub that answers immediately, so
+the numbers cover only the backend's own work. The first turn of each
+conversation and the follow-up turns are reported separately.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args, **kwargs):
+        self.statements += 1
+
+    def _on_commit(self, *args, **kwargs):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+
+def run(turns: int) -> dict:
+    from fastapi.testclient import TestClient
+    from sqlmodel import SQLModel
+
+    import main
+    from core.database import async_engine, engine
+    from services.chat_service import chat_service
+
+    async def stub_ai_response(*, history, user, token):
+        return f"stub reply #{len(history)}"
+
+    chat_service.get_ai_response_async = stub_ai_response
+    SQLModel.metadata.create_all(engine)
+    counter = QueryCounter(async_engine.sync_engine if async_engine is not None else engine)
+
+    results = {"first_turn": [], "follow_up_turn": []}
+    with TestClient(main.app) as client:
+        r = client.post("/api/v1/auth/register", json={"email": "bench@example.com", "password": "bench"})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        client.get("/api/v1/auth/me", headers=headers)  # warm the principal cache
+
+        conversation_id = None
+        for turn in range(turns):
+            counter.reset()
+            start = time.perf_counter()
+            response = client.post(
+                "/api/v1/chat", json={"message": f"message {turn}", "conversation_id": conversation_id}, headers=headers
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            response.raise_for_status()
+            kind = "first_turn" if conversation_id is None else "follow_up_turn"
+            results[kind].append((counter.statements, counter.commits, elapsed_ms))
+            conversation_id = response.json()["conversation_id"]
+
+    summary = {}
+    for kind, samples in results.items():
+        if samples:
+            summary[kind] = {
+                "turns": len(samples),
+                "statements": max(s[0] for s in samples),
+                "commits": max(s[1] for s in samples),
+                "p50_ms": round(statistics.median(s[2] for s in samples), 2),
+            }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        print(json.dumps(run(args.turns)))
+
+
+if __name__ == "__main__":
+    main()
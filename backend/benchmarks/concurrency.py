@@ -0,0 +1,120 @@
+"""
+Concurrency benchmark for the sync (threadpool) and async (AsyncSession) database modes.
+
+Run from the backend directory:
+
+    python -m benchmarks.concurrency --requests 2000 --concurrency 100
+    python -m benchmarks.concurrency --database-url postgresql://... --modes async
+
+Each mode runs in its own process, because DB_ASYNC is read when the app is
+imported. The app is driven in-process through httpx's ASGI transport with a
+mixed task workload (list, read, create, toggle) from one seeded user.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.suite import percentile
+
+
+async def drive(total: int, concurrency: int, seed_tasks: int) -> dict:
+    import httpx
+    from sqlmodel import SQLModel
+
+    import main
+    from core.database import engine, get_pool_stats
+
+    SQLModel.metadata.create_all(engine)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        r = await client.post("/api/v1/auth/register", json={"email": "bench@example.com", "password": "bench"})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        user_id = (await client.get("/api/v1/auth/me", headers=headers)).json()["id"]
+        base = f"/api/v1/{user_id}/tasks"
+        task_ids = []
+        for i in range(seed_tasks):
+            task_ids.append((await client.post(base, json={"title": f"seed {i}"}, headers=headers)).json()["id"])
+
+        def request_for(i: int):
+            kind = i % 4
+            if kind == 0:
+                return client.get(base, params={"limit": 50}, headers=headers)
+            if kind == 1:
+                return client.get(f"{base}/{task_ids[i % len(task_ids)]}", headers=headers)
+            if kind == 2:
+                return client.post(base, json={"title": f"task {i}"}, headers=headers)
+            return client.patch(f"{base}/{task_ids[i % len(task_ids)]}/complete", headers=headers)
+
+        latencies = []
+        errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await request_for(i)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "pool": get_pool_stats(),
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def run_child(args):
+    result = asyncio.run(drive(args.requests, args.concurrency, args.seed_tasks))
+    result["mode"] = args.child
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="sync,async")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seed-tasks", type=int, default=200)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file per mode.")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    for mode in args.modes.split(","):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DB_ASYNC="true" if mode == "async" else "false")
+            env["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            output = subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.concurrency", "--child", mode,
+                    "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                    "--seed-tasks", str(args.seed_tasks),
+                ],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            # The app prints start-up chatter; the result is the last line
+            print(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
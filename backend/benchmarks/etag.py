@@ -0,0 +1,90 @@
+"""
+Conditional GET benchmark for the task list: full 200 responses vs. 304 revalidations.
+
+Run from the backend directory:
+
+    python -m benchmarks.etag --tasks 500 --polls 200
+
+Seeds one user, then polls GET /{user_id}/tasks with and without the last
+ETag, counting SQL statements that touch the task table. A revalidation that
+still matches must run none; the run fails if it does, or if a write does
+not change the ETag.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+
+TASK_TABLE_RE = re.compile(r"\btask\b", re.IGNORECASE)
+
+
+def run(tasks: int, polls: int) -> dict:
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import SQLModel
+
+    import main
+    from core.database import async_engine, engine
+
+    SQLModel.metadata.create_all(engine)
+    task_statements = []
+    event.listen(
+        async_engine.sync_engine if async_engine is not None else engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: task_statements.append(statement) if TASK_TABLE_RE.search(statement) else None,
+    )
+
+    with TestClient(main.app) as client:
+        r = client.post("/api/v1/auth/register", json={"email": "bench@example.com", "password": "bench"})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        user_id = client.get("/api/v1/auth/me", headers=headers).json()["id"]
+        base = f"/api/v1/{user_id}/tasks"
+        client.post(f"{base}/bulk", json={"operations": [{"op": "create", "title": f"task {i}"} for i in range(tasks)]}, headers=headers)
+
+        full, revalidated = [], []
+        etag = None
+        for _ in range(polls):
+            start = time.perf_counter()
+            r = client.get(base, headers=headers)
+            full.append((time.perf_counter() - start) * 1000)
+            etag = r.headers["etag"]
+
+        task_statements.clear()
+        for _ in range(polls):
+            start = time.perf_counter()
+            r = client.get(base, headers={**headers, "If-None-Match": etag})
+            revalidated.append((time.perf_counter() - start) * 1000)
+            assert r.status_code == 304, r.status_code
+        statements_on_304 = len(task_statements)
+        assert statements_on_304 == 0, task_statements[:3]
+
+        first_id = client.get(base, params={"limit": 1}, headers=headers).json()[0]["id"]
+        client.patch(f"{base}/{first_id}/complete", headers=headers)
+        r = client.get(base, headers={**headers, "If-None-Match": etag})
+        assert r.status_code == 200 and r.headers["etag"] != etag, "a write must change the ETag"
+
+    return {
+        "tasks": tasks,
+        "polls": polls,
+        "full_p50_ms": round(statistics.median(full), 3),
+        "revalidate_p50_ms": round(statistics.median(revalidated), 3),
+        "task_statements_per_304": statements_on_304 / polls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--polls", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        print(json.dumps(run(args.tasks, args.polls)))
+
+
+if __name__ == "__main__":
+    main()
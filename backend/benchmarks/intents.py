@@ -0,0 +1,79 @@
+"""
+Mock agent intent matcher microbenchmark: classifications per second.
+
+Run from the backend directory:
+
+    python -m benchmarks.intents --messages 200000
+
+Compares `ai_agent.intents.parse` (one compiled pass, with slot extraction)
+against the substring chain the mock agent used before, which only picked a
+canned reply.
+"""
+import argparse
+import json
+import random
+import time
+
+from ai_agent.intents import parse
+
+MESSAGES = [
+    "Add a task to buy milk",
+    "remind me to call mom tomorrow",
+    "Show me my tasks",
+    "what are my pending tasks?",
+    "Mark the first task as done",
+    "mark task 3 as done",
+    "Delete the grocery task",
+    "rename task 2 to buy bread",
+    "hello there",
+    "help",
+    "Could you please add a new task called prepare the quarterly report for the finance team",
+    "I finally finished the dentist appointment, check it off",
+]
+
+
+def legacy_classify(message: str) -> str:
+    user_message = message.lower()
+    if "add" in user_message and "task" in user_message:
+        return "add"
+    elif "show" in user_message or "list" in user_message or "my tasks" in user_message:
+        return "list"
+    elif "complete" in user_message or "mark" in user_message or "done" in user_message or "finish" in user_message:
+        return "complete"
+    elif "delete" in user_message or "remove" in user_message:
+        return "delete"
+    elif "update" in user_message or "change" in user_message or "edit" in user_message:
+        return "update"
+    elif "hello" in user_message or "hi" in user_message or "hey" in user_message:
+        return "greet"
+    elif "help" in user_message:
+        return "help"
+    return "unknown"
+
+
+def measure(name: str, classify, messages) -> dict:
+    start = time.perf_counter()
+    for message in messages:
+        classify(message)
+    elapsed = time.perf_counter() - start
+    return {
+        "matcher": name,
+        "messages": len(messages),
+        "per_second": round(len(messages) / elapsed),
+        "us_per_message": round(elapsed / len(messages) * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = [rng.choice(MESSAGES) for _ in range(args.messages)]
+    for name, classify in (("legacy substring chain", legacy_classify), ("compiled intents.parse", parse)):
+        print(json.dumps(measure(name, classify, messages)))
+
+
+if __name__ == "__main__":
+    main()
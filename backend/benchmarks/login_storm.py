@@ -0,0 +1,86 @@
+"""
+Login-storm benchmark: task CRUD latency while a burst of logins hits bcrypt.
+
+Run from the backend directory:
+
+    python -m benchmarks.login_storm --logins 200 --task-requests 400
+
+Task requests are timed twice, once alone and once while `--logins` concurrent
+logins are in flight. Logins rejected with 503 show the hashing queue shedding
+load. Set BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS and PASSWORD_HASH_MAX_PENDING in
+the environment to try other settings.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.suite import percentile
+
+
+async def task_traffic(client, base: str, headers: dict, total: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            if i % 2:
+                await client.get(base, params={"limit": 20}, headers=headers)
+            else:
+                await client.post(base, json={"title": f"task {i}"}, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return {"p50_ms": round(statistics.median(latencies), 2), "p99_ms": round(percentile(latencies, 99), 2)}
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlmodel import SQLModel
+
+    import main
+    from core.database import engine
+
+    SQLModel.metadata.create_all(engine)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        r = await client.post("/api/v1/auth/register", json={"email": "bench@example.com", "password": "bench"})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        user_id = (await client.get("/api/v1/auth/me", headers=headers)).json()["id"]
+        base = f"/api/v1/{user_id}/tasks"
+
+        baseline = await task_traffic(client, base, headers, args.task_requests, args.concurrency)
+
+        statuses = {}
+
+        async def login():
+            response = await client.post(
+                "/api/v1/auth/login", data={"username": "bench@example.com", "password": "bench"}
+            )
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        storm = asyncio.gather(*(login() for _ in range(args.logins)))
+        during_storm = await task_traffic(client, base, headers, args.task_requests, args.concurrency)
+        await storm
+
+    return {"baseline": baseline, "during_storm": during_storm, "login_statuses": statuses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--task-requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        print(json.dumps(asyncio.run(run(args))))
+
+
+if __name__ == "__main__":
+    main()
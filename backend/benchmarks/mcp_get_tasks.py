@@ -0,0 +1,123 @@
+"""
+MCP get_tasks context-size benchmark: what one tool call puts into the model's context.
+
+Run from the backend directory:
+
+    python -m benchmarks.mcp_get_tasks --tasks 5000
+
+Seeds a synthetic account with N tasks in a temporary SQLite database and
+calls the get_tasks tool in-process ("local" backend) for a few typical agent
+requests. The baseline is the old behaviour: the user's whole task list as
+full API objects. Tokens are counted with tiktoken when it is installed and
+estimated as characters / 4 otherwise.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import tempfile
+import time
+
+SCENARIOS = {
+    "no filters": {},
+    "text search": {"query": "dentist"},
+    "pending, high priority": {"completed": False, "priority": "high"},
+    "due this week": {"completed": False, "due_after": "today", "due_before": "today+7"},
+}
+
+
+def token_counter():
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return "tiktoken", lambda text: len(encoding.encode(text))
+    except ImportError:
+        return "chars/4", lambda text: len(text) // 4
+
+
+def seed(size: int) -> int:
+    from sqlmodel import Session, SQLModel
+
+    from benchmarks.search import VOCABULARY
+    from core.database import engine
+    from models import Task, User
+
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(42)
+    today = datetime.date.today()
+    with Session(engine) as db:
+        user = User(email="bench@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        now = datetime.datetime.utcnow()
+        rows = [
+            {
+                "user_id": user.id,
+                "title": " ".join(rng.sample(VOCABULARY[:200], 3)),
+                "description": " ".join(rng.sample(VOCABULARY, 6)),
+                "completed": i % 3 == 0,
+                "priority": rng.choice(["low", "medium", "high", None]),
+                "due_date": today + datetime.timedelta(days=rng.randint(-30, 90)) if i % 2 else None,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(size)
+        ]
+        db.execute(Task.__table__.insert(), rows)
+        db.commit()
+        return user.id
+
+
+def resolve(arguments: dict) -> dict:
+    today = datetime.date.today()
+    resolved = {}
+    for key, value in arguments.items():
+        if value == "today":
+            value = today
+        elif value == "today+7":
+            value = today + datetime.timedelta(days=7)
+        resolved[key] = value
+    return resolved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["MCP_BACKEND"] = "local"
+        user_id = seed(args.tasks)
+
+        from core.security import create_access_token
+        from mcp_server import main as mcp
+
+        token = create_access_token(subject=user_id)
+        method, count_tokens = token_counter()
+
+        start = time.perf_counter()
+        tasks, _ = mcp.backend.list_tasks(user_id, token, limit=args.tasks + 1)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        baseline = json.dumps(tasks)
+        print(json.dumps({
+            "scenario": "baseline: full list", "token_count": method, "tasks": len(tasks),
+            "bytes": len(baseline), "tokens": count_tokens(baseline), "ms": round(elapsed_ms, 1),
+        }))
+
+        for name, arguments in SCENARIOS.items():
+            start = time.perf_counter()
+            result = mcp.get_tasks(user_id, token, **resolve(arguments))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            payload = result.model_dump_json(exclude_none=True)
+            print(json.dumps({
+                "scenario": name, "token_count": method, "tasks": len(result.tasks), "truncated": result.truncated,
+                "bytes": len(payload), "tokens": count_tokens(payload), "ms": round(elapsed_ms, 1),
+            }))
+
+
+if __name__ == "__main__":
+    main()
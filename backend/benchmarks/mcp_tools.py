@@ -0,0 +1,87 @@
+"""
+MCP tool-call latency benchmark: HTTP loopback backend vs. in-process TaskService.
+
+Run from the backend directory:
+
+    python -m benchmarks.mcp_tools --calls 500 --seed-tasks 50
+
+Starts the backend under uvicorn with a temporary SQLite database and drives
+the same tool workload (list, create, update, delete) through
+`HttpTaskBackend` (the MCP server's "http" mode) and `LocalTaskBackend`
+("local" mode), which shares the database file.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.agent_client import free_port
+from benchmarks.suite import percentile
+from benchmarks.chat_stream import wait_for_backend
+
+
+def drive(backend, user_id: int, token: str, calls: int) -> dict:
+    latencies = {"get_tasks": [], "create_task": [], "update_task": [], "delete_task": []}
+
+    def timed(tool, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        latencies[tool].append((time.perf_counter() - start) * 1000)
+        return result
+
+    for i in range(calls // 4):
+        timed("get_tasks", backend.list_tasks, user_id, token)
+        task = timed("create_task", backend.create_task, user_id, token, {"title": f"tool task {i}"})
+        timed("update_task", backend.update_task, user_id, token, task["id"], {"completed": True})
+        timed("delete_task", backend.delete_task, user_id, token, task["id"])
+
+    return {
+        tool: {"p50_ms": round(statistics.median(samples), 2), "p99_ms": round(percentile(samples, 99), 2)}
+        for tool, samples in latencies.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--seed-tasks", type=int, default=50)
+    args = parser.parse_args()
+
+    import httpx
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_for_backend(base_url)
+            api_url = f"{base_url}/api/v1"
+            r = httpx.post(f"{api_url}/auth/register", json={"email": "bench@example.com", "password": "bench"})
+            token = r.json()["access_token"]
+            user_id = httpx.get(f"{api_url}/auth/me", headers={"Authorization": f"Bearer {token}"}).json()["id"]
+
+            from mcp_server.backends import HttpTaskBackend
+            from mcp_server.local_backend import LocalTaskBackend
+
+            http_backend = HttpTaskBackend(api_url)
+            for i in range(args.seed_tasks):
+                http_backend.create_task(user_id, token, {"title": f"seed {i}"})
+
+            for mode, backend in (("http", http_backend), ("local", LocalTaskBackend())):
+                drive(backend, user_id, token, 20)  # warm connections and caches
+                print(json.dumps({"mode": mode, **drive(backend, user_id, token, args.calls)}))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
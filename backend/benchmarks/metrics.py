@@ -0,0 +1,84 @@
+"""
+Metrics overhead benchmark: request latency with METRICS_ENABLED on and off.
+
+Run from the backend directory:
+
+    python -m benchmarks.metrics --requests 3000 --rounds 3
+
+Each setting runs in its own process, because METRICS_ENABLED is read when
+the app is imported, on a temporary SQLite database. Requests are sent one
+at a time through httpx's ASGI transport, so the difference is the
+per-request cost of the middleware, the SQL event hooks and the context
+variable. The workload alternates reading one task (two statements) and
+listing a 20-task page. Rounds alternate between the settings to spread out
+machine noise; the best round of each is reported.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+from benchmarks.suite import app_client, best_of_rounds, seed_account
+
+
+def summary(latencies: List[float]) -> dict:
+    return {"p50_us": round(statistics.median(latencies), 1), "mean_us": round(statistics.fmean(latencies), 1)}
+
+
+async def seed_reads(client) -> dict:
+    return await seed_account(client, "bench@example.com", [{"title": f"task {i}"} for i in range(100)])
+
+
+async def read_tasks(client, account: dict, total: int) -> List[float]:
+    """
+    Sends `total` requests one at a time, alternately reading one of the
+    account's tasks and listing a 20-task page. Returns their latencies in µs.
+    """
+    base, headers, task_ids = account["base"], account["headers"], account["task_ids"]
+    latencies = []
+    for i in range(total):
+        start = time.perf_counter()
+        if i % 2:
+            r = await client.get(base, params={"limit": 20}, headers=headers)
+        else:
+            r = await client.get(f"{base}/{task_ids[i % len(task_ids)]}", headers=headers)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        r.raise_for_status()
+    return latencies
+
+
+async def drive(total: int) -> dict:
+    async with app_client() as client:
+        return summary(await read_tasks(client, await seed_reads(client), total))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(drive(args.requests))))
+        return
+
+    best = best_of_rounds(
+        args.rounds, "benchmarks.metrics", ["--requests", str(args.requests)],
+        {"off": {"METRICS_ENABLED": "false"}, "on": {"METRICS_ENABLED": "true"}},
+        p50=lambda result: result["p50_us"],
+    )
+    off, on = best["off"], best["on"]
+    print(json.dumps({
+        "requests": args.requests,
+        "metrics_off": off,
+        "metrics_on": on,
+        "overhead_p50_us": round(on["p50_us"] - off["p50_us"], 1),
+        "overhead_p50_pct": round((on["p50_us"] - off["p50_us"]) / off["p50_us"] * 100, 2),
+    }))
+
+
+if __name__ == "__main__":
+    main()
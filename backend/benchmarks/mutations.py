@@ -0,0 +1,75 @@
+"""
+Single-task mutation benchmark: SQL statements and latency per update, toggle and delete.
+
+Run from the backend directory:
+
+    python -m benchmarks.mutations --rounds 200
+    python -m benchmarks.mutations --database-url postgresql://...
+
+Seeds one user with `--rounds` tasks, then updates, toggles and deletes each
+of them through PUT, PATCH .../complete and DELETE, counting the statements
+each request runs inside its service call (the change-sequence upsert and
+the tombstone INSERT included) and those that touch the task table. Each
+mutation must touch the task table exactly once, its UPDATE ... RETURNING or
+DELETE ... RETURNING; the run fails otherwise.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+
+from benchmarks.suite import app_client, seed_account
+
+TASK_TABLE_RE = re.compile(r"\btask\b", re.IGNORECASE)
+
+
+async def run(rounds: int) -> dict:
+    from core.query_budget import count_queries
+
+    async with app_client() as client:
+        account = await seed_account(client, "bench@example.com", [{"title": f"task {i}"} for i in range(rounds)])
+        base, headers, task_ids = account["base"], account["headers"], account["task_ids"]
+
+        mutations = {
+            "update": lambda task_id: client.put(f"{base}/{task_id}", json={"title": "renamed"}, headers=headers),
+            "toggle": lambda task_id: client.patch(f"{base}/{task_id}/complete", headers=headers),
+            "delete": lambda task_id: client.delete(f"{base}/{task_id}", headers=headers),
+        }
+        results = {}
+        for name, mutate in mutations.items():
+            latencies, statements, task_statements = [], set(), set()
+            for task_id in task_ids:
+                with count_queries() as queries:
+                    start = time.perf_counter()
+                    r = await mutate(task_id)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                r.raise_for_status()
+                touching = [statement for statement in queries.statements if TASK_TABLE_RE.search(statement)]
+                assert len(touching) == 1, f"{name} touched the task table {len(touching)} times: {touching}"
+                statements.add(queries.count)
+                task_statements.add(" ".join(touching[0].split()[:1]))
+            results[name] = {
+                "p50_ms": round(statistics.median(latencies), 3),
+                "statements": max(statements),
+                "task_table": sorted(task_statements),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        print(json.dumps({"rounds": args.rounds, "mutations": asyncio.run(run(args.rounds))}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Admission control overhead benchmark: request latency with RATE_LIMIT_ENABLED
+on and off, the cost of one token bucket check, and how fast a request over
+its budget is turned away.
+
+Run from the backend directory:
+
+    python -m benchmarks.rate_limit --requests 3000 --rounds 3
+    python -m benchmarks.rate_limit --backend redis  # needs REDIS_URL
+
+Each setting runs in its own process, because the settings are read when the
+app is imported, on a temporary SQLite database. The workload is the one of
+benchmarks.metrics (alternately reading one task and listing a 20-task
+page, one request at a time through httpx's ASGI transport) with budgets
+too large to be reached, so the difference is the per-request cost of the
+dependency, the bucket and the concurrency count. `rejected_*` is the
+latency of requests answered 429 once a budget of 1 request is used up,
+and `take_us` the in-process cost of one check against the backend.
+Rounds alternate between the settings; the best round of each is reported.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.metrics import read_tasks, seed_reads, summary
+from benchmarks.suite import app_client, best_of_rounds
+
+UNREACHABLE = {
+    "RATE_LIMIT_CHEAP_PER_SECOND": "1000000",
+    "RATE_LIMIT_CHEAP_BURST": "1000000",
+    "RATE_LIMIT_EXPENSIVE_PER_SECOND": "1000000",
+    "RATE_LIMIT_EXPENSIVE_BURST": "1000000",
+}
+
+
+async def drive(total: int) -> dict:
+    import main
+    from core.rate_limit import Limit, admission_control
+
+    async with app_client() as client:
+        account = await seed_reads(client)
+        base, headers, task_ids = account["base"], account["headers"], account["task_ids"]
+        latencies = await read_tasks(client, account, total)
+        result = {"admitted": summary(latencies)}
+
+        if main.settings.RATE_LIMIT_ENABLED:
+            admission_control.limits["cheap"] = Limit(per_second=0.001, burst=1, concurrency=1)
+            (await client.get(f"{base}/{task_ids[0]}", headers=headers)).raise_for_status()
+            rejected = []
+            for i in range(min(total, 1000)):
+                start = time.perf_counter()
+                r = await client.get(f"{base}/{task_ids[0]}", headers=headers)
+                rejected.append((time.perf_counter() - start) * 1e6)
+                assert r.status_code == 429 and "retry-after" in r.headers, r.status_code
+            result["rejected"] = summary(rejected)
+
+            backend = admission_control.backend
+            start = time.perf_counter()
+            for i in range(total):
+                await backend.take(f"bench:{i % 100}", 1000000.0, 1000000)
+            result["take_us"] = round((time.perf_counter() - start) / total * 1e6, 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--backend", default="memory", choices=("memory", "redis"))
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(drive(args.requests))))
+        return
+
+    best = best_of_rounds(
+        args.rounds, "benchmarks.rate_limit", ["--requests", str(args.requests)],
+        {
+            name: {**UNREACHABLE, "RATE_LIMIT_ENABLED": enabled, "RATE_LIMIT_BACKEND": args.backend}
+            for name, enabled in (("off", "false"), ("on", "true"))
+        },
+        p50=lambda result: result["admitted"]["p50_us"],
+    )
+    off, on = best["off"]["admitted"], best["on"]["admitted"]
+    print(json.dumps({
+        "requests": args.requests,
+        "backend": args.backend,
+        "limits_off": off,
+        "limits_on": on,
+        "overhead_p50_us": round(on["p50_us"] - off["p50_us"], 1),
+        "overhead_p50_pct": round((on["p50_us"] - off["p50_us"]) / off["p50_us"] * 100, 2),
+        "rejected": best["on"]["rejected"],
+        "take_us": best["on"]["take_us"],
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Task search benchmark: full-text index vs. the old leading-wildcard ILIKE scan.
+
+Run from the backend directory:
+
+    python -m benchmarks.search --sizes 10000,100000,1000000
+    python -m benchmarks.search --database-url postgresql://... --sizes 10000
+
+Each size gets a fresh database seeded with one user owning N tasks.
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from models import User, Task
+from services.task_search import apply_ilike_search
+from services.task_service import task_service
+
+WORDS = [
+    "buy", "milk", "call", "mom", "study", "exam", "report", "meeting", "groceries", "book",
+    "flight", "dentist", "invoice", "garden", "laundry", "email", "review", "deploy", "gym", "rent",
+]
+# Filler vocabulary keeps each real word rare, like search terms in a real task list.
+VOCABULARY = WORDS + [f"note{i}" for i in range(5000)]
+QUERIES = ["milk", "dentist", "rep", "call mom", "inv"]
+
+
+def seed(engine, size: int) -> int:
+    rng = random.Random(42)
+    with Session(engine) as db:
+        user = User(email=f"bench-{size}@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        now = datetime.datetime.utcnow()
+        batch = []
+        for i in range(size):
+            batch.append({
+                "user_id": user.id,
+                "title": " ".join(rng.sample(VOCABULARY, 3)),
+                "description": " ".join(rng.sample(VOCABULARY, 6)),
+                "completed": bool(i % 3 == 0),
+                "created_at": now,
+                "updated_at": now,
+            })
+            if len(batch) == 10_000:
+                db.execute(Task.__table__.insert(), batch)
+                batch = []
+        if batch:
+            db.execute(Task.__table__.insert(), batch)
+        db.commit()
+        return user.id
+
+
+def time_call(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(samples), "max_ms": max(samples), "rows": len(rows)}
+
+
+def run(database_url: str, size: int, repeat: int):
+    engine = create_engine(database_url)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    user_id = seed(engine, size)
+    with Session(engine) as db:
+        user = db.get(User, user_id)
+        for query in QUERIES:
+            ilike = time_call(
+                lambda: db.exec(apply_ilike_search(select(Task).where(Task.user_id == user_id), query)).all(),
+                repeat,
+            )
+            indexed = time_call(lambda: task_service.get_user_tasks(db, user=user, search=query), repeat)
+            print(
+                f"{size:>9} | {query:<10} | ilike {ilike['median_ms']:9.2f} ms ({ilike['rows']:>7} rows) "
+                f"| indexed {indexed['median_ms']:9.2f} ms ({indexed['rows']:>7} rows)"
+            )
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file per size.")
+    args = parser.parse_args()
+
+    print(f"{'tasks':>9} | {'query':<10} | timings (median of {args.repeat})")
+    for size in (int(s) for s in args.sizes.split(",")):
+        if args.database_url:
+            run(args.database_url, size, args.repeat)
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
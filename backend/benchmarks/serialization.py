@@ -0,0 +1,129 @@
+"""
+Task list serialization benchmark: ORM objects through response_model vs. rows through orjson.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization --tasks 10000 --repeat 10
+
+Seeds one user with `--tasks` tasks in a temporary SQLite database, then
+times, per 10k tasks:
+
+- `load`: fetching the list as Task objects vs. as column rows
+- `serialize`: FastAPI's response_model path (validate into TaskResponse,
+  dump to JSON-able data, encode with the standard JSON encoder) vs.
+  `task_rows_response`
+- `endpoint`: the whole GET through the ASGI app. `legacy` is the same
+  query behind `response_model=List[TaskResponse]` returning ORM objects;
+  `fields` asks for id,title,completed only.
+
+The run fails if the two paths don't produce the same JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(tasks: int, repeat: int) -> dict:
+    from typing import List
+
+    from fastapi import Depends, FastAPI
+    from fastapi.responses import JSONResponse
+    from fastapi.testclient import TestClient
+    from pydantic import TypeAdapter
+    from sqlmodel import Session, SQLModel
+
+    import main
+    from api import deps
+    from api.endpoints.tasks import TASK_RESPONSE_FIELDS, TASK_TABLE_COLUMNS, task_rows_response
+    from core.database import engine
+    from models import User
+    from schemas.task import TaskResponse
+    from services.task_service import task_service
+
+    SQLModel.metadata.create_all(engine)
+    legacy = FastAPI()
+
+    @legacy.get("/{user_id}/tasks", response_model=List[TaskResponse])
+    def legacy_read_tasks(user_id: int, current_user: User = Depends(deps.get_current_user)):
+        with Session(engine) as session:
+            return task_service.get_user_tasks(session, current_user)
+
+    with TestClient(main.app) as client, TestClient(legacy) as legacy_client:
+        r = client.post("/api/v1/auth/register", json={"email": "bench@example.com", "password": "bench"})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        user_id = client.get("/api/v1/auth/me", headers=headers).json()["id"]
+        base = f"/api/v1/{user_id}/tasks"
+        for start in range(0, tasks, 500):
+            operations = [
+                {"op": "create", "title": f"task {i}", "description": "x" * 40, "priority": "medium", "due_date": "2026-01-01"}
+                for i in range(start, min(tasks, start + 500))
+            ]
+            client.post(f"{base}/bulk", json={"operations": operations}, headers=headers).raise_for_status()
+
+        with Session(engine) as session:
+            user = session.get(User, user_id)
+            columns = [field for field in TASK_RESPONSE_FIELDS if field in TASK_TABLE_COLUMNS]
+            orm_tasks = task_service.get_user_tasks(session, user)
+            rows = task_service.get_user_tasks(session, user, columns=columns)
+            adapter = TypeAdapter(List[TaskResponse])
+
+            def pydantic_body():
+                validated = adapter.validate_python(orm_tasks, from_attributes=True)
+                return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+            def orjson_body():
+                return task_rows_response(rows, TASK_RESPONSE_FIELDS, {}).body
+
+            assert json.loads(pydantic_body()) == json.loads(orjson_body()), "serializers disagree"
+            timings = {
+                "load": {
+                    "orm": timed(lambda: task_service.get_user_tasks(session, user), repeat),
+                    "rows": timed(lambda: task_service.get_user_tasks(session, user, columns=columns), repeat),
+                },
+                "serialize": {
+                    "response_model": timed(pydantic_body, repeat),
+                    "orjson": timed(orjson_body, repeat),
+                },
+            }
+
+        assert legacy_client.get(f"/{user_id}/tasks", headers=headers).json() == client.get(base, headers=headers).json()
+        timings["endpoint"] = {
+            "legacy": timed(lambda: legacy_client.get(f"/{user_id}/tasks", headers=headers), repeat),
+            "fast": timed(lambda: client.get(base, headers=headers), repeat),
+            "fields": timed(lambda: client.get(base, params={"fields": "id,title,completed"}, headers=headers), repeat),
+        }
+
+    scale = 10000 / tasks
+    return {
+        "tasks": tasks,
+        "ms_per_10k_tasks": {
+            stage: {path: round(ms * scale, 2) for path, ms in paths.items()} for stage, paths in timings.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        print(json.dumps(run(args.tasks, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
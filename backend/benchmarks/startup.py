@@ -0,0 +1,152 @@
+"""
+Start-up benchmark: import time, time to listen, time to ready and first-request latency.
+
+Run from the backend directory:
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --database-url postgresql://...  # connects cost more there
+
+Measures, as the median over `--runs` fresh processes:
+
+- `import_ms`: `import main` in a bare interpreter
+- `listen_ms` / `ready_ms`: from spawning uvicorn until /healthz, then
+  /readyz, answer 200
+- `first_login_ms` / `first_list_ms`: the first login and task list request
+  once ready, next to the median of 20 later ones (`warm_*`)
+
+for two start-up modes: `legacy` (DB_CREATE_SCHEMA=true, no warm-up, the
+behaviour before /readyz existed) and `fast` (DB_CREATE_SCHEMA=false,
+STARTUP_WARMUP=true). The database is a SQLite file unless
+`--database-url` is given; it is seeded once with a user and 200 tasks.
+BCRYPT_ROUNDS=4 keeps the password check from hiding the cold start cost.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.agent_client import free_port
+
+MODES = {
+    "legacy": {"DB_CREATE_SCHEMA": "true", "STARTUP_WARMUP": "false"},
+    "fast": {"DB_CREATE_SCHEMA": "false", "STARTUP_WARMUP": "true"},
+}
+EMAIL = "startup@example.com"
+PASSWORD = "bench-password"
+
+
+def seed(env: dict):
+    script = (
+        "from core.database import engine\n"
+        "from core.schema import create_schema\n"
+        "from crud import user as user_crud\n"
+        "from core.security import get_password_hash\n"
+        "from schemas.user import UserCreate\n"
+        "from models import Task\n"
+        "from sqlmodel import Session\n"
+        "create_schema(engine)\n"
+        "with Session(engine) as db:\n"
+        f"    user = user_crud.get_user_by_email(db, email={EMAIL!r}) or user_crud.create_user(\n"
+        f"        db, user_in=UserCreate(email={EMAIL!r}, password={PASSWORD!r}), password_hash=get_password_hash({PASSWORD!r}))\n"
+        "    db.add_all([Task(user_id=user.id, title=f'task {i}') for i in range(200)])\n"
+        "    db.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", script], env=env, check=True, capture_output=True)
+
+
+def import_ms(env: dict) -> float:
+    script = "import time; start = time.perf_counter(); import main; print((time.perf_counter() - start) * 1000)"
+    output = subprocess.run([sys.executable, "-c", script], env=env, check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def until_ok(client, url: str, timeout: float = 60.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if client.get(url).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise RuntimeError(f"{url} did not answer 200 within {timeout}s")
+
+
+def timed_ms(fn) -> float:
+    start = time.perf_counter()
+    fn().raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def boot(env: dict) -> dict:
+    import httpx
+
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=base, timeout=30) as client:
+            until_ok(client, "/healthz")
+            listen = (time.perf_counter() - start) * 1000
+            until_ok(client, "/readyz")
+            ready = (time.perf_counter() - start) * 1000
+
+            def login():
+                return client.post("/api/v1/auth/login", data={"username": EMAIL, "password": PASSWORD})
+
+            first_login = timed_ms(login)
+            headers = {"Authorization": f"Bearer {login().json()['access_token']}"}
+            user_id = client.get("/api/v1/auth/me", headers=headers).json()["id"]
+
+            def list_tasks():
+                return client.get(f"/api/v1/{user_id}/tasks", params={"limit": 50}, headers=headers)
+
+            first_list = timed_ms(list_tasks)
+            warm_login = statistics.median(timed_ms(login) for _ in range(20))
+            warm_list = statistics.median(timed_ms(list_tasks) for _ in range(20))
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "listen_ms": listen, "ready_ms": ready,
+        "first_login_ms": first_login, "warm_login_ms": warm_login,
+        "first_list_ms": first_list, "warm_list_ms": warm_list,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_env = dict(
+            os.environ,
+            DATABASE_URL=args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            BCRYPT_ROUNDS="4",
+            PRINCIPAL_CACHE_ENABLED="false",
+        )
+        seed(base_env)
+        results = {}
+        for mode, overrides in MODES.items():
+            env = dict(base_env, **overrides)
+            runs = [dict(boot(env), import_ms=import_ms(env)) for _ in range(args.runs)]
+            results[mode] = {key: round(statistics.median(run[key] for run in runs), 1) for key in runs[0]}
+            print(f"{mode}: {json.dumps(results[mode])}", file=sys.stderr)
+
+    print(json.dumps({"runs": args.runs, "database": "custom" if args.database_url else "sqlite", "modes": results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Local stand-in for the AI agent service, for latency and throughput benchmarks.
+
+Run from the backend directory and point the backend at it:
+
+    python -m benchmarks.stub_agent --port 8001 --delay-ms 200
+    AI_AGENT_URL=http://127.0.0.1:8001/chat uvicorn main:app
+
+It accepts the same payload as the real agent. /chat/stream sends its first
+chunk after `--delay-ms` (simulated model latency), then the rest of
+`--chunks` chunks `--chunk-delay-ms` apart, like a model generating tokens;
+/chat answers once that whole reply would have been generated.
+"""
+import argparse
+import asyncio
+import json
+import os
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+DELAY_SECONDS = float(os.getenv("STUB_AGENT_DELAY_MS", "0")) / 1000
+CHUNKS = int(os.getenv("STUB_AGENT_CHUNKS", "20"))
+CHUNK_DELAY_SECONDS = float(os.getenv("STUB_AGENT_CHUNK_DELAY_MS", "0")) / 1000
+
+app = FastAPI(title="Stub AI agent")
+
+
+class ChatMessage(BaseModel):
+    role: str
+    content: str
+
+
+class ChatRequest(BaseModel):
+    messages: List[ChatMessage]
+    user_id: int
+    token: str
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    # A non-streaming reply is only ready once every chunk has been generated
+    total_delay = DELAY_SECONDS + max(CHUNKS - 1, 0) * CHUNK_DELAY_SECONDS
+    if total_delay:
+        await asyncio.sleep(total_delay)
+    return {"role": "assistant", "content": f"stub reply to {len(request.messages)} messages"}
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    async def events():
+        if DELAY_SECONDS:
+            await asyncio.sleep(DELAY_SECONDS)
+        for i in range(CHUNKS):
+            if i and CHUNK_DELAY_SECONDS:
+                await asyncio.sleep(CHUNK_DELAY_SECONDS)
+            yield f"event: content\ndata: {json.dumps({'content': f'chunk{i} '})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay-ms", type=float, default=0)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--chunk-delay-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    global DELAY_SECONDS, CHUNKS, CHUNK_DELAY_SECONDS
+    DELAY_SECONDS = args.delay_ms / 1000
+    CHUNKS = args.chunks
+    CHUNK_DELAY_SECONDS = args.chunk_delay_ms / 1000
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Endpoint benchmark suite: throughput and latency percentiles for the main API paths.
+
+Run from the backend directory:
+
+    python -m benchmarks.suite --output before.json
+    # ...change something...
+    python -m benchmarks.suite --output after.json
+    python -m benchmarks.suite --compare before.json after.json
+
+Drives the FastAPI app from main.py in-process through httpx's ASGI
+transport. By default the database is a SQLite file on a RAM-backed tmpfs
+(/dev/shm, or a temporary directory when there is none); a plain `:memory:`
+database can't be shared between pooled connections. Pass `--database-url`
+to use a local Postgres instead. `--users` users with `--tasks-per-user`
+tasks each are seeded, then each scenario sends `--requests` requests at
+`--concurrency`, spread over the users:
+
+- auth: `login` (password check), `me` (token to user)
+- task CRUD: `create`, `read`, `update`, `toggle`, `delete`
+- `list_page` (limit=50), `list_full`, `search`
+- `chat_turn`: POST /chat against the stub agent (benchmarks/stub_agent.py)
+  with `--agent-delay-ms` of agent latency
+
+Results are one JSON document: run metadata plus, per scenario, requests,
+errors, throughput and p50/p95/p99 latency. `--compare` prints the relative
+change between two such documents.
+
+The other benchmarks reuse the suite's in-process client (`app_client`),
+seeding (`seed_account`) and, for settings read when the app is imported,
+its child-process runner (`run_child`, `best_of_rounds`).
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List
+
+SCENARIOS = (
+    "login", "me", "create", "read", "update", "toggle", "delete", "list_page", "list_full", "search", "chat_turn",
+)
+WORDS = ("buy", "milk", "call", "mom", "report", "invoice", "gym", "plan", "trip", "email", "review", "budget")
+PASSWORD = "bench-password"
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def measure(make_request, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await make_request(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+@asynccontextmanager
+async def app_client() -> AsyncIterator:
+    """
+    An httpx client driving main.app in-process through the ASGI transport,
+    on the database in DATABASE_URL with its tables created.
+    """
+    import httpx
+    from sqlmodel import SQLModel
+
+    import main
+    from core.database import engine
+
+    SQLModel.metadata.create_all(engine)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        yield client
+
+
+async def seed_account(client, email: str, tasks: List[dict]) -> dict:
+    """
+    Registers `email` and creates `tasks` (task bodies) for it through the
+    bulk endpoint. Returns {"email", "headers", "base", "task_ids"}, where
+    `base` is the account's task collection path.
+    """
+    r = await client.post("/api/v1/auth/register", json={"email": email, "password": PASSWORD})
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    user_id = (await client.get("/api/v1/auth/me", headers=headers)).json()["id"]
+    base = f"/api/v1/{user_id}/tasks"
+    task_ids = []
+    for start in range(0, len(tasks), 500):
+        operations = [{"op": "create", **task} for task in tasks[start:start + 500]]
+        r = await client.post(f"{base}/bulk", json={"operations": operations}, headers=headers)
+        r.raise_for_status()
+        task_ids.extend(result["id"] for result in r.json()["results"])
+    return {"email": email, "headers": headers, "base": base, "task_ids": task_ids}
+
+
+async def seed(client, users: int, tasks_per_user: int, rng: random.Random) -> list:
+    accounts = []
+    for n in range(users):
+        tasks = [
+            {"title": " ".join(rng.sample(WORDS, 3)) + f" {i}", "completed": i % 3 == 0} for i in range(tasks_per_user)
+        ]
+        accounts.append(await seed_account(client, f"bench{n}@example.com", tasks))
+    return accounts
+
+
+def run_child(module: str, argv: List[str], env: Dict[str, str]) -> dict:
+    """
+    Runs `python -m <module> --child <argv>` with `env` added to the
+    environment, on a temporary SQLite database, and returns the JSON result
+    it prints. For settings that are read when the app is imported.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}", **env)
+        output = subprocess.run(
+            [sys.executable, "-m", module, "--child", *argv], env=env, capture_output=True, text=True, check=True,
+        ).stdout
+    # The app prints start-up chatter; the result is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def best_of_rounds(
+    rounds: int, module: str, argv: List[str], variants: Dict[str, Dict[str, str]], p50: Callable[[dict], float]
+) -> Dict[str, dict]:
+    """
+    Runs each variant (its environment overrides) `rounds` times through
+    `run_child`, alternating between them to spread out machine noise, and
+    keeps the result of each variant's fastest round by `p50(result)`.
+    """
+    best = {}
+    for _ in range(rounds):
+        for name, env in variants.items():
+            result = run_child(module, argv, env)
+            if name not in best or p50(result) < p50(best[name]):
+                best[name] = result
+    return best
+
+
+async def run_scenarios(args, scenarios) -> dict:
+    rng = random.Random(args.seed)
+    async with app_client() as client:
+        seed_start = time.perf_counter()
+        accounts = await seed(client, args.users, args.tasks_per_user, rng)
+        seed_seconds = time.perf_counter() - seed_start
+
+        def account(i: int) -> dict:
+            return accounts[i % len(accounts)]
+
+        def task_id(i: int) -> int:
+            ids = account(i)["task_ids"]
+            return ids[(i // len(accounts)) % len(ids)]
+
+        created = []  # (account, task id) made by `create`, for `delete`
+
+        async def create(i):
+            a = account(i)
+            r = await client.post(a["base"], json={"title": f"new task {i}"}, headers=a["headers"])
+            if r.status_code < 400:
+                created.append((a, r.json()["id"]))
+            return r
+
+        async def delete(i):
+            a, new_id = created[i]
+            return await client.delete(f"{a['base']}/{new_id}", headers=a["headers"])
+
+        requests = {
+            "login": lambda i: client.post(
+                "/api/v1/auth/login", data={"username": account(i)["email"], "password": PASSWORD}
+            ),
+            "me": lambda i: client.get("/api/v1/auth/me", headers=account(i)["headers"]),
+            "create": create,
+            "read": lambda i: client.get(f"{account(i)['base']}/{task_id(i)}", headers=account(i)["headers"]),
+            "update": lambda i: client.put(
+                f"{account(i)['base']}/{task_id(i)}", json={"title": f"updated {i}"}, headers=account(i)["headers"]
+            ),
+            "toggle": lambda i: client.patch(f"{account(i)['base']}/{task_id(i)}/complete", headers=account(i)["headers"]),
+            "delete": delete,
+            "list_page": lambda i: client.get(account(i)["base"], params={"limit": 50}, headers=account(i)["headers"]),
+            "list_full": lambda i: client.get(account(i)["base"], headers=account(i)["headers"]),
+            "search": lambda i: client.get(
+                account(i)["base"], params={"search": rng.choice(WORDS)}, headers=account(i)["headers"]
+            ),
+            "chat_turn": lambda i: client.post(
+                "/api/v1/chat", json={"message": f"show my tasks {i}"}, headers=account(i)["headers"]
+            ),
+        }
+
+        results = {}
+        for name in scenarios:
+            if name == "delete" and not created:
+                # Deletes remove what `create` made, so the seeded data stays the same for later runs
+                for i in range(args.requests):
+                    await create(i)
+            total = min(args.requests, len(created)) if name == "delete" else args.requests
+            results[name] = await measure(requests[name], total, args.concurrency)
+            print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    return {"seed_seconds": round(seed_seconds, 2), "scenarios": results}
+
+
+def compare(base_path: str, new_path: str):
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def change(old, current) -> str:
+        return f"{(current - old) / old * 100:+.1f}%" if old else "n/a"
+
+    # Runs are only comparable under the same settings
+    for key, value in base["meta"].items():
+        if key not in ("timestamp", "git_revision", "seed_seconds") and new["meta"].get(key) != value:
+            print(f"warning: {key} differs: {value} -> {new['meta'].get(key)}")
+    print(f"{base['meta']['git_revision']} -> {new['meta']['git_revision']}")
+    print(f"{'scenario':<12}" + "".join(f"{header:>28}" for header in ("rps", "p50 ms", "p99 ms")))
+    for name, old in base["scenarios"].items():
+        current = new["scenarios"].get(name)
+        if current is None:
+            continue
+        cells = [
+            f"{old[key]:.1f} -> {current[key]:.1f} ({change(old[key], current[key])})"
+            for key in ("rps", "p50_ms", "p99_ms")
+        ]
+        print(f"{name:<12}" + "".join(f"{cell:>28}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Defaults to a SQLite file on tmpfs.")
+    parser.add_argument("--db-async", action="store_true", help="Run with DB_ASYNC=true.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--agent-delay-ms", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Also write the results to this file.")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files and exit.")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    agent = None
+    tmp = tempfile.TemporaryDirectory(dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    try:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+        os.environ.update(DATABASE_URL=database_url, DB_ASYNC="true" if args.db_async else "false", AI_AGENT_MODE="http")
+        if "chat_turn" in scenarios:
+            from benchmarks.agent_client import free_port, wait_for
+
+            port = free_port()
+            agent_url = f"http://127.0.0.1:{port}/chat"
+            agent = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.stub_agent", "--port", str(port), "--delay-ms", str(args.agent_delay_ms)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            wait_for(agent_url)
+            os.environ.update(AI_AGENT_URL=agent_url, AI_AGENT_STREAM_URL=f"{agent_url}/stream")
+
+        results = asyncio.run(run_scenarios(args, scenarios))
+    finally:
+        if agent is not None:
+            agent.terminate()
+            agent.wait()
+        tmp.cleanup()
+
+    from sqlalchemy.engine import make_url
+
+    document = {
+        "meta": {
+            "timestamp": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "database": make_url(database_url).get_backend_name(),
+            "db_async": args.db_async,
+            "users": args.users,
+            "tasks_per_user": args.tasks_per_user,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "agent_delay_ms": args.agent_delay_ms,
+            "seed_seconds": results["seed_seconds"],
+        },
+        "scenarios": results["scenarios"],
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    print(json.dumps(document))
+
+
+if __name__ == "__main__":
+    main()
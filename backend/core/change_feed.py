@@ -0,0 +1,314 @@
+# backend\core\change_feed.py
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+
+from core.config import settings
+
+Deliver = Callable[[int, List[Dict[str, Any]]], None]
+Resync = Callable[[], None]
+
+
+class Subscription:
+    """
+    One subscriber's bounded event buffer. A subscriber that falls more than
+    TASK_CHANGE_QUEUE_SIZE events behind is marked `overflowed` and gets no
+    more events, so a stalled client can't grow the worker's memory; it
+    reconnects and catches up through the delta sync endpoint. Subscribers
+    that may have missed events for another reason are dropped the same way.
+    """
+
+    def __init__(self, user_id: int, max_size: int):
+        self.user_id = user_id
+        self.max_size = max_size
+        self.overflowed = False
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+
+    def put(self, events: List[Dict[str, Any]]):
+        if self.overflowed:
+            return
+        if len(self._events) + len(events) > self.max_size:
+            self.drop()
+        else:
+            self._events.extend(events)
+            self._ready.set()
+
+    def drop(self):
+        self.overflowed = True
+        self._events.clear()
+        self._ready.set()
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Waits for events and returns all that are buffered, or [] on timeout.
+
+        :raises OverflowError: once the subscriber has been dropped for falling behind.
+        """
+        if not self._events and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        if self.overflowed:
+            raise OverflowError("subscriber fell behind")
+        batch = list(self._events)
+        self._events.clear()
+        self._ready.clear()
+        return batch
+
+
+class ChangeHub:
+    """
+    In-process fan-out of task change events to the subscribers on this
+    worker's event loop.
+
+    Publishers may run on any thread (the threadpool in sync DB mode). A
+    publish costs one thread-safe hand-off to the loop, however many
+    subscribers there are; the loop then appends the events to each of the
+    user's queues. Users without a subscriber here cost a dict lookup.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, user_id: int, max_size: int) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, max_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def deliver(self, user_id: int, events: List[Dict[str, Any]]):
+        """
+        Hands events to the user's local subscribers; callable from any thread.
+        """
+        loop = self._loop
+        if loop is None or user_id not in self._subscribers or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._fan_out, user_id, events)
+
+    def _fan_out(self, user_id: int, events: List[Dict[str, Any]]):
+        for subscription in tuple(self._subscribers.get(user_id, ())):
+            subscription.put(events)
+
+    def resync(self):
+        """
+        Drops every local subscriber, whose streams then end with a `resync`
+        event, after events may have been lost. Called on the event loop.
+        """
+        for subscribers in tuple(self._subscribers.values()):
+            for subscription in tuple(subscribers):
+                subscription.drop()
+
+
+class ChangeBroker(ABC):
+    """
+    Carries published events to every worker's hub. `start` is called on
+    application startup with the local hub's `deliver`, and its `resync` for
+    when the broker may have lost events; `stop` on shutdown.
+    """
+
+    @abstractmethod
+    def publish(self, user_id: int, events: List[Dict[str, Any]]):
+        ...
+
+    @abstractmethod
+    async def start(self, deliver: Deliver, resync: Resync):
+        ...
+
+    async def stop(self):
+        pass
+
+
+class InMemoryBroker(ChangeBroker):
+    """
+    Delivers straight to this process's hub. Only correct with a single
+    process; also the stand-in for the Redis broker in tests and benchmarks.
+    """
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def publish(self, user_id: int, events: List[Dict[str, Any]]):
+        if self._deliver is not None:
+            self._deliver(user_id, events)
+
+    async def start(self, deliver: Deliver, resync: Resync):
+        self._deliver = deliver
+
+
+class RedisBroker(ChangeBroker):
+    """
+    Shares events between workers and pods over one Redis pub/sub channel.
+    Each worker holds one subscription to it, whatever its number of clients,
+    and drops messages for users with no subscriber there. Delivery is
+    best-effort (Redis pub/sub doesn't buffer for a disconnected worker):
+    when the subscription is lost the worker subscribes again, backing off
+    while Redis is down, then sends its local streams a `resync`; clients
+    cover the gap with the delta sync endpoint.
+
+    Once started, publishing only queues the message on the event loop; one
+    task sends the queue in order with the async client, so a slow or
+    unreachable Redis never blocks the loop or a request's thread.
+    """
+
+    CHANNEL = "task_changes"
+    # Messages waiting to be published; further ones are dropped while Redis is slow or down
+    OUTBOX_SIZE = 10000
+    # Seconds between attempts to subscribe again: the first, then the cap
+    RECONNECT_MIN = 0.5
+    RECONNECT_MAX = 30.0
+
+    def __init__(self, url: str):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise RuntimeError("TASK_CHANGE_BROKER=redis needs the 'redis' package")
+        self._url = url
+        self._errors = redis.RedisError
+        # Only used before start, e.g. by scripts that don't serve streams
+        self._redis = redis.Redis.from_url(url, socket_timeout=1)
+        self._async_redis = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def publish(self, user_id: int, events: List[Dict[str, Any]]):
+        message = json.dumps({"user_id": user_id, "events": events})
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._redis.publish(self.CHANNEL, message)
+            return
+        loop.call_soon_threadsafe(self._enqueue, message)
+
+    def _enqueue(self, message: str):
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            print("Could not publish task changes: the Redis outbox is full")
+
+    async def _send(self):
+        while True:
+            message = await self._outbox.get()
+            try:
+                await self._async_redis.publish(self.CHANNEL, message)
+            except self._errors as e:
+                # The write is already committed; a lost event is recovered by delta sync
+                print(f"Could not publish task changes: {e!r}")
+
+    async def _subscribe(self):
+        pubsub = self._async_redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.CHANNEL)
+        except BaseException:
+            await pubsub.aclose()
+            raise
+        return pubsub
+
+    async def _listen(self, deliver: Deliver, resync: Resync):
+        delay = self.RECONNECT_MIN
+        missed = False
+        while True:
+            try:
+                pubsub = await self._subscribe()
+            except self._errors as e:
+                print(f"Could not subscribe to task changes, retrying in {delay:.1f}s: {e!r}")
+            else:
+                try:
+                    if missed:
+                        print("Subscribed to task changes again; resyncing streams")
+                        resync()
+                    missed = False
+                    delay = self.RECONNECT_MIN
+                    async for message in pubsub.listen():
+                        payload = json.loads(message["data"])
+                        deliver(payload["user_id"], payload["events"])
+                except self._errors as e:
+                    print(f"Lost the task changes subscription, retrying in {delay:.1f}s: {e!r}")
+                finally:
+                    await pubsub.aclose()
+            missed = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX)
+
+    async def start(self, deliver: Deliver, resync: Resync):
+        import redis.asyncio
+
+        # No read timeout: the subscription waits for messages indefinitely
+        self._async_redis = redis.asyncio.Redis.from_url(self._url, socket_connect_timeout=1)
+        self._outbox = asyncio.Queue(self.OUTBOX_SIZE)
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [asyncio.create_task(self._send()), asyncio.create_task(self._listen(deliver, resync))]
+
+    async def stop(self):
+        self._loop = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._async_redis is not None:
+            await self._async_redis.aclose()
+            self._async_redis = None
+
+
+class ChangeFeed:
+    """
+    Per-user stream of task changes. TaskService publishes after each commit;
+    stream endpoints subscribe. Events are {"op": "upsert", "task": {...}} or
+    {"op": "delete", "id": ...}, each with the delta sync `cursor` that
+    includes it.
+    """
+
+    def __init__(self, broker: ChangeBroker):
+        self.broker = broker
+        self.hub = ChangeHub()
+
+    def publish(self, user_id: int, events: List[Dict[str, Any]]):
+        if not events:
+            return
+        try:
+            self.broker.publish(user_id, events)
+        except Exception as e:
+            # The write is already committed; a lost event is recovered by delta sync
+            print(f"Could not publish task changes: {e!r}")
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int, max_size: Optional[int] = None) -> AsyncIterator[Subscription]:
+        subscription = self.hub.subscribe(user_id, max_size or settings.TASK_CHANGE_QUEUE_SIZE)
+        try:
+            yield subscription
+        finally:
+            self.hub.unsubscribe(subscription)
+
+    async def start(self):
+        await self.broker.start(self.hub.deliver, self.hub.resync)
+
+    async def stop(self):
+        await self.broker.stop()
+
+
+def create_change_feed(kind: Optional[str] = None) -> ChangeFeed:
+    kind = kind or settings.TASK_CHANGE_BROKER
+    if kind == "memory":
+        return ChangeFeed(InMemoryBroker())
+    if kind == "redis":
+        return ChangeFeed(RedisBroker(settings.REDIS_URL))
+    raise ValueError(f"TASK_CHANGE_BROKER must be 'memory' or 'redis', not {kind!r}")
+
+
+task_changes = create_change_feed()
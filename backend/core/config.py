@@ -11,11 +11,85 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8 # 8 days
 
+    # Authenticated-principal cache used by get_current_user (see core/principal_cache.py)
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_TTL: int = 60 # seconds
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # Password hashing: bcrypt cost and the dedicated worker pool (see core/security.py)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32 # running + queued hashes before answering 503
+
     BETTER_AUTH_SECRET: str = 'change-this-secret'
     BETTER_AUTH_URL: str = 'http://localhost:3000'
 
     # Database
     DATABASE_URL: str
+    # Serve requests from an AsyncSession (asyncpg / aiosqlite) instead of the threadpool-bound sync Session
+    DB_ASYNC: bool = False
+    # Connection pool, shared by every engine user in the process (see core/database.py)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30 # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800 # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False # log every SQL statement
+    # Start-up (see core/startup.py)
+    DB_CREATE_SCHEMA: bool = True # create missing tables on every start; turn off when `python -m core.schema` runs once per release
+    STARTUP_WARMUP: bool = True # open the pool's connections and warm caches before /readyz passes
+
+    # Chat history sent to the AI agent (see ChatService.get_history_window)
+    CHAT_HISTORY_MAX_MESSAGES: int = 50 # 0 sends the whole conversation
+    CHAT_HISTORY_MAX_TOKENS: int = 0 # approximate token budget for the window; 0 disables
+    CHAT_HISTORY_SUMMARY: bool = False # keep a rolling summary of messages outside the window
+
+    # AI agent service called on every chat turn (see services/agent_client.py)
+    # "http" calls AI_AGENT_URL; "mock" answers in-process with the intent matcher (ai_agent/mock_agent.py)
+    AI_AGENT_MODE: str = "http"
+    AI_AGENT_URL: str = "http://localhost:8001/chat"
+    AI_AGENT_STREAM_URL: str = "http://localhost:8001/chat/stream" # Server-Sent Events variant of AI_AGENT_URL
+    AI_AGENT_CONNECT_TIMEOUT: float = 5.0 # seconds, also used for sending the request
+    AI_AGENT_READ_TIMEOUT: float = 60.0 # seconds to wait for the agent's reply, or for the next streamed chunk
+    AI_AGENT_POOL_TIMEOUT: float = 5.0 # seconds to wait for a free pooled connection
+    AI_AGENT_MAX_CONNECTIONS: int = 100
+    AI_AGENT_MAX_KEEPALIVE: int = 20
+    AI_AGENT_KEEPALIVE_EXPIRY: float = 30.0 # seconds an idle connection is kept open
+    AI_AGENT_HTTP2: bool = False # requires httpx[http2]
+
+    # Per-user task list versions behind the list ETag (see core/version_store.py)
+    TASK_VERSION_STORE: str = "memory" # "memory" for a single process, "redis" when several workers or replicas serve requests
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Real-time task change feed (see core/change_feed.py)
+    TASK_CHANGE_BROKER: str = "memory" # "memory" within one process, "redis" to share events between workers and pods
+    TASK_CHANGE_QUEUE_SIZE: int = 256 # events buffered per subscriber; one that falls further behind is disconnected
+    TASK_CHANGE_KEEPALIVE: float = 15.0 # seconds between keep-alive comments on an idle stream
+
+    # Bearer token for the operational endpoints (pool, cache and feed stats, metrics); unset, they answer 404
+    OPS_TOKEN: str = ""
+
+    # Per-route request metrics at /metrics (see core/metrics.py)
+    METRICS_ENABLED: bool = True
+
+    # SQL statement budgets on endpoints and services (see core/query_budget.py)
+    QUERY_BUDGET_MODE: str = "log" # "off", "log" a warning when a budget is exceeded, or "raise" (tests and CI)
+
+    # Per-user admission control (see core/rate_limit.py); over budget answers 429 with Retry-After
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory" # "memory" for a single process, "redis" when several workers or replicas serve requests
+    RATE_LIMIT_CHEAP_PER_SECOND: float = 50.0 # task reads and writes, per user
+    RATE_LIMIT_CHEAP_BURST: int = 100
+    RATE_LIMIT_CHEAP_CONCURRENCY: int = 20 # per user, per worker
+    RATE_LIMIT_EXPENSIVE_PER_SECOND: float = 1.0 # chat, bulk changes and password hashing, per user (per client address for login)
+    RATE_LIMIT_EXPENSIVE_BURST: int = 10
+    RATE_LIMIT_EXPENSIVE_CONCURRENCY: int = 2
+
+    # Idempotency-Key on task creation and chat turns (see services/idempotency_service.py)
+    IDEMPOTENCY_KEY_TTL: int = 86400 # seconds a stored response is replayed to retries
+    IDEMPOTENCY_LOCK_TIMEOUT: int = 300 # seconds before the key of a request that never finished can be used again
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 60.0 # seconds a retry waits for the first request to finish before a 409
+    IDEMPOTENCY_PURGE_INTERVAL: int = 3600 # seconds between deletes of expired keys
 
     # CORS
     BACKEND_CORS_ORIGINS: str = "" # Changed to string, default empty
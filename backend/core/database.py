@@ -0,0 +1,199 @@
+# backend\core\database.py
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import create_engine
+
+from core.config import settings
+from core.metrics import instrument_engine, record_pool_wait
+from core.query_budget import watch_engine
+
+# Async drivers used when DB_ASYNC is enabled
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+class PoolMetrics:
+    """
+    Live counters for one engine's connection pool.
+
+    Checkout wait time is measured around the pool's internal get, so it covers
+    both queueing for a free connection and opening a new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.closed_lifetime_seconds_total = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_connect(self, connection_record):
+        connection_record.info["opened_at"] = time.monotonic()
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_close(self, connection_record):
+        opened_at = connection_record.info.pop("opened_at", None)
+        if opened_at is None:
+            return
+        with self._lock:
+            self.connections_closed += 1
+            self.closed_lifetime_seconds_total += time.monotonic() - opened_at
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "closed_lifetime_seconds_avg": (
+                    round(self.closed_lifetime_seconds_total / self.connections_closed, 3)
+                    if self.connections_closed else 0.0
+                ),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            })
+        return stats
+
+
+class _TimedPoolMixin:
+    _metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            if self._metrics is not None:
+                self._metrics.record_wait(waited)
+            record_pool_wait(waited)
+
+    def recreate(self):
+        # Engine.dispose() swaps in a fresh pool; keep reporting into the same metrics
+        pool = super().recreate()
+        pool._metrics = self._metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Rewrites a sync DATABASE_URL for its async driver.
+
+    asyncpg takes `ssl` instead of libpq's `sslmode` and has no `channel_binding` option.
+    """
+    url = make_url(database_url)
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+    if url.drivername == "postgresql+asyncpg":
+        query = dict(url.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+        url = url.set(query=query)
+    return url.render_as_string(hide_password=False)
+
+
+def _engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    Pool and logging options from Settings.
+
+    Sizing only applies to queue pools; SQLite in-memory databases use
+    single-connection pools that take no size or timeout.
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    default_pool = url.get_dialect().get_pool_class(url)
+    if issubclass(default_pool, QueuePool):
+        timed_pool = TimedAsyncAdaptedQueuePool if issubclass(default_pool, AsyncAdaptedQueuePool) else TimedQueuePool
+        options.update({
+            "poolclass": timed_pool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+        })
+    return options
+
+
+def _instrument(pool, sync_engine: Engine, metrics: PoolMetrics):
+    if isinstance(pool, _TimedPoolMixin):
+        pool._metrics = metrics
+    event.listen(sync_engine, "connect", lambda dbapi_conn, record: metrics.record_connect(record))
+    event.listen(sync_engine, "close", lambda dbapi_conn, record: metrics.record_close(record))
+    event.listen(sync_engine, "invalidate", lambda dbapi_conn, record, exc: metrics.record_close(record))
+    if settings.METRICS_ENABLED:
+        instrument_engine(sync_engine)
+    if settings.QUERY_BUDGET_MODE != "off":
+        watch_engine(sync_engine)
+
+
+def create_db_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Creates a sync engine configured from Settings, with pool metrics attached.
+    """
+    database_url = database_url or settings.DATABASE_URL
+    db_engine = create_engine(database_url, **_engine_options(database_url))
+    db_engine.pool_metrics = PoolMetrics()
+    _instrument(db_engine.pool, db_engine, db_engine.pool_metrics)
+    return db_engine
+
+
+def create_async_db_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """
+    Creates the async counterpart of `create_db_engine` on the asyncpg / aiosqlite driver.
+    """
+    database_url = get_async_database_url(database_url or settings.DATABASE_URL)
+    db_engine = create_async_engine(database_url, **_engine_options(database_url))
+    db_engine.sync_engine.pool_metrics = PoolMetrics()
+    _instrument(db_engine.sync_engine.pool, db_engine.sync_engine, db_engine.sync_engine.pool_metrics)
+    return db_engine
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Current pool statistics for the shared engines.
+    """
+    stats = {"sync": engine.pool_metrics.snapshot(engine.pool)}
+    if async_engine is not None:
+        sync_engine = async_engine.sync_engine
+        stats["async"] = sync_engine.pool_metrics.snapshot(sync_engine.pool)
+    return stats
+
+
+# Shared by the app, its dependencies and start-up DDL
+engine = create_db_engine()
+async_engine = create_async_db_engine() if settings.DB_ASYNC else None
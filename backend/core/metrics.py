@@ -0,0 +1,279 @@
+# backend\core\metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Request latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# SQL statements per request
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Exposed metric families: name -> (type, help)
+FAMILIES = {
+    "http_requests_total": ("counter", "Requests by route and status."),
+    "http_request_duration_seconds": ("histogram", "Request latency."),
+    "http_request_db_statements": ("histogram", "SQL statements run per request."),
+    "http_request_db_seconds_total": ("counter", "Time requests spent executing SQL."),
+    "http_request_pool_wait_seconds_total": ("counter", "Time requests spent waiting for a pooled DB connection."),
+    "http_request_external_seconds_total": ("counter", "Time requests spent in calls to the AI agent or MCP tools."),
+    "db_pool_checkouts_total": ("counter", "Pooled connection checkouts."),
+    "db_pool_wait_seconds_total": ("counter", "Time spent waiting for pooled connections."),
+    "db_pool_checked_out": ("gauge", "Connections currently checked out."),
+    "db_pool_size": ("gauge", "Configured pool size."),
+}
+# Pool families, by their key in get_pool_stats()
+POOL_FAMILIES = {
+    "db_pool_checkouts_total": "checkouts",
+    "db_pool_wait_seconds_total": "wait_seconds_total",
+    "db_pool_checked_out": "checked_out",
+    "db_pool_size": "size",
+}
+
+
+class RequestStats:
+    """
+    What one request spent outside its own code, accumulated while it runs.
+    """
+
+    __slots__ = ("statements", "db_seconds", "pool_wait_seconds", "external_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.external_seconds: Dict[str, float] = {}
+
+
+# Set by MetricsMiddleware for the duration of a request. Threadpool calls run
+# in a copy of the context, which still points at the same RequestStats.
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def record_pool_wait(seconds: float):
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+@contextmanager
+def track_external(target: str) -> Iterator[None]:
+    """
+    Adds the time spent in the block to the current request's calls to `target` ("ai_agent", "mcp").
+    """
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.external_seconds[target] = stats.external_seconds.get(target, 0.0) + time.perf_counter() - start
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = getattr(context, "_metrics_start", None)
+    if stats is not None and start is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - start
+
+
+def instrument_engine(sync_engine: Engine):
+    """
+    Counts and times the SQL statements each request runs on `sync_engine`
+    (for an AsyncEngine, pass its `sync_engine`). Statements outside a request
+    cost one context variable lookup.
+    """
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteMetrics:
+    __slots__ = ("responses", "latency", "statements", "db_seconds", "pool_wait_seconds", "external_seconds")
+
+    def __init__(self):
+        self.responses: Dict[int, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.external_seconds: Dict[str, float] = {}
+
+
+def _labels(**labels: Any) -> str:
+    def escape(value: Any) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: Dict[str, Any]) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {histogram.count}')
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+class RequestMetrics:
+    """
+    Per-route request metrics of this process, in the Prometheus text format.
+
+    Routes are labelled by their path template ("/api/v1/{user_id}/tasks"),
+    so the label set stays bounded; requests that match no route share the
+    "unmatched" label.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.responses[status] = metrics.responses.get(status, 0) + 1
+            metrics.latency.observe(seconds)
+            metrics.statements.observe(stats.statements)
+            metrics.db_seconds += stats.db_seconds
+            metrics.pool_wait_seconds += stats.pool_wait_seconds
+            for target, spent in stats.external_seconds.items():
+                metrics.external_seconds[target] = metrics.external_seconds.get(target, 0.0) + spent
+
+    def render(self, pool_stats: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """
+        All metrics in the Prometheus text format; `pool_stats` is `core.database.get_pool_stats()`.
+        """
+        samples: Dict[str, List[str]] = {name: [] for name in FAMILIES}
+        with self._lock:
+            for (method, route), metrics in sorted(self._routes.items()):
+                labels = {"method": method, "route": route}
+                for status, count in sorted(metrics.responses.items()):
+                    samples["http_requests_total"].append(f"http_requests_total{_labels(**labels, status=status)} {count}")
+                samples["http_request_duration_seconds"].extend(
+                    _histogram_lines("http_request_duration_seconds", metrics.latency, labels)
+                )
+                samples["http_request_db_statements"].extend(
+                    _histogram_lines("http_request_db_statements", metrics.statements, labels)
+                )
+                samples["http_request_db_seconds_total"].append(
+                    f"http_request_db_seconds_total{_labels(**labels)} {metrics.db_seconds}"
+                )
+                samples["http_request_pool_wait_seconds_total"].append(
+                    f"http_request_pool_wait_seconds_total{_labels(**labels)} {metrics.pool_wait_seconds}"
+                )
+                for target, spent in sorted(metrics.external_seconds.items()):
+                    samples["http_request_external_seconds_total"].append(
+                        f"http_request_external_seconds_total{_labels(**labels, target=target)} {spent}"
+                    )
+        for engine_name, stats in (pool_stats or {}).items():
+            for name, key in POOL_FAMILIES.items():
+                if key in stats:
+                    samples[name].append(f"{name}{_labels(engine=engine_name)} {stats[key]}")
+
+        output = []
+        for name, (kind, help_text) in FAMILIES.items():
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(samples[name])
+        return "\n".join(output) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+# id(route) -> its full path template; routes live as long as the app, and a route's prefix never changes
+_route_labels: Dict[int, str] = {}
+
+
+def route_label(scope) -> str:
+    """
+    The matched route's full path template, e.g. "/api/v1/{user_id}/tasks".
+
+    Routes in included routers only know their path below the router's
+    prefix, so the prefix is recovered once per route from the first request
+    path it matched.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    label = _route_labels.get(id(route))
+    if label is None:
+        template = getattr(route, "path_format", None) or getattr(route, "path", "")
+        try:
+            concrete = template.format(**scope.get("path_params", {}))
+        except (KeyError, IndexError, ValueError):
+            return template or "unmatched"
+        path = scope["path"]
+        if not path.endswith(concrete):
+            # A parameter was written differently in the URL ("007" for 7); try again on the next request
+            return template or "unmatched"
+        label = _route_labels[id(route)] = path[:len(path) - len(concrete)] + template
+    return label
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times each HTTP request and records it, with the SQL,
+    pool wait and external call time it accumulated, in `request_metrics`.
+    For a streaming response the duration runs until the stream ends.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            request_metrics.observe(scope["method"], route_label(scope), status, time.perf_counter() - start, stats)
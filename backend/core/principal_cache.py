@@ -0,0 +1,117 @@
+# backend\core\principal_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+
+from core.config import settings
+from models.user import User
+
+# Columns copied into the cached snapshot; the password hash is deliberately left out.
+SNAPSHOT_FIELDS = ("id", "email", "full_name", "created_at", "updated_at")
+
+
+class PrincipalCache:
+    """
+    Bounded LRU + TTL cache of authenticated principals, keyed by access token.
+
+    Each entry holds the decoded JWT claims and a snapshot of the user row, so a
+    hit skips both the JWT decode and the user lookup. Entries never outlive the
+    token's own `exp`. Invalidation is per process; on multiple replicas the TTL
+    bounds how long another pod can serve a stale snapshot.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], Dict[str, Any]]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[Tuple[Dict[str, Any], User]]:
+        """
+        Returns (claims, detached User) for a cached token, or None on a miss.
+
+        A new User instance is built on every hit so that requests never share
+        (or attach to a session) the same object.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            _, claims, snapshot = entry
+        return claims, User(**snapshot)
+
+    def put(self, token: str, claims: Dict[str, Any], user: User):
+        expires_at = time.time() + self.ttl
+        if claims.get("exp") is not None:
+            expires_at = min(expires_at, float(claims["exp"]))
+        snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (expires_at, claims, snapshot)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """
+        Drops every cached token of a user; call after the user row changes or is deleted.
+        """
+        with self._lock:
+            tokens = self._tokens_by_user.pop(user_id, set())
+            for token in tokens:
+                self._entries.pop(token, None)
+            if tokens:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": settings.PRINCIPAL_CACHE_ENABLED,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, token: str):
+        _, _, snapshot = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(snapshot["id"])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[snapshot["id"]]
+
+
+principal_cache = PrincipalCache(max_size=settings.PRINCIPAL_CACHE_MAX_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+
+
+# Any ORM write to a user row, whichever code path issues it, drops that user's cached principals.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_write(mapper, connection, target: User):
+    principal_cache.invalidate_user(target.id)
@@ -0,0 +1,163 @@
+# backend\core\query_budget.py
+import collections
+import functools
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+
+F = TypeVar("F", bound=Callable)
+
+# Distinct statements listed when a budget is exceeded, most repeated first
+REPORTED_STATEMENTS = 5
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised, with QUERY_BUDGET_MODE=raise, by code that ran more SQL statements than its budget.
+    """
+
+
+class QueryCounter:
+    """
+    The SQL statements run on a watched engine while the counter was active.
+    """
+
+    __slots__ = ("statements",)
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+# Counters active in this context, innermost last. Threadpool calls run in a
+# copy of the context, which still holds the same counters.
+_active: ContextVar[Tuple[QueryCounter, ...]] = ContextVar("query_counters", default=())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active.get():
+        counter.statements.append(statement)
+
+
+def watch_engine(sync_engine: Engine):
+    """
+    Makes the statements run on `sync_engine` count towards active budgets
+    (for an AsyncEngine, pass its `sync_engine`).
+    """
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Counts the statements run in the block, for tests:
+
+        with count_queries() as queries:
+            task_service.get_user_tasks(session, user)
+        assert queries.count == 1, queries.statements
+
+    Statements are counted in this context and the threadpool calls it makes:
+    TestClient serves requests from another thread, so count requests made
+    through httpx.ASGITransport, or use QUERY_BUDGET_MODE=raise. Only engines
+    from core.database are watched, and not with QUERY_BUDGET_MODE=off.
+    """
+    counter = QueryCounter()
+    token = _active.set(_active.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active.reset(token)
+
+
+def budget_report(name: str, limit: int, counter: QueryCounter) -> str:
+    repeated = collections.Counter(counter.statements).most_common(REPORTED_STATEMENTS)
+    lines = [f"{name} ran {counter.count} SQL statements, over its budget of {limit}:"]
+    lines.extend(f"  {times}x {' '.join(statement.split())}" for statement, times in repeated)
+    return "\n".join(lines)
+
+
+class QueryBudget:
+    """
+    An upper bound on the SQL statements a block or function runs, to catch
+    N+1 lazy loads as relationships and response fields grow.
+
+    Over budget, QUERY_BUDGET_MODE=log prints a warning listing the most
+    repeated statements and QUERY_BUDGET_MODE=raise raises
+    QueryBudgetExceeded, which is meant for tests and CI. Calls that raise
+    are not checked.
+    """
+
+    def __init__(self, limit: int, name: Optional[str] = None):
+        self.limit = limit
+        self.name = name
+        self._block = None
+
+    @contextmanager
+    def _enforced(self, name: str) -> Iterator[QueryCounter]:
+        with count_queries() as counter:
+            yield counter
+        if counter.count > self.limit:
+            report = budget_report(name, self.limit, counter)
+            if settings.QUERY_BUDGET_MODE == "raise":
+                raise QueryBudgetExceeded(report)
+            print(f"WARNING: {report}")
+
+    def __enter__(self) -> QueryCounter:
+        self._block = self._enforced(self.name or "query budget")
+        return self._block.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._block.__exit__(*exc_info)
+
+    def __call__(self, fn: F) -> F:
+        name = self.name or fn.__qualname__
+        if settings.QUERY_BUDGET_MODE == "off":
+            wrapper = fn
+        elif inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with self._enforced(name):
+                    return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self._enforced(name):
+                    return fn(*args, **kwargs)
+        wrapper.query_budget = self.limit
+        return wrapper
+
+
+def query_budget(limit: int, name: Optional[str] = None) -> QueryBudget:
+    """
+    Declares that a function, or a `with` block, runs at most `limit` SQL statements:
+
+        @router.get("/{user_id}/tasks/{id}", response_model=TaskResponse)
+        @query_budget(1)
+        async def read_task(...):
+
+    On an endpoint, the budget covers the endpoint function itself: its
+    dependencies (get_current_user) run before it, and a streaming response's
+    body runs after it returns.
+    """
+    return QueryBudget(limit, name)
+
+
+def unbudgeted_routes(*routers) -> List[str]:
+    """
+    "METHOD path" of the routes in `routers` whose endpoint declares no budget.
+    """
+    return [
+        f"{','.join(sorted(route.methods))} {route.path}"
+        for router in routers
+        for route in router.routes
+        if not hasattr(getattr(route, "endpoint", None), "query_budget")
+    ]
@@ -0,0 +1,202 @@
+# backend\core\rate_limit.py
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, NamedTuple, Optional, Tuple
+
+from core.config import settings
+
+
+class RateLimited(Exception):
+    """
+    Raised when a request is over its budget; answered with 429 and `Retry-After`.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+class Limit(NamedTuple):
+    per_second: float  # token bucket refill rate
+    burst: int  # token bucket size
+    concurrency: int  # requests in flight at once, per worker
+
+
+def limits_from_settings() -> Dict[str, Limit]:
+    return {
+        "cheap": Limit(
+            settings.RATE_LIMIT_CHEAP_PER_SECOND, settings.RATE_LIMIT_CHEAP_BURST, settings.RATE_LIMIT_CHEAP_CONCURRENCY
+        ),
+        "expensive": Limit(
+            settings.RATE_LIMIT_EXPENSIVE_PER_SECOND,
+            settings.RATE_LIMIT_EXPENSIVE_BURST,
+            settings.RATE_LIMIT_EXPENSIVE_CONCURRENCY,
+        ),
+    }
+
+
+class RateLimitBackend(ABC):
+    """
+    Token buckets, one per key: a bucket holds up to `burst` tokens, refills
+    at `per_second` and each request takes one.
+    """
+
+    @abstractmethod
+    async def take(self, key: str, per_second: float, burst: int) -> float:
+        """
+        Takes a token from `key`'s bucket. Returns 0 if there was one, else the
+        seconds until there will be. Runs on the event loop, so it must not block.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets held in this process. Only correct with a single process: each
+    worker or replica would grant the full budget again.
+    """
+
+    # Idle buckets are dropped once there are this many; a full bucket is the same as none
+    PRUNE_AT = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (tokens, updated at, full again at)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._prune_at = self.PRUNE_AT
+
+    async def take(self, key: str, per_second: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * per_second)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / per_second
+            if not wait:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / per_second)
+            if len(self._buckets) >= self._prune_at:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now: float):
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        self._prune_at = max(self.PRUNE_AT, 2 * len(self._buckets))
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Buckets shared by every worker and replica through Redis: one script call
+    per request, timed by the Redis clock, on the async client. If Redis is
+    unavailable requests are let through rather than refused.
+    """
+
+    SCRIPT = """
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local per_second = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+    local tokens = burst
+    if bucket[1] then
+        tokens = math.min(burst, tonumber(bucket[1]) + (now - tonumber(bucket[2])) * per_second)
+    end
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / per_second
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / per_second * 1000) + 1000)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the 'redis' package")
+        self._errors = redis.RedisError
+        self._redis = redis.asyncio.Redis.from_url(url, socket_timeout=1, decode_responses=True)
+        self._take = self._redis.register_script(self.SCRIPT)
+
+    async def take(self, key: str, per_second: float, burst: int) -> float:
+        try:
+            return float(await self._take(keys=[f"rate_limit:{key}"], args=[per_second, burst]))
+        except self._errors as e:
+            print(f"Rate limiting skipped, Redis is unavailable: {e!r}")
+            return 0.0
+
+
+class ConcurrencyLimiter:
+    """
+    Requests in flight per key in this worker. Concurrency protects the
+    worker's own connections and threads, so unlike the rate it isn't
+    shared: a user may have `concurrency` requests in flight on each worker.
+    Only used from the event loop.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, int] = {}
+
+    def acquire(self, key: str, limit: int) -> bool:
+        count = self._in_flight.get(key, 0)
+        if count >= limit:
+            return False
+        self._in_flight[key] = count + 1
+        return True
+
+    def release(self, key: str):
+        count = self._in_flight.pop(key) - 1
+        if count:
+            self._in_flight[key] = count
+
+
+class AdmissionControl:
+    """
+    Per-client rate and concurrency limits, with separate budgets per kind
+    of route ("cheap" task reads and writes, "expensive" chat, bulk and
+    password hashing).
+    """
+
+    def __init__(self, backend: RateLimitBackend, limits: Dict[str, Limit]):
+        self.backend = backend
+        self.limits = limits
+        self.concurrency = ConcurrencyLimiter()
+
+    @asynccontextmanager
+    async def admit(self, key: str, kind: str, hold: bool = True) -> AsyncIterator[None]:
+        """
+        Admits one request from `key` for the duration of the block, or raises
+        RateLimited. `hold=False` checks the rate only, for long-lived streams
+        that would otherwise hold a concurrency slot for their whole life.
+
+        The concurrency slot is taken first: a request refused for having too
+        many in flight doesn't spend a token.
+        """
+        limit = self.limits[kind]
+        bucket = f"{kind}:{key}"
+        if hold and not self.concurrency.acquire(bucket, limit.concurrency):
+            raise RateLimited(1.0)
+        try:
+            wait = await self.backend.take(bucket, limit.per_second, limit.burst)
+            if wait:
+                raise RateLimited(wait)
+            yield
+        finally:
+            if hold:
+                self.concurrency.release(bucket)
+
+
+def create_rate_limit_backend(kind: Optional[str] = None) -> RateLimitBackend:
+    kind = kind or settings.RATE_LIMIT_BACKEND
+    if kind == "memory":
+        return InMemoryRateLimitBackend()
+    if kind == "redis":
+        return RedisRateLimitBackend(settings.REDIS_URL)
+    raise ValueError(f"RATE_LIMIT_BACKEND must be 'memory' or 'redis', not {kind!r}")
+
+
+admission_control = AdmissionControl(create_rate_limit_backend(), limits_from_settings())
@@ -0,0 +1,67 @@
+# backend\core\schema.py
+import time
+from typing import List
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn
+from sqlmodel import SQLModel
+
+
+def _add_missing_columns(connection: Connection) -> List[str]:
+    """
+    Adds the model columns an existing table lacks, e.g. `task.change_seq` on
+    a database created before it. Returns "table.column" for each one added.
+
+    :raises RuntimeError: for a missing NOT NULL column with no server default,
+        which can't be added to a table that has rows.
+    """
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    added = []
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing:
+            continue  # create_all creates it whole
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            if column.primary_key or (not column.nullable and column.server_default is None):
+                raise RuntimeError(
+                    f"Can't add {table.name}.{column.name} to the existing table: "
+                    "it is part of the primary key or NOT NULL without a server default"
+                )
+            spec = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {connection.dialect.identifier_preparer.format_table(table)} ADD COLUMN {spec}")
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def create_schema(db_engine: Engine):
+    """
+    Brings the database up to the models, in one transaction: adds missing
+    columns to existing tables, creates missing tables and the indexes of
+    every table, including the full-text search index. Columns are never
+    dropped or changed.
+    """
+    # Register every table and the search index DDL on the metadata
+    import models  # noqa: F401
+    import services.task_search  # noqa: F401
+
+    with db_engine.begin() as connection:
+        for column in _add_missing_columns(connection):
+            print(f"Added column {column}")
+        SQLModel.metadata.create_all(connection)
+        # create_all only indexes the tables it creates
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+if __name__ == "__main__":
+    # Run once per release when the app starts with DB_CREATE_SCHEMA=false (k8s/backend-schema-job.yaml)
+    from core.database import engine
+
+    start = time.perf_counter()
+    create_schema(engine)
+    print(f"Schema is up to date ({time.perf_counter() - start:.2f}s)")
@@ -1,13 +1,26 @@
 # backend\core\security.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from jose import jwt, ExpiredSignatureError, JWTError
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Callable, Tuple, TypeVar, Union, Optional
 
 from passlib.context import CryptContext
 
 from core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
+T = TypeVar("T")
+
+# Pinning min/max rounds to the configured cost makes hashes with any other cost "need update",
+# so they are rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt_sha256"],
+    deprecated="auto",
+    bcrypt_sha256__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt_sha256__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt_sha256__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 
 
@@ -47,6 +60,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password and, if the stored hash uses an outdated cost, returns a replacement hash.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+
 def get_password_hash(password: str) -> str:
 
     return pwd_context.hash(password)
@@ -89,4 +110,45 @@ def decode_token(token: str) -> Optional[str]:
 
         # Any other JWT error
 
-        return None
\ No newline at end of file
+        return None
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the hashing queue is full; callers should answer 503 with Retry-After.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, size-limited thread pool.
+
+    bcrypt releases the GIL, so a few threads give real parallelism, and a burst
+    of logins queues here instead of occupying the request threadpool. At most
+    `max_pending` hashes may be running or waiting; beyond that `run` fails fast
+    with PasswordHasherBusy rather than letting latency grow without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self.run(verify_and_update_password, plain_password, hashed_password)
+
+
+password_hasher = PasswordHasher(workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,130 @@
+# backend\core\startup.py
+import asyncio
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+# Seconds between attempts while a start-up step keeps failing; the last one repeats
+RETRY_DELAYS = (1, 2, 5, 10, 30)
+
+Step = Tuple[str, Callable[[], Awaitable[Any]]]
+
+
+def _pool_size(db_engine: Engine) -> int:
+    # Single-connection pools (SQLite in memory) have nothing to open ahead
+    return db_engine.pool.size() if isinstance(db_engine.pool, QueuePool) else 1
+
+
+def warm_pool(db_engine: Engine):
+    """
+    Opens the pool's persistent connections (DB_POOL_SIZE) side by side and
+    returns them to it, so the first requests don't pay for connects and TLS.
+    """
+    size = _pool_size(db_engine)
+    with ThreadPoolExecutor(size) as executor:
+        futures = [executor.submit(db_engine.connect) for _ in range(size)]
+    errors = [future.exception() for future in futures if future.exception() is not None]
+    for future in futures:
+        if future.exception() is None:
+            future.result().close()
+    if errors:
+        raise errors[0]
+
+
+async def warm_async_pool(db_engine: AsyncEngine):
+    """
+    `warm_pool` for an AsyncEngine.
+    """
+    results = await asyncio.gather(
+        *(db_engine.connect().start() for _ in range(_pool_size(db_engine.sync_engine))),
+        return_exceptions=True,
+    )
+    for result in results:
+        if not isinstance(result, BaseException):
+            await result.close()
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+
+
+def in_threadpool(fn: Callable[[], Any]) -> Callable[[], Awaitable[Any]]:
+    return lambda: run_in_threadpool(fn)
+
+
+class Startup:
+    """
+    Runs the start-up steps in the background and reports readiness for /readyz.
+
+    The process answers /healthz as soon as it listens; /readyz only passes
+    once every step (pool warm-up, caches) has succeeded, so the load
+    balancer sends no traffic to a pod that would serve its first requests
+    cold. A failing step is logged and retried with backoff rather than
+    crashing the pod, and the error is shown by /readyz until it succeeds.
+    """
+
+    def __init__(self):
+        self.state = "starting"  # "starting", "ready" or "stopping"
+        self.error: Optional[str] = None
+        self.failures = 0
+        self.step_seconds: Dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._started = time.perf_counter()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    async def _run(self, steps: List[Step]):
+        pending = list(steps)
+        while pending:
+            name, step = pending[0]
+            start = time.perf_counter()
+            try:
+                await step()
+            except Exception as e:
+                self.failures += 1
+                self.error = f"{name}: {e!r}"
+                delay = RETRY_DELAYS[min(self.failures, len(RETRY_DELAYS)) - 1]
+                print(f"ERROR: Start-up step '{name}' failed, retrying in {delay}s. Error: {e!r}")
+                if self.failures == 1:
+                    traceback.print_exc()
+                await asyncio.sleep(delay)
+                continue
+            self.step_seconds[name] = round(time.perf_counter() - start, 4)
+            pending.pop(0)
+        self.error = None
+        self.ready_seconds = round(time.perf_counter() - self._started, 4)
+        if self.state == "starting":
+            self.state = "ready"
+
+    def start(self, steps: List[Step]):
+        self._task = asyncio.create_task(self._run(steps))
+
+    async def stop(self):
+        # Fail readiness first, so the load balancer drains this pod while it shuts down
+        self.state = "stopping"
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.state,
+            "error": self.error,
+            "failures": self.failures,
+            "steps": self.step_seconds,
+            "ready_seconds": self.ready_seconds,
+        }
+
+
+startup = Startup()
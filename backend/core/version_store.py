@@ -0,0 +1,139 @@
+# backend\core\version_store.py
+import secrets
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+from core.config import settings
+
+
+class VersionStore(ABC):
+    """
+    Per-user version of the task list, used as its ETag.
+
+    Every task write path bumps the owner's version after committing, so an
+    unchanged version proves an unchanged list and a conditional GET can be
+    answered without touching the task table. A tag combines an epoch with a
+    counter, so a store that loses its counters (a restart, a flushed Redis)
+    can never hand out a tag that was already used for different data.
+
+    A store that can't be reached must not fail the request: `etag` returns
+    None (the list is served in full, without a tag) and `bump` logs the
+    error and starts a new epoch at the next chance, so no tag handed out
+    before the lost bump can match again.
+    """
+
+    @abstractmethod
+    async def etag(self, user_id: int) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def bump(self, user_id: int):
+        """
+        Called by the write paths right after they commit: from a threadpool
+        thread, or with DB_ASYNC from inside `run_sync` on the event loop,
+        where it must not block.
+        """
+
+
+class InMemoryVersionStore(VersionStore):
+    """
+    Versions held in this process. Only correct with a single process:
+    another worker or replica would never see this one's bumps.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[int, int] = {}
+        self._epoch = secrets.token_hex(4)
+
+    async def etag(self, user_id: int) -> str:
+        return f'"{self._epoch}-{self._versions.get(user_id, 0)}"'
+
+    def bump(self, user_id: int):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+class RedisVersionStore(VersionStore):
+    """
+    Versions shared by every worker and replica through Redis (INCR per write,
+    one MGET per conditional GET). The keys have no TTL; the Redis instance
+    must not evict them (`maxmemory-policy noeviction` or a volatile-* policy).
+
+    Tags are read with the async client, so a slow Redis holds up only the
+    requests waiting for it. Bumps on the event loop are awaited through the
+    session's greenlet; bumps from threads use a sync client.
+    """
+
+    EPOCH_KEY = "task_versions:epoch"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise RuntimeError("TASK_VERSION_STORE=redis needs the 'redis' package")
+        self._errors = redis.RedisError
+        self._redis = redis.asyncio.Redis.from_url(url, socket_timeout=1, decode_responses=True)
+        self._sync_redis = redis.Redis.from_url(url, socket_timeout=1, decode_responses=True)
+        # Set when a bump was lost: the epoch must change before any tag is trusted again
+        self._lost_bump = False
+
+    def _key(self, user_id: int) -> str:
+        return f"task_versions:{user_id}"
+
+    async def _renew_epoch(self):
+        if self._lost_bump:
+            await self._redis.set(self.EPOCH_KEY, secrets.token_hex(4))
+            self._lost_bump = False
+
+    async def etag(self, user_id: int) -> Optional[str]:
+        try:
+            await self._renew_epoch()
+            epoch, version = await self._redis.mget(self.EPOCH_KEY, self._key(user_id))
+            if epoch is None:
+                # First use, or the counters were lost: start a new epoch (the first writer wins)
+                await self._redis.set(self.EPOCH_KEY, secrets.token_hex(4), nx=True)
+                epoch = await self._redis.get(self.EPOCH_KEY)
+        except self._errors as e:
+            print(f"Task list versions unavailable, serving lists without an ETag: {e!r}")
+            return None
+        return f'"{epoch}-{version or 0}"'
+
+    async def _bump(self, user_id: int):
+        await self._renew_epoch()
+        await self._redis.incr(self._key(user_id))
+
+    def _bump_sync(self, user_id: int):
+        if self._lost_bump:
+            self._sync_redis.set(self.EPOCH_KEY, secrets.token_hex(4))
+            self._lost_bump = False
+        self._sync_redis.incr(self._key(user_id))
+
+    def bump(self, user_id: int):
+        try:
+            if in_greenlet():
+                # Service code under run_sync (DB_ASYNC) runs on the event loop
+                await_only(self._bump(user_id))
+            else:
+                self._bump_sync(user_id)
+        except self._errors as e:
+            # The write is already committed; make every tag issued so far stale instead of failing it
+            print(f"Could not bump task list version, starting a new epoch: {e!r}")
+            self._lost_bump = True
+
+
+def create_version_store(kind: Optional[str] = None) -> VersionStore:
+    kind = kind or settings.TASK_VERSION_STORE
+    if kind == "memory":
+        return InMemoryVersionStore()
+    if kind == "redis":
+        return RedisVersionStore(settings.REDIS_URL)
+    raise ValueError(f"TASK_VERSION_STORE must be 'memory' or 'redis', not {kind!r}")
+
+
+task_versions = create_version_store()
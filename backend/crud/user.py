@@ -2,15 +2,20 @@ from typing import Optional
 from sqlmodel import Session, select
 from sqlalchemy.exc import IntegrityError # Import IntegrityError
 
-from core.security import get_password_hash, verify_password
+from core.security import get_password_hash, verify_and_update_password
 from models.user import User
 from schemas.user import UserCreate
 
+def get_user(db: Session, *, user_id: int) -> Optional[User]:
+    return db.get(User, user_id)
+
 def get_user_by_email(db: Session, *, email: str) -> Optional[User]:
     return db.exec(select(User).where(User.email == email)).first()
 
-def create_user(db: Session, *, user_in: UserCreate) -> User:
-    password_hash = get_password_hash(user_in.password)
+def create_user(db: Session, *, user_in: UserCreate, password_hash: Optional[str] = None) -> User:
+    # Callers on the event loop hash beforehand so bcrypt doesn't block it
+    if password_hash is None:
+        password_hash = get_password_hash(user_in.password)
     db_user = User(
         email=user_in.email,
         full_name=user_in.full_name,
@@ -25,10 +30,20 @@ def create_user(db: Session, *, user_in: UserCreate) -> User:
     db.refresh(db_user)
     return db_user
 
+def update_password_hash(db: Session, *, user: User, password_hash: str) -> User:
+    user.password_hash = password_hash
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
 def authenticate_user(db: Session, *, email: str, password: str) -> Optional[User]:
     user = get_user_by_email(db, email=email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    verified, new_hash = verify_and_update_password(password, user.password_hash)
+    if not verified:
         return None
+    if new_hash:
+        update_password_hash(db, user=user, password_hash=new_hash)
     return user
@@ -54,19 +54,105 @@
 
 
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import create_engine, SQLModel
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import configure_mappers
+import asyncio
 import json
 import os
 
 from core.config import settings
-from api.endpoints import tasks, auth, chat
+from core.database import async_engine, engine, get_pool_stats
+from core.change_feed import task_changes
+from core.metrics import MetricsMiddleware, request_metrics
+from core.query_budget import unbudgeted_routes
+from core.principal_cache import principal_cache
+from core.schema import create_schema
+from core.security import create_access_token, decode_token, password_hasher, pwd_context
+from core.startup import in_threadpool, startup, warm_async_pool, warm_pool
+from core.version_store import task_versions
+from crud import user as user_crud
+from models import User
+from services.agent_client import agent_client
+from services.idempotency_service import idempotency_service
+from services.task_service import task_service
+from api import deps
+from api.endpoints import tasks, auth, chat, users
 from ai_agent.main import ai_router
 
+# Every router with API endpoints, each of which must declare its SQL statement
+# budget; users.router is checked though it isn't mounted yet
+BUDGETED_ROUTERS = (auth.router, tasks.router, chat.router, users.router, ai_router)
+
+
+def warm_caches(db):
+    """
+    One-off work the first requests would otherwise pay for: configuring the
+    ORM mappers, a JWT round trip and compiling the hot auth and task list
+    queries (run for a user that doesn't exist).
+    """
+    configure_mappers()
+    decode_token(create_access_token(subject=0))
+    nobody = User(id=0)
+    columns = [field for field in tasks.TASK_RESPONSE_FIELDS if field in tasks.TASK_TABLE_COLUMNS]
+    user_crud.get_user(db, user_id=0)
+    user_crud.get_user_by_email(db, email="")
+    task_service.get_user_tasks(db, nobody, columns=columns)
+    task_service.get_user_tasks_page(db, nobody, limit=tasks.DEFAULT_PAGE_SIZE, columns=columns)
+
+
+async def warm_serving_session():
+    # Connects the version store
+    await task_versions.etag(0)
+    async with deps.open_db() as session:
+        await deps.run_db(session, warm_caches)
+
+
+async def purge_idempotency_keys():
+    while True:
+        await asyncio.sleep(settings.IDEMPOTENCY_PURGE_INTERVAL)
+        try:
+            async with deps.open_db() as session:
+                await deps.run_db(session, idempotency_service.purge_expired)
+        except Exception as e:
+            print(f"ERROR: Could not purge expired idempotency keys. Error: {e!r}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    steps = []
+    if settings.DB_CREATE_SCHEMA:
+        # Before serving: the endpoints need the tables. Pods leave this to `python -m core.schema`.
+        try:
+            await run_in_threadpool(create_schema, engine)
+        except OperationalError as e:
+            print(f"ERROR: Could not connect to database on startup. Please ensure the database is running and accessible. Error: {e}")
+            steps.append(("schema", in_threadpool(lambda: create_schema(engine))))
+    if settings.STARTUP_WARMUP:
+        steps.append(("pool", in_threadpool(lambda: warm_pool(engine))))
+        if async_engine is not None:
+            steps.append(("async_pool", lambda: warm_async_pool(async_engine)))
+        steps.append(("caches", warm_serving_session))
+        # Loads bcrypt and starts a hashing thread
+        steps.append(("passwords", lambda: password_hasher.run(pwd_context.handler().get_backend)))
+    await task_changes.start()
+    startup.start(steps)
+    purger = asyncio.create_task(purge_idempotency_keys())
+    yield
+    purger.cancel()
+    await startup.stop()
+    await agent_client.aclose()
+    await task_changes.stop()
+
+
 app = FastAPI(
     title="Todo App",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # CORS - Parse origins from JSON array
@@ -95,20 +181,64 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
-
-from sqlalchemy.exc import OperationalError
-
-@app.on_event("startup")
-def on_startup():
-    try:
-        SQLModel.metadata.create_all(engine)
-    except OperationalError as e:
-        print(f"ERROR: Could not connect to database on startup. Please ensure the database is running and accessible. Error: {e}")
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+OPS = [Depends(deps.require_ops_token)]
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """
+    Liveness: the process is up and its event loop answers.
+    """
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """
+    Readiness: 200 once the start-up steps have succeeded, 503 while starting, retrying a failed step or shutting down.
+    """
+    return JSONResponse(startup.snapshot(), status_code=200 if startup.ready else 503)
+
+@app.get("/pool-stats", include_in_schema=False, dependencies=OPS)
+def pool_stats():
+    """
+    Live connection pool statistics, used to size DB_POOL_SIZE / DB_MAX_OVERFLOW per pod.
+    """
+    return get_pool_stats()
+
+@app.get("/cache-stats", include_in_schema=False, dependencies=OPS)
+def cache_stats():
+    """
+    Hit/miss counters for the authenticated-principal cache.
+    """
+    return principal_cache.stats()
+
+@app.get("/metrics", include_in_schema=False, dependencies=OPS)
+def metrics():
+    """
+    Per-route latency, SQL and outbound call metrics of this worker, for Prometheus to scrape.
+    """
+    return PlainTextResponse(request_metrics.render(get_pool_stats()), media_type="text/plain; version=0.0.4")
+
+@app.get("/feed-stats", include_in_schema=False, dependencies=OPS)
+def feed_stats():
+    """
+    Task change stream subscribers connected to this worker.
+    """
+    return {"subscribers": task_changes.hub.subscriber_count()}
 
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(tasks.router, prefix=f"{settings.API_V1_STR}", tags=["tasks"])
 app.include_router(chat.router, prefix=f"{settings.API_V1_STR}/chat", tags=["chat"])
-app.include_router(ai_router, prefix=f"{settings.API_V1_STR}/ai", tags=["ai"])
\ No newline at end of file
+app.include_router(ai_router, prefix=f"{settings.API_V1_STR}/ai", tags=["ai"])
+
+if settings.QUERY_BUDGET_MODE == "raise":
+    # Tests and CI: every API endpoint must declare its SQL statement budget
+    unbudgeted = unbudgeted_routes(*BUDGETED_ROUTERS)
+    if unbudgeted:
+        raise RuntimeError(f"Endpoints without a query budget: {', '.join(unbudgeted)}")
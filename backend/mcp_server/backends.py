@@ -0,0 +1,92 @@
+"""
+Task backends for the MCP tools.
+
+`HttpTaskBackend` (here) calls the REST API, as a separate service would.
+`LocalTaskBackend` (mcp_server/local_backend.py) runs inside a process that
+has the backend code and database access, and calls TaskService directly on
+a pooled session. That skips the loopback HTTP hop on every tool call, along
+with the API's JWT decode and user lookup.
+
+Both return the REST API's JSON shapes and raise BackendError on failure.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+
+class BackendError(Exception):
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class HttpTaskBackend:
+    """
+    REST API client on one pooled keep-alive connection set, shared by all tool calls.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30.0, max_connections: int = 20):
+        self.client = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    def _send(self, method: str, path: str, token: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {token}", **(headers or {})}
+        response = self.client.request(method, path, headers=headers, **kwargs)
+        if response.is_error:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise BackendError(response.status_code, detail)
+        return response
+
+    def _request(self, method: str, path: str, token: str, **kwargs) -> Any:
+        return self._send(method, path, token, **kwargs).json()
+
+    @staticmethod
+    def _filter_params(filters: Dict[str, Any]) -> Dict[str, Any]:
+        params = {}
+        for key, value in filters.items():
+            if value is None or value == "":
+                continue
+            if isinstance(value, bool):
+                value = str(value).lower()
+            elif hasattr(value, "isoformat"):
+                value = value.isoformat()
+            params[key] = value
+        return params
+
+    def list_tasks(self, user_id: int, token: str, limit: int, **filters) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Returns up to `limit` matching tasks and whether more exist. `filters` are
+        the task list's search / completed / priority / due_after / due_before.
+        """
+        params = {**self._filter_params(filters), "limit": limit}
+        response = self._send("GET", f"/{user_id}/tasks", token, params=params)
+        return response.json(), "X-Next-Cursor" in response.headers
+
+    def summarize_tasks(self, user_id: int, token: str, **filters) -> Dict[str, int]:
+        return self._request("GET", f"/{user_id}/tasks/summary", token, params=self._filter_params(filters))
+
+    def get_task(self, user_id: int, token: str, task_id: int) -> Dict[str, Any]:
+        return self._request("GET", f"/{user_id}/tasks/{task_id}", token)
+
+    def create_task(self, user_id: int, token: str, task_data: dict, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        With `idempotency_key`, a retry returns the task the first call created.
+        """
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        return self._request("POST", f"/{user_id}/tasks", token, headers=headers, json=task_data)
+
+    def update_task(self, user_id: int, token: str, task_id: int, task_data: dict) -> Dict[str, Any]:
+        return self._request("PUT", f"/{user_id}/tasks/{task_id}", token, json=task_data)
+
+    def delete_task(self, user_id: int, token: str, task_id: int):
+        self._request("DELETE", f"/{user_id}/tasks/{task_id}", token)
+
+    def bulk_tasks(self, user_id: int, token: str, operations: List[dict]) -> List[Dict[str, Any]]:
+        return self._request("POST", f"/{user_id}/tasks/bulk", token, json={"operations": operations})["results"]
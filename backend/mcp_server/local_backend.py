@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from api.endpoints.tasks import MAX_BULK_OPERATIONS
+from core.database import engine
+from core.metrics import track_external
+from mcp_server.backends import BackendError
+from models import Task, User
+from schemas.task import TaskResponse
+from services.idempotency_service import idempotency_service
+from services.task_service import task_service
+from services.user_service import user_service
+
+
+def _dump(task: Task) -> Dict[str, Any]:
+    return TaskResponse.model_validate(task).model_dump(mode="json")
+
+
+class LocalTaskBackend:
+    """
+    Calls TaskService in-process, on a session from the shared engine pool.
+
+    Ownership is enforced as in the API: the token must be valid and its
+    subject must be `user_id`. Principals are resolved through the same cache
+    as `get_current_user`.
+    """
+
+    def _authenticate(self, db: Session, token: str, user_id: int) -> User:
+        try:
+            user = user_service.authenticate(db, token)
+        except HTTPException as e:
+            raise BackendError(e.status_code, e.detail)
+        if user.id != user_id:
+            raise BackendError(403, "Not authorized to access these tasks")
+        return user
+
+    def _call(self, user_id: int, token: str, fn, **kwargs):
+        with track_external("mcp"), Session(engine, expire_on_commit=False) as db:
+            user = self._authenticate(db, token, user_id)
+            try:
+                return fn(db, user, **kwargs)
+            except HTTPException as e:
+                db.rollback()
+                raise BackendError(e.status_code, e.detail)
+
+    def list_tasks(self, user_id: int, token: str, limit: int, **filters) -> Tuple[List[Dict[str, Any]], bool]:
+        tasks, next_cursor = self._call(user_id, token, task_service.get_user_tasks_page, limit=limit, **filters)
+        return [_dump(task) for task in tasks], next_cursor is not None
+
+    def summarize_tasks(self, user_id: int, token: str, **filters) -> Dict[str, int]:
+        return self._call(user_id, token, task_service.summarize_user_tasks, **filters)
+
+    def get_task(self, user_id: int, token: str, task_id: int) -> Dict[str, Any]:
+        return _dump(self._call(user_id, token, task_service.get_task, task_id=task_id))
+
+    def create_task(self, user_id: int, token: str, task_data: dict, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        if not idempotency_key:
+            return _dump(self._call(user_id, token, task_service.create_task, task_data=task_data))
+
+        def create_once(db: Session, user: User) -> Dict[str, Any]:
+            task, _ = idempotency_service.run_once(
+                db, user=user, key=idempotency_key, scope="create_task", payload=task_data,
+                fn=lambda: task_service.create_task(db, user, task_data=task_data), dump=_dump,
+            )
+            return task
+
+        return self._call(user_id, token, create_once)
+
+    def update_task(self, user_id: int, token: str, task_id: int, task_data: dict) -> Dict[str, Any]:
+        return _dump(self._call(user_id, token, task_service.update_task, task_id=task_id, task_data=task_data))
+
+    def delete_task(self, user_id: int, token: str, task_id: int):
+        self._call(user_id, token, task_service.delete_task, task_id=task_id)
+
+    def bulk_tasks(self, user_id: int, token: str, operations: List[dict]) -> List[Dict[str, Any]]:
+        if len(operations) > MAX_BULK_OPERATIONS:
+            raise BackendError(422, f"At most {MAX_BULK_OPERATIONS} operations per request")
+        results = self._call(user_id, token, task_service.bulk_apply, operations=operations)
+        for result in results:
+            if result.get("task") is not None:
+                result["task"] = _dump(result["task"])
+        return results
@@ -1,8 +1,11 @@
-from typing import List, Optional
-import requests
+import os
+from datetime import date
+from typing import Any, Dict, List, Literal, Optional
 from fastmcp import FastMCP
 from pydantic import BaseModel
 
+from mcp_server.backends import HttpTaskBackend
+
 # --- Pydantic Models for Task Schema ---
 class TaskCreate(BaseModel):
     title: str
@@ -19,55 +22,115 @@ class TaskResponse(BaseModel):
     description: Optional[str] = None
     completed: bool = False
 
+class TaskList(BaseModel):
+    tasks: List[Dict[str, Any]]
+    truncated: bool = False
+    summary: Optional[str] = None
+
+class BulkOperation(BaseModel):
+    op: Literal["create", "update", "delete", "complete"]
+    id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    completed: Optional[bool] = None
+
+class BulkResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: Optional[int] = None
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+
 # Initialize FastAPI app
 app = FastMCP()
 mcp = app
 
-BACKEND_URL = "http://localhost:8000/api/v1"
+# --- Configuration ---
+# "http" calls the REST API at BACKEND_URL; "local" calls TaskService in-process
+# (needs the backend's DATABASE_URL and JWT_SECRET)
+MCP_BACKEND = os.getenv("MCP_BACKEND", "http")
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000/api/v1")
+
+# get_tasks returns few, compact rows by default: everything it returns lands in the model's context
+DEFAULT_TASK_LIMIT = 20
+MAX_TASK_LIMIT = 100
+TASK_FIELDS = ("id", "title", "description", "completed", "priority", "due_date", "category_id", "user_id")
+COMPACT_TASK_FIELDS = ("id", "title", "completed", "priority", "due_date")
 
-# Helper to get auth headers
-def _get_auth_headers(token: str):
-    return {"Authorization": f"Bearer {token}"}
+if MCP_BACKEND == "local":
+    from mcp_server.local_backend import LocalTaskBackend
+    backend = LocalTaskBackend()
+elif MCP_BACKEND == "http":
+    backend = HttpTaskBackend(BACKEND_URL)
+else:
+    raise ValueError(f"MCP_BACKEND must be 'http' or 'local', not {MCP_BACKEND!r}")
+
+def _project(task: Dict[str, Any], fields) -> Dict[str, Any]:
+    # Empty values carry no information for the model; leave them out
+    return {field: task[field] for field in fields if task.get(field) not in (None, "")}
 
 @app.tool()
 def get_tasks(
     user_id: int,
     token: str,
-    query: Optional[str] = None
-) -> List[TaskResponse]:
+    query: Optional[str] = None,
+    completed: Optional[bool] = None,
+    priority: Optional[str] = None,
+    due_after: Optional[date] = None,
+    due_before: Optional[date] = None,
+    limit: int = DEFAULT_TASK_LIMIT,
+    fields: Optional[List[str]] = None,
+) -> TaskList:
     """
-    Retrieves a list of tasks for a user. Can optionally filter by a search query.
+    Retrieves a user's tasks, filtered on the server. All filters are optional and combine:
+    query (words in the title or description), completed, priority, and a due-date
+    window (due_after / due_before, inclusive, YYYY-MM-DD).
+
+    Returns at most `limit` tasks (default 20, max 100), oldest first, with the fields
+    id, title, completed, priority and due_date unless `fields` lists others (also
+    description, category_id). Empty fields are omitted. When more tasks match,
+    `truncated` is true and `summary` gives the counts; narrow the filters rather
+    than raising the limit.
     """
-    params = {}
-    if query:
-        params["query"] = query
-    
-    response = requests.get(
-        f"{BACKEND_URL}/users/{user_id}/tasks",
-        headers=_get_auth_headers(token),
-        params=params,
-    )
-    response.raise_for_status()
-    return response.json()
+    fields = fields or COMPACT_TASK_FIELDS
+    unknown = [field for field in fields if field not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}; choose from {list(TASK_FIELDS)}")
+    limit = max(1, min(limit, MAX_TASK_LIMIT))
+    filters = {
+        "search": query,
+        "completed": completed,
+        "priority": priority,
+        "due_after": due_after,
+        "due_before": due_before,
+    }
+
+    tasks, truncated = backend.list_tasks(user_id, token, limit=limit, **filters)
+    result = TaskList(tasks=[_project(task, fields) for task in tasks], truncated=truncated)
+    if truncated:
+        counts = backend.summarize_tasks(user_id, token, **filters)
+        result.summary = (
+            f"Showing {len(tasks)} of {counts['total']} matching tasks "
+            f"({counts['pending']} pending, {counts['completed']} completed, {counts['overdue']} overdue)."
+        )
+    return result
 
 @app.tool()
 def create_task(
     user_id: int,
     token: str,
     title: str,
-    description: Optional[str] = None
+    description: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
 ) -> TaskResponse:
     """
     Creates a new task for a user.
+    Pass a unique idempotency_key, and the same one when retrying the call:
+    a retry then returns the task already created instead of adding a duplicate.
     """
     task_data = TaskCreate(title=title, description=description)
-    response = requests.post(
-        f"{BACKEND_URL}/users/{user_id}/tasks",
-        headers=_get_auth_headers(token),
-        json=task_data.model_dump(),
-    )
-    response.raise_for_status()
-    return response.json()
+    return backend.create_task(user_id, token, task_data.model_dump(), idempotency_key=idempotency_key)
 
 @app.tool()
 def update_task(
@@ -83,18 +146,12 @@ def update_task(
     """
     task_data = TaskUpdate(
         title=title, description=description, completed=completed
-    ).model_dump(exclude_unset=True)
+    ).model_dump(exclude_none=True)
 
     if not task_data:
         raise ValueError("No fields to update.")
 
-    response = requests.put(
-        f"{BACKEND_URL}/users/{user_id}/tasks/{task_id}",
-        headers=_get_auth_headers(token),
-        json=task_data,
-    )
-    response.raise_for_status()
-    return response.json()
+    return backend.update_task(user_id, token, task_id, task_data)
 
 @app.tool()
 def delete_task(
@@ -105,13 +162,23 @@ def delete_task(
     """
     Deletes a task by its ID for a user.
     """
-    response = requests.delete(
-        f"{BACKEND_URL}/users/{user_id}/tasks/{task_id}",
-        headers=_get_auth_headers(token),
-    )
-    response.raise_for_status()
+    backend.delete_task(user_id, token, task_id)
     return {"message": "Task deleted successfully"}
 
+@app.tool()
+def bulk_tasks(
+    user_id: int,
+    token: str,
+    operations: List[BulkOperation],
+) -> List[BulkResult]:
+    """
+    Applies many task operations in a single call and transaction. Each operation is
+    {"op": "create" | "update" | "delete" | "complete", "id": ..., "title": ..., ...};
+    create needs a title, the others need an id. Returns one result per operation.
+    Prefer this over repeated create_task / update_task / delete_task calls.
+    """
+    return backend.bulk_tasks(user_id, token, [operation.model_dump(exclude_unset=True) for operation in operations])
+
 # The MCP server will automatically generate the /mcp endpoint
 # with the tools defined above.
 
@@ -2,5 +2,8 @@ from .user import User
 from .task import Task
 from .conversation import Conversation
 from .message import Message
+from .conversation_summary import ConversationSummary
+from .task_change import TaskChangeCounter, TaskTombstone
+from .idempotency_key import IdempotencyKey
 
-__all__ = ["User", "Task", "Conversation", "Message"]
\ No newline at end of file
+__all__ = ["User", "Task", "Conversation", "Message", "ConversationSummary", "TaskChangeCounter", "TaskTombstone", "IdempotencyKey"]
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlmodel import Field, SQLModel
+import datetime
+
+class ConversationSummary(SQLModel, table=True):
+    """
+    Rolling summary of the messages that have scrolled out of a conversation's history window.
+    """
+    __tablename__ = "conversation_summaries"
+
+    conversation_id: int = Field(primary_key=True, foreign_key="conversations.id")
+    content: str = Field(default="")
+    # Highest message id folded into `content`; newer messages are summarized incrementally
+    through_message_id: int = Field(default=0, nullable=False)
+    updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, nullable=False)
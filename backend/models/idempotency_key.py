@@ -0,0 +1,25 @@
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+import datetime
+
+class IdempotencyKey(SQLModel, table=True):
+    """
+    A client's Idempotency-Key and the response of the first request sent with
+    it, replayed to retries until `expires_at`. While that request still runs
+    `status_code` is empty and `expires_at` is the end of its lock.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Expired keys are purged in expiry order
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    user_id: int = Field(primary_key=True, foreign_key="app_user.id")
+    key: str = Field(primary_key=True, max_length=255)
+    # Operation the key was used for, e.g. "create_task", and a hash of its input
+    scope: str = Field(nullable=False)
+    fingerprint: str = Field(nullable=False)
+    status_code: Optional[int] = Field(default=None)
+    response: Optional[str] = Field(default=None)  # JSON body
+    expires_at: datetime.datetime = Field(nullable=False)
@@ -1,16 +1,31 @@
 from typing import Optional
+from sqlalchemy import BigInteger, Column, Index
 from sqlmodel import Field, Relationship, SQLModel
 import datetime
 
 from .user import User
 
 class Task(SQLModel, table=True):
+    __table_args__ = (
+        # Keyset pagination walks a user's tasks in (created_at, id) or (updated_at, id) order
+        Index("ix_task_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_task_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        # Due-date window filters
+        Index("ix_task_user_id_due_date", "user_id", "due_date"),
+        # Delta sync reads a user's changes in sequence order
+        Index("ix_task_user_id_change_seq", "user_id", "change_seq"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: Optional[int] = Field(default=None, foreign_key="app_user.id")
     title: str = Field(index=True)
     description: Optional[str] = Field(default=None)
     completed: bool = Field(default=False)
+    priority: Optional[str] = Field(default=None)  # free-form, e.g. "low", "medium", "high"
+    due_date: Optional[datetime.date] = Field(default=None)
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, nullable=False)
     updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, nullable=False)
+    # Position of the last write in the owner's change sequence (see TaskChangeCounter)
+    change_seq: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0, server_default="0"))
 
-    owner: Optional[User] = Relationship(back_populates="tasks")
\ No newline at end of file
+    owner: Optional[User] = Relationship(back_populates="tasks")
@@ -0,0 +1,31 @@
+from typing import Optional
+from sqlalchemy import BigInteger, Column, Index
+from sqlmodel import Field, SQLModel
+import datetime
+
+class TaskChangeCounter(SQLModel, table=True):
+    """
+    Per-user change sequence. Every task write takes the next numbers from here
+    inside its transaction; the row lock orders each user's writers, so a
+    higher sequence number always belongs to a later commit.
+    """
+    __tablename__ = "task_change_counters"
+
+    user_id: int = Field(primary_key=True, foreign_key="app_user.id")
+    seq: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0))
+
+
+class TaskTombstone(SQLModel, table=True):
+    """
+    Record of a deleted task, so delta sync clients learn about the deletion.
+    """
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_user_id_change_seq", "user_id", "change_seq"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="app_user.id")
+    task_id: int = Field(nullable=False)
+    change_seq: int = Field(sa_column=Column(BigInteger, nullable=False))
+    deleted_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, nullable=False)
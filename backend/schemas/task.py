@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Optional
+from typing import List, Literal, Optional
 
 
 from sqlmodel import SQLModel
@@ -35,4 +35,40 @@ class TaskUpdate(TaskBase):
 class TaskResponse(TaskBase):
     id: int
     user_id: int
-    category: Optional[CategoryPublic] = None
\ No newline at end of file
+    category: Optional[CategoryPublic] = None
+
+class TaskBulkOperation(SQLModel):
+    op: Literal["create", "update", "delete", "complete"]
+    id: Optional[int] = None  # required for update / delete / complete
+    title: Optional[str] = None  # required for create
+    description: Optional[str] = None
+    completed: Optional[bool] = None  # for complete: defaults to True
+    priority: Optional[str] = None
+    due_date: Optional[date] = None
+    category_id: Optional[int] = None
+
+class TaskBulkRequest(SQLModel):
+    operations: List[TaskBulkOperation]
+
+class TaskBulkResult(SQLModel):
+    index: int
+    op: str
+    status: int  # HTTP-style status of this item: 200, 201, 404 or 422
+    id: Optional[int] = None
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+
+class TaskBulkResponse(SQLModel):
+    results: List[TaskBulkResult]
+
+class TaskSummary(SQLModel):
+    total: int
+    completed: int
+    pending: int
+    overdue: int  # pending with a due date in the past
+
+class TaskChanges(SQLModel):
+    changes: List[TaskResponse]  # created or updated since the cursor, in change order
+    deleted: List[int]  # ids deleted since the cursor; apply these before `changes`
+    cursor: str  # pass as `since` on the next call
+    has_more: bool
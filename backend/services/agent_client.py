@@ -0,0 +1,108 @@
+import json
+import threading
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+from core.config import settings
+from core.metrics import track_external
+
+
+class AgentClient:
+    """
+    Shared HTTP clients for the AI agent service.
+
+    One pooled client per flavour (sync for threadpool callers, async for
+    endpoints that await the call) is created lazily and reused for every chat
+    turn, so connections stay alive between turns instead of a new TCP (and TLS)
+    handshake per request. Every call is bounded by the connect/read/write/pool
+    timeouts from Settings, so a hung agent fails the turn instead of pinning a
+    worker.
+    """
+
+    def __init__(self, url: Optional[str] = None, stream_url: Optional[str] = None):
+        self.url = url or settings.AI_AGENT_URL
+        self.stream_url = stream_url or settings.AI_AGENT_STREAM_URL
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    def _options(self) -> Dict[str, Any]:
+        return {
+            "timeout": httpx.Timeout(
+                connect=settings.AI_AGENT_CONNECT_TIMEOUT,
+                read=settings.AI_AGENT_READ_TIMEOUT,
+                write=settings.AI_AGENT_CONNECT_TIMEOUT,
+                pool=settings.AI_AGENT_POOL_TIMEOUT,
+            ),
+            "limits": httpx.Limits(
+                max_connections=settings.AI_AGENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_AGENT_MAX_KEEPALIVE,
+                keepalive_expiry=settings.AI_AGENT_KEEPALIVE_EXPIRY,
+            ),
+            # Multiplexes turns over one connection; needs the `h2` package (httpx[http2])
+            "http2": settings.AI_AGENT_HTTP2,
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(**self._options())
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        # Created on first use, from inside the running event loop
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._options())
+        return self._async_client
+
+    def post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with track_external("ai_agent"):
+            response = self.client.post(self.url, json=payload)
+            response.raise_for_status()
+            return response.json()
+
+    async def apost(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with track_external("ai_agent"):
+            response = await self.async_client.post(self.url, json=payload)
+            response.raise_for_status()
+            return response.json()
+
+    async def astream(self, payload: Dict[str, Any]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Posts to the agent's streaming endpoint and yields its Server-Sent Events
+        as (event, data) pairs as they arrive. The read timeout applies to the
+        gap between chunks, not to the whole reply.
+        """
+        headers = {"Accept": "text/event-stream"}
+        # For a stream this is its whole duration, including time the caller spends between chunks
+        with track_external("ai_agent"):
+            async with self.async_client.stream("POST", self.stream_url, json=payload, headers=headers) as response:
+                response.raise_for_status()
+                event, data = "message", []
+                async for line in response.aiter_lines():
+                    if not line:
+                        if data:
+                            yield event, json.loads("\n".join(data))
+                        event, data = "message", []
+                    elif line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        data.append(line[len("data:"):].lstrip())
+
+    async def aclose(self):
+        """
+        Closes both pooled clients; called on application shutdown.
+        """
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+agent_client = AgentClient()
@@ -1,82 +1,264 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+import datetime
+import re
+from contextlib import aclosing
 from sqlmodel import Session, select
+from sqlalchemy import insert, update
 from fastapi import HTTPException
-import requests
-import os
+from fastapi.concurrency import run_in_threadpool
+import httpx
 
-from models import User, Conversation, Message
+from core.config import settings
+from core.query_budget import query_budget
+from mcp_server.backends import BackendError
+from models import User, Conversation, Message, ConversationSummary
+from services.agent_client import agent_client
 
 # --- Configuration ---
-AI_AGENT_URL = "http://localhost:8001/chat"
+# Upper bound on rows read for a token-budgeted window when no message limit is set
+TOKEN_WINDOW_SCAN_LIMIT = 500
+SUMMARY_MAX_CHARS = 2000
+SUMMARY_LINE_CHARS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about 4 characters per token plus per-message overhead); good enough for budgeting.
+    """
+    return len(text) // 4 + 4
+
+
+def summarize_messages(previous: str, messages: List[Dict[str, Any]]) -> str:
+    """
+    Folds messages into a rolling extractive summary: one clipped line per
+    message, keeping only the most recent SUMMARY_MAX_CHARS characters.
+    """
+    lines = [previous] if previous else []
+    for message in messages:
+        content = " ".join(message["content"].split())
+        if len(content) > SUMMARY_LINE_CHARS:
+            content = content[:SUMMARY_LINE_CHARS - 3] + "..."
+        lines.append(f"{message['role']}: {content}")
+    summary = "\n".join(lines)
+    if len(summary) > SUMMARY_MAX_CHARS:
+        summary = summary[-SUMMARY_MAX_CHARS:]
+        summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+    return summary
 
 class ChatService:
 
-    def get_conversation(self, db: Session, *, user: User, conversation_id: int) -> Conversation:
-        conversation = db.get(Conversation, conversation_id)
-        if not conversation or conversation.user_id != user.id:
-            raise HTTPException(status_code=404, detail="Conversation not found")
-        return conversation
+    @query_budget(6) # 3 without CHAT_HISTORY_SUMMARY
+    def start_turn(
+        self, db: Session, *, user: User, conversation_id: Optional[int], content: str
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Stores the user's message and returns (conversation_id, history including that message).
+
+        Everything happens in one transaction. An existing conversation is
+        claimed with a single ownership-checked UPDATE that also bumps
+        `updated_at`, so it is never SELECTed. A new conversation has no earlier
+        history to load.
+        """
+        now = datetime.datetime.utcnow()
+        new_conversation = not conversation_id
+        if conversation_id:
+            claimed = db.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id, Conversation.user_id == user.id)
+                .values(updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if claimed.rowcount != 1:
+                raise HTTPException(status_code=404, detail="Conversation not found")
+        else:
+            conversation = Conversation(user_id=user.id, created_at=now, updated_at=now)
+            db.add(conversation)
+            db.flush()
+            conversation_id = conversation.id
 
-    def create_conversation(self, db: Session, *, user: User) -> Conversation:
-        conversation = Conversation(user_id=user.id)
-        db.add(conversation)
+        db.execute(insert(Message).values(
+            conversation_id=conversation_id, user_id=user.id, role="user", content=content, created_at=now
+        ))
+        if new_conversation:
+            history = [{"role": "user", "content": content}]
+        else:
+            history = self.get_history_window(
+                db,
+                conversation_id=conversation_id,
+                max_messages=settings.CHAT_HISTORY_MAX_MESSAGES,
+                max_tokens=settings.CHAT_HISTORY_MAX_TOKENS,
+                with_summary=settings.CHAT_HISTORY_SUMMARY,
+            )
         db.commit()
-        db.refresh(conversation)
-        return conversation
-
-    def add_message(self, db: Session, *, conversation: Conversation, role: str, content: str) -> Message:
-        message = Message(
-            conversation_id=conversation.id,
-            user_id=conversation.user_id,
-            role=role,
-            content=content
+        return conversation_id, history
+
+    @query_budget(2)
+    def finish_turn(self, db: Session, *, user: User, conversation_id: int, content: str):
+        """
+        Stores the assistant's reply and bumps the conversation's `updated_at` in one transaction.
+        """
+        now = datetime.datetime.utcnow()
+        db.execute(insert(Message).values(
+            conversation_id=conversation_id, user_id=user.id, role="assistant", content=content, created_at=now
+        ))
+        db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(updated_at=now)
+            .execution_options(synchronize_session=False)
         )
-        db.add(message)
-        db.commit()
-        db.refresh(message)
-        # Update conversation timestamp
-        conversation.updated_at = message.created_at
-        db.add(conversation)
         db.commit()
-        db.refresh(conversation)
-        return message
 
     def get_conversation_history(self, db: Session, *, conversation_id: int) -> List[Dict[str, Any]]:
         messages = db.exec(
             select(Message)
             .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at)
+            .order_by(Message.created_at, Message.id)
         ).all()
         return [{"role": msg.role, "content": msg.content} for msg in messages]
 
-    def get_ai_response(self, *, history: List[Dict[str, Any]], user: User, token: str) -> str:
+    def get_history_window(
+        self,
+        db: Session,
+        *,
+        conversation_id: int,
+        max_messages: int = 0,
+        max_tokens: int = 0,
+        with_summary: bool = False,
+    ) -> List[Dict[str, Any]]:
         """
-        Calls the external AI Agent server to get a response.
+        Returns the newest messages of a conversation, oldest first, bounded by
+        `max_messages` and/or an approximate `max_tokens` budget (0 = no bound).
+
+        The newest rows are read with one descending range scan on
+        (conversation_id, created_at, id). With `with_summary`, a rolling
+        summary of the messages before the window is prepended as a system
+        message. Only messages that left the window since the last update are
+        folded into it, and it is stored back without committing.
         """
-        payload = {
+        if not max_messages and not max_tokens:
+            return self.get_conversation_history(db, conversation_id=conversation_id)
+
+        scan_limit = max_messages or TOKEN_WINDOW_SCAN_LIMIT
+        newest = db.exec(
+            select(Message.id, Message.role, Message.content)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(scan_limit)
+        ).all()
+
+        window = []
+        budget = max_tokens
+        for message_id, role, content in newest:
+            cost = estimate_tokens(content)
+            # Always keep the newest message, even if it alone exceeds the budget
+            if max_tokens and window and cost > budget:
+                break
+            budget -= cost
+            window.append({"id": message_id, "role": role, "content": content})
+        window.reverse()
+
+        history = [{"role": message["role"], "content": message["content"]} for message in window]
+        if with_summary and window:
+            summary = self._update_summary(db, conversation_id=conversation_id, before_message_id=window[0]["id"])
+            if summary:
+                history.insert(0, {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        return history
+
+    def _update_summary(self, db: Session, *, conversation_id: int, before_message_id: int) -> str:
+        summary = db.get(ConversationSummary, conversation_id)
+        through_id = summary.through_message_id if summary else 0
+        evicted = db.exec(
+            select(Message.id, Message.role, Message.content)
+            .where(
+                Message.conversation_id == conversation_id,
+                Message.id > through_id,
+                Message.id < before_message_id,
+            )
+            .order_by(Message.created_at, Message.id)
+        ).all()
+        if not evicted:
+            return summary.content if summary else ""
+
+        if summary is None:
+            summary = ConversationSummary(conversation_id=conversation_id)
+        summary.content = summarize_messages(summary.content, [{"role": role, "content": content} for _, role, content in evicted])
+        summary.through_message_id = evicted[-1][0]
+        summary.updated_at = datetime.datetime.utcnow()
+        db.add(summary)
+        return summary.content
+
+    def _agent_payload(self, *, history: List[Dict[str, Any]], user: User, token: str) -> Dict[str, Any]:
+        return {
             "messages": history,
             "user_id": user.id,
             "token": token,
         }
-        
+
+    def _agent_error(self, e: Exception) -> HTTPException:
+        if isinstance(e, httpx.TimeoutException):
+            print(f"AI Agent service timed out: {e!r}")
+            return HTTPException(status_code=504, detail="The AI agent took too long to respond. Please try again later.")
+        if isinstance(e, httpx.HTTPError):
+            # This catches connection errors and error status codes
+            print(f"Error calling AI Agent service: {e!r}")
+            return HTTPException(status_code=503, detail="Could not connect to the AI agent. Please try again later.")
+        # This catches other errors, like JSON decoding errors
+        print(f"An unexpected error occurred while communicating with the AI agent: {e}")
+        return HTTPException(status_code=500, detail="An unexpected error occurred.")
+
+    def _mock_response(self, *, history: List[Dict[str, Any]], user: User, token: str) -> str:
+        # Off the start-up path: loading the agent compiles its intent patterns
+        from ai_agent.mock_agent import get_local_agent
+
         try:
-            response = requests.post(AI_AGENT_URL, json=payload)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            
-            agent_response = response.json()
-            return agent_response.get("content", "No response from AI agent.")
-
-        except requests.exceptions.RequestException as e:
-            # This catches connection errors, timeouts, etc.
-            print(f"Error calling AI Agent service: {e}")
-            raise HTTPException(
-                status_code=503, 
-                detail=f"Could not connect to the AI agent. Please try again later."
-            )
+            return get_local_agent().reply(user_id=user.id, token=token, message=history[-1]["content"])
+        except BackendError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    async def get_ai_response_async(self, *, history: List[Dict[str, Any]], user: User, token: str) -> str:
+        """
+        Calls the external AI Agent server to get a response, over the shared pooled client.
+
+        With AI_AGENT_MODE=mock the in-process mock agent answers instead, with no HTTP hop.
+        """
+        if settings.AI_AGENT_MODE == "mock":
+            return await run_in_threadpool(self._mock_response, history=history, user=user, token=token)
+        try:
+            agent_response = await agent_client.apost(self._agent_payload(history=history, user=user, token=token))
+        except Exception as e:
+            raise self._agent_error(e)
+        return agent_response.get("content", "No response from AI agent.")
+
+    async def stream_ai_response(self, *, history: List[Dict[str, Any]], user: User, token: str) -> AsyncIterator[str]:
+        """
+        Yields the agent's reply as text chunks, as the agent streams them.
+
+        Raises HTTPException like `get_ai_response_async`, whether the call fails
+        up front, midway, or the agent reports an error event.
+        """
+        if settings.AI_AGENT_MODE == "mock":
+            content = await run_in_threadpool(self._mock_response, history=history, user=user, token=token)
+            for chunk in re.findall(r"\S+\s*", content):
+                yield chunk
+            return
+        try:
+            # aclosing() ends the agent request as soon as we stop reading, including on `done`
+            async with aclosing(agent_client.astream(self._agent_payload(history=history, user=user, token=token))) as events:
+                async for event, data in events:
+                    if event == "content":
+                        yield data.get("content", "")
+                    elif event == "done":
+                        return
+                    elif event == "error":
+                        print(f"AI Agent service reported an error: {data.get('detail')}")
+                        raise HTTPException(status_code=502, detail="The AI agent failed to complete its response.")
+        except HTTPException:
+            raise
         except Exception as e:
-            # This catches other errors, like JSON decoding errors
-            print(f"An unexpected error occurred while communicating with the AI agent: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred.")
+            raise self._agent_error(e)
+        # The stream closed without a `done` event
+        raise HTTPException(status_code=502, detail="The AI agent failed to complete its response.")
 
 
 chat_service = ChatService()
\ No newline at end of file
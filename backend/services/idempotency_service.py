@@ -0,0 +1,179 @@
+from typing import Any, Callable, Optional, Tuple
+import datetime
+import hashlib
+import time
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session
+
+from core.config import settings
+from core.query_budget import query_budget
+from models.idempotency_key import IdempotencyKey
+from models.user import User
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Seconds between lookups while a retry waits for the first request: the first, then the cap
+WAIT_POLL_MIN = 0.05
+WAIT_POLL_MAX = 0.5
+
+
+def request_fingerprint(payload: Any) -> str:
+    """
+    Hash of a request's input, to tell a retry from a different request reusing its key.
+    """
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def check_key(key: str):
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters")
+
+
+def still_running() -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"A request with this {IDEMPOTENCY_KEY_HEADER} is still in progress, retry later",
+        headers={"Retry-After": "1"},
+    )
+
+
+class IdempotencyService:
+    """
+    Stores the response of the first request sent with an Idempotency-Key, per
+    user, and replays it to retries.
+
+    The first request claims the key by inserting its row, so of several
+    concurrent duplicates, on any worker or replica, only one runs; the others
+    poll the row until it holds a response. A retry of a finished request costs
+    one primary key lookup. Failed requests release their key so a retry runs
+    again; a request whose process died keeps it for IDEMPOTENCY_LOCK_TIMEOUT.
+    """
+
+    def _lookup(self, db: Session, user: User, key: str) -> Optional[IdempotencyKey]:
+        # Always read the row again: a waiting request polls it on one session
+        return db.get(IdempotencyKey, (user.id, key), populate_existing=True)
+
+    @query_budget(3)
+    def claim(self, db: Session, *, user: User, key: str, scope: str, fingerprint: str) -> Optional[IdempotencyKey]:
+        """
+        Claims `key` for a request, committing so concurrent duplicates see it.
+
+        Returns None when the caller now owns the key, and must `complete` or
+        `release` it; otherwise the existing row, either finished (replay its
+        response) or still running (wait and claim again).
+
+        :raises HTTPException: 422 if the key was used for a different request.
+        """
+        now = datetime.datetime.utcnow()
+        lock = dict(
+            scope=scope, fingerprint=fingerprint, status_code=None, response=None,
+            expires_at=now + datetime.timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT),
+        )
+        record = self._lookup(db, user, key)
+        if record is None:
+            insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+            claimed = db.execute(
+                insert_fn(IdempotencyKey).values(user_id=user.id, key=key, **lock).on_conflict_do_nothing()
+            ).rowcount
+        elif record.expires_at <= now:
+            # Expired but not purged yet: take it over, unless a concurrent duplicate just did
+            claimed = db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user.id, IdempotencyKey.key == key, IdempotencyKey.expires_at <= now)
+                .values(**lock)
+            ).rowcount
+        else:
+            claimed = 0
+        if claimed:
+            db.commit()
+            return None
+        if record is None or record.expires_at <= now:
+            record = self._lookup(db, user, key)
+            if record is None:
+                # Released by a failed duplicate in between
+                raise still_running()
+        if record.scope != scope or record.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422, detail=f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request"
+            )
+        return record
+
+    @query_budget(1)
+    def complete(self, db: Session, *, user: User, key: str, status_code: int, response: str):
+        """
+        Stores the claimed request's response, replayed for IDEMPOTENCY_KEY_TTL.
+        """
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user.id, IdempotencyKey.key == key)
+            .values(
+                status_code=status_code,
+                response=response,
+                expires_at=datetime.datetime.utcnow() + datetime.timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+            )
+        )
+        db.commit()
+
+    @query_budget(1)
+    def release(self, db: Session, *, user: User, key: str):
+        """
+        Gives up a claim whose request failed, so a retry runs it again.
+        """
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user.id, IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)
+            )
+        )
+        db.commit()
+
+    @query_budget(1)
+    def purge_expired(self, db: Session) -> int:
+        """
+        Deletes expired keys, a range of the expiry index. Returns how many.
+        """
+        deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.datetime.utcnow())).rowcount
+        db.commit()
+        return deleted
+
+    def run_once(
+        self, db: Session, *, user: User, key: str, scope: str, payload: Any, fn: Callable[[], Any], dump: Callable[[Any], Any]
+    ) -> Tuple[Any, bool]:
+        """
+        Runs `fn()` once per key, for sync callers (the in-process MCP backend):
+        returns `dump(fn())` and False, or the stored result and True when
+        replaying. The API's endpoints use `api.idempotency.idempotent`.
+        """
+        check_key(key)
+        fingerprint = request_fingerprint(payload)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        delay = WAIT_POLL_MIN
+        while True:
+            record = self.claim(db, user=user, key=key, scope=scope, fingerprint=fingerprint)
+            if record is None:
+                break
+            if record.status_code is not None:
+                return orjson.loads(record.response), True
+            if time.monotonic() >= deadline:
+                raise still_running()
+            # Don't hold a connection while waiting
+            db.rollback()
+            time.sleep(delay)
+            delay = min(delay * 2, WAIT_POLL_MAX)
+        try:
+            result = dump(fn())
+        except BaseException:
+            db.rollback()
+            self.release(db, user=user, key=key)
+            raise
+        self.complete(db, user=user, key=key, status_code=200, response=orjson.dumps(result).decode())
+        return result, False
+
+
+idempotency_service = IdempotencyService()
@@ -0,0 +1,109 @@
+import re
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import column, event, func, literal_column, or_, table, text
+from sqlmodel import SQLModel
+
+from models.task import Task
+
+# --- Configuration ---
+# 'simple' keeps stop words and skips stemming, so prefix matches behave the same as on SQLite.
+PG_TS_CONFIG = "simple"
+SQLITE_FTS_TABLE = "task_fts"
+
+# Set to False when the SQLite build has no FTS5; search then falls back to ILIKE.
+sqlite_fts_enabled = True
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+task_fts = table(SQLITE_FTS_TABLE, column("rowid"), column("rank"))
+
+
+# Spelled out verbatim (no bound parameters) so the planner matches it to the expression index.
+PG_DOCUMENT_SQL = f"to_tsvector('{PG_TS_CONFIG}', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+
+def _sqlite_fts_ddl() -> List[str]:
+    # External-content FTS5 table kept in sync with `task` by triggers, so every
+    # write path (ORM or bulk SQL) is indexed without touching application code.
+    return [
+        f"CREATE VIRTUAL TABLE {SQLITE_FTS_TABLE} USING fts5("
+        f"title, description, content='task', content_rowid='id', tokenize='unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+        f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description) "
+        f"VALUES ('delete', old.id, old.title, old.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description) "
+        f"VALUES ('delete', old.id, old.title, old.description); "
+        f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        # Index any rows that existed before the search table was created
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+    ]
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def create_search_index(target, connection, **kw):
+    """
+    Creates the dialect-specific full-text index for tasks alongside `create_all`.
+    """
+    global sqlite_fts_enabled
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_task_search ON task USING gin ({PG_DOCUMENT_SQL})"))
+    elif dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SQLITE_FTS_TABLE},
+        ).first()
+        if exists:
+            return
+        try:
+            for statement in _sqlite_fts_ddl():
+                connection.execute(text(statement))
+        except Exception as e:
+            sqlite_fts_enabled = False
+            print(f"WARNING: SQLite FTS5 is unavailable, task search will use ILIKE. Error: {e}")
+
+
+def search_tokens(search: str) -> List[str]:
+    return _TOKEN_RE.findall(search.lower())
+
+
+def apply_search(query, dialect: str, search: str) -> Tuple[Any, Optional[Any]]:
+    """
+    Restricts a `select(Task)` query to tasks matching every word of `search`
+    as a prefix, using the full-text index of the current dialect.
+
+    Returns the filtered query and a relevance ORDER BY clause (best match
+    first), or None when the dialect has no ranking.
+    """
+    tokens = search_tokens(search)
+    if not tokens:
+        return query, None
+
+    if dialect == "postgresql":
+        document = literal_column(PG_DOCUMENT_SQL)
+        ts_query = func.to_tsquery(
+            literal_column(f"'{PG_TS_CONFIG}'::regconfig"),
+            " & ".join(f"{token}:*" for token in tokens),
+        )
+        return query.where(document.op("@@")(ts_query)), func.ts_rank(document, ts_query).desc()
+
+    if dialect == "sqlite" and sqlite_fts_enabled:
+        match = " ".join(f'"{token}"*' for token in tokens)
+        query = query.join(task_fts, task_fts.c.rowid == Task.id).where(
+            literal_column(SQLITE_FTS_TABLE).op("MATCH")(match)
+        )
+        # FTS5's hidden `rank` column is bm25(); lower is more relevant
+        return query, task_fts.c.rank
+
+    return apply_ilike_search(query, search), None
+
+
+def apply_ilike_search(query, search: str):
+    """
+    Substring search without an index; used on dialects with no full-text support.
+    """
+    return query.where(or_(Task.title.ilike(f"%{search}%"), Task.description.ilike(f"%{search}%")))
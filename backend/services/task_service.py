@@ -1,47 +1,479 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
+import base64
 import datetime
+import itertools
+import json
 from sqlmodel import Session, select
-from sqlalchemy import or_
+from sqlalchemy import and_, case, delete, func, insert, not_, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from fastapi import HTTPException
 
+from core.change_feed import task_changes
+from core.query_budget import query_budget
+from core.version_store import task_versions
 from models.task import Task
+from models.task_change import TaskChangeCounter, TaskTombstone
 from models.user import User
+from schemas.task import TaskResponse
+from services.task_search import apply_search
+
+# Fields a bulk operation may write; the schemas carry a few more than the table has yet (category_id)
+TASK_COLUMNS = frozenset(Task.__table__.columns.keys()) - {"id", "user_id", "created_at", "updated_at", "change_seq"}
+# Of those, the ones a write may not set to null; the database would reject the whole statement
+REQUIRED_COLUMNS = frozenset(name for name in TASK_COLUMNS if not Task.__table__.columns[name].nullable)
+
+
+def null_required_fields(fields: dict) -> List[str]:
+    return sorted(key for key, value in fields.items() if value is None and key in REQUIRED_COLUMNS)
+
+# Columns a task list can be keyset-paginated on; `id` breaks ties between equal timestamps.
+SORT_COLUMNS = ("created_at", "updated_at")
+
+
+def encode_cursor(sort: str, task: Task) -> str:
+    """
+    Builds an opaque cursor pointing just past `task` in `sort` order.
+    """
+    raw = json.dumps([sort, getattr(task, sort).isoformat(), task.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[datetime.datetime, int]:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    :raises HTTPException: 400 if the cursor is malformed or was issued for another sort order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, task_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if cursor_sort != sort:
+            raise ValueError("cursor sort mismatch")
+        return datetime.datetime.fromisoformat(value), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_change_cursor(seq: int) -> str:
+    """
+    Builds an opaque delta sync cursor for the user's change sequence number `seq`.
+    """
+    raw = json.dumps(["changes", seq])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_change_cursor(cursor: str) -> int:
+    """
+    Decodes a cursor produced by `encode_change_cursor`.
+
+    :raises HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kind, seq = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if kind != "changes" or not isinstance(seq, int) or seq < 0:
+            raise ValueError("not a change cursor")
+        return seq
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def upsert_event(task: Task) -> dict:
+    """
+    Change feed event for a created or updated task.
+    """
+    task_json = TaskResponse.model_validate(task).model_dump(mode="json")
+    return {"op": "upsert", "task": task_json, "cursor": encode_change_cursor(task.change_seq)}
+
+
+def delete_event(task_id: int, seq: int) -> dict:
+    """
+    Change feed event for a deleted task.
+    """
+    return {"op": "delete", "id": task_id, "cursor": encode_change_cursor(seq)}
+
 
 class TaskService:
-    def get_user_tasks(self, db: Session, user: User, search: Optional[str] = None, completed: Optional[bool] = None) -> List[Task]:
-        query = select(Task).where(Task.user_id == user.id)
+    def _next_change_seq(self, db: Session, user: User, count: int = 1) -> int:
+        """
+        Reserves `count` consecutive numbers in the user's change sequence and returns the first.
+
+        One upsert ... RETURNING on the user's counter row. The row stays locked
+        until the caller commits, so a later transaction always gets higher
+        numbers than an earlier one; unlike timestamps, this ordering doesn't
+        depend on the clocks of the app servers.
+        """
+        insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        stmt = (
+            insert_fn(TaskChangeCounter)
+            .values(user_id=user.id, seq=count)
+            .on_conflict_do_update(
+                index_elements=[TaskChangeCounter.user_id],
+                set_={"seq": TaskChangeCounter.seq + count},
+            )
+            .returning(TaskChangeCounter.seq)
+        )
+        return db.execute(stmt).scalar_one() - count + 1
+
+    def _user_tasks_query(
+        self,
+        db: Session,
+        user: User,
+        search: Optional[str] = None,
+        completed: Optional[bool] = None,
+        priority: Optional[str] = None,
+        due_after: Optional[datetime.date] = None,
+        due_before: Optional[datetime.date] = None,
+        sort: str = "created_at",
+        rank: bool = False,
+        query=None,
+    ):
+        sort_column = getattr(Task, sort)
+        query = select(Task) if query is None else query
+        query = query.where(Task.user_id == user.id)
+        rank_clause = None
         if search:
-            query = query.where(or_(Task.title.ilike(f"%{search}%"), Task.description.ilike(f"%{search}%")))
+            query, rank_clause = apply_search(query, db.get_bind().dialect.name, search)
         if completed is not None:
             query = query.where(Task.completed == completed)
-        return db.exec(query).all()
+        if priority:
+            query = query.where(func.lower(Task.priority) == priority.lower())
+        # The due window is inclusive on both ends; tasks without a due date never match it
+        if due_after is not None:
+            query = query.where(Task.due_date >= due_after)
+        if due_before is not None:
+            query = query.where(Task.due_date <= due_before)
+        if rank and rank_clause is not None:
+            return query.order_by(rank_clause, sort_column, Task.id)
+        return query.order_by(sort_column, Task.id)
+
+    def _select(self, columns: Optional[Sequence[str]]):
+        return select(Task) if columns is None else select(*(getattr(Task, column) for column in columns))
+
+    def _fetch(self, db: Session, query, columns: Optional[Sequence[str]]) -> list:
+        # Column selects come back as plain rows, skipping ORM identity map and object construction
+        return db.exec(query).all() if columns is None else db.execute(query).all()
+
+    @query_budget(1)
+    def get_user_tasks(
+        self,
+        db: Session,
+        user: User,
+        search: Optional[str] = None,
+        completed: Optional[bool] = None,
+        columns: Optional[Sequence[str]] = None,
+        **filters,
+    ) -> list:
+        """
+        Returns all of the user's tasks; search results are ordered by relevance.
+
+        With `columns`, returns rows of just those Task columns instead of Task objects.
+        """
+        query = self._user_tasks_query(db, user, search=search, completed=completed, rank=True, query=self._select(columns), **filters)
+        return self._fetch(db, query, columns)
+
+    @query_budget(1)
+    def get_user_tasks_page(
+        self,
+        db: Session,
+        user: User,
+        limit: int,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        completed: Optional[bool] = None,
+        sort: str = "created_at",
+        columns: Optional[Sequence[str]] = None,
+        **filters,
+    ) -> Tuple[list, Optional[str]]:
+        """
+        Returns one keyset page of the user's tasks and the cursor for the next page (None on the last page).
+
+        Pages are ordered by (sort, id), so rows inserted while a client is paging
+        never shift or duplicate the rows it has not seen yet. `filters` are the
+        priority / due_after / due_before filters of `_user_tasks_query`. With
+        `columns`, returns rows of those Task columns followed by any of `sort`
+        and `id` not among them (the cursor needs both).
+        """
+        if sort not in SORT_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_COLUMNS)}")
+        if columns is not None:
+            columns = tuple(dict.fromkeys([*columns, sort, "id"]))
+        query = self._user_tasks_query(db, user, search=search, completed=completed, sort=sort, query=self._select(columns), **filters)
+        if cursor:
+            value, task_id = decode_cursor(cursor, sort)
+            sort_column = getattr(Task, sort)
+            query = query.where(or_(sort_column > value, and_(sort_column == value, Task.id > task_id)))
+        # Fetch one extra row to learn whether another page exists without a COUNT query
+        tasks = self._fetch(db, query.limit(limit + 1), columns)
+        if len(tasks) <= limit:
+            return tasks, None
+        tasks = tasks[:limit]
+        return tasks, encode_cursor(sort, tasks[-1])
+
+    @query_budget(1)
+    def summarize_user_tasks(self, db: Session, user: User, search: Optional[str] = None, completed: Optional[bool] = None, **filters) -> dict:
+        """
+        Counts the user's tasks matching the same filters as `get_user_tasks`, in one aggregate query.
 
+        Returns {"total", "completed", "pending", "overdue"}; overdue tasks are
+        pending ones whose due date has passed.
+        """
+        today = datetime.date.today()
+        counts = select(
+            func.count(Task.id),
+            func.coalesce(func.sum(case((Task.completed == True, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((and_(Task.completed == False, Task.due_date < today), 1), else_=0)), 0),
+        )
+        query = self._user_tasks_query(db, user, search=search, completed=completed, query=counts, **filters).order_by(None)
+        total, done, overdue = db.exec(query).one()
+        return {"total": total, "completed": done, "pending": total - done, "overdue": overdue}
+
+    @query_budget(2)
+    def get_changes(self, db: Session, user: User, since: Optional[str], limit: int) -> dict:
+        """
+        Returns the user's task changes after the cursor `since` (everything when None).
+
+        `changes` holds the current state of tasks created or updated since the
+        cursor, `deleted` the ids of tasks deleted since then, both in sequence
+        order, and `cursor` is where the next call should resume. A client
+        applies `deleted` first and then `changes`. Each task appears at most
+        once, at its latest write; `has_more` means the page was cut at `limit`.
+        """
+        after = decode_change_cursor(since) if since else 0
+        # Fetch one extra row of each kind to learn whether more remain
+        tasks = db.exec(
+            select(Task)
+            .where(Task.user_id == user.id, Task.change_seq > after)
+            .order_by(Task.change_seq)
+            .limit(limit + 1)
+        ).all()
+        tombstones = db.exec(
+            select(TaskTombstone.task_id, TaskTombstone.change_seq)
+            .where(TaskTombstone.user_id == user.id, TaskTombstone.change_seq > after)
+            .order_by(TaskTombstone.change_seq)
+            .limit(limit + 1)
+        ).all()
+        entries = sorted(
+            [(task.change_seq, task) for task in tasks] + [(seq, task_id) for task_id, seq in tombstones],
+            key=lambda entry: entry[0],
+        )
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        return {
+            "changes": [entry for _, entry in entries if isinstance(entry, Task)],
+            "deleted": [entry for _, entry in entries if not isinstance(entry, Task)],
+            "cursor": encode_change_cursor(entries[-1][0] if entries else after),
+            "has_more": has_more,
+        }
+
+    @query_budget(1)
     def get_task(self, db: Session, user: User, task_id: int) -> Task:
         task = db.get(Task, task_id)
         if not task or task.user_id != user.id:
             raise HTTPException(status_code=404, detail="Task not found")
         return task
 
+    @query_budget(3)
     def create_task(self, db: Session, user: User, task_data: dict) -> Task:
-        task = Task(**task_data, user_id=user.id)
+        task = Task(**task_data, user_id=user.id, change_seq=self._next_change_seq(db, user))
         db.add(task)
         db.commit()
+        task_versions.bump(user.id)
         db.refresh(task)
+        task_changes.publish(user.id, [upsert_event(task)])
         return task
 
-    def update_task(self, db: Session, user: User, task_id: int, task_data: dict) -> Task:
-        task = self.get_task(db, user, task_id)
-        for key, value in task_data.items():
-            setattr(task, key, value)
-        task.updated_at = datetime.datetime.utcnow()
-        db.add(task)
+    def _update_owned(self, db: Session, user: User, task_id: int, values: dict) -> Task:
+        """
+        Applies `values` to one of the user's tasks in a single
+        UPDATE ... WHERE id AND user_id ... RETURNING, which checks ownership,
+        writes and reads the new row back in one round trip. Every supported
+        database has RETURNING (PostgreSQL, SQLite 3.35+): the change-sequence
+        upsert needs it too.
+
+        :raises HTTPException: 404 if the task doesn't exist or isn't the user's.
+        """
+        task = db.scalars(
+            update(Task).where(Task.id == task_id, Task.user_id == user.id).values(**values).returning(Task)
+        ).one_or_none()
+        if task is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return task
+
+    def _write_owned(self, db: Session, user: User, task_id: int, values: dict) -> Task:
+        # The change sequence is reserved first, as on every write path, so writers lock in the same order
+        values = {**values, "updated_at": datetime.datetime.utcnow(), "change_seq": self._next_change_seq(db, user)}
+        task = self._update_owned(db, user, task_id, values)
         db.commit()
-        db.refresh(task)
+        task_versions.bump(user.id)
+        task_changes.publish(user.id, [upsert_event(task)])
         return task
 
+    @query_budget(2) # the change sequence, then one UPDATE ... RETURNING
+    def update_task(self, db: Session, user: User, task_id: int, task_data: dict) -> Task:
+        values = {key: value for key, value in task_data.items() if key in TASK_COLUMNS}
+        nulls = null_required_fields(values)
+        if nulls:
+            raise HTTPException(status_code=422, detail=f"{', '.join(nulls)} can't be null")
+        return self._write_owned(db, user, task_id, values)
+
+    @query_budget(2)
+    def toggle_task_completion(self, db: Session, user: User, task_id: int) -> Task:
+        """
+        Flips `completed` in SQL, so the task isn't read first.
+        """
+        return self._write_owned(db, user, task_id, {"completed": not_(Task.completed)})
+
+    @query_budget(3) # the change sequence, one DELETE ... RETURNING and the tombstone
     def delete_task(self, db: Session, user: User, task_id: int):
-        task = self.get_task(db, user, task_id)
-        db.delete(task)
+        seq = self._next_change_seq(db, user)
+        deleted = db.execute(
+            delete(Task).where(Task.id == task_id, Task.user_id == user.id).returning(Task.id)
+        ).scalar_one_or_none()
+        if deleted is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        db.add(TaskTombstone(user_id=user.id, task_id=task_id, change_seq=seq))
+        db.commit()
+        task_versions.bump(user.id)
+        task_changes.publish(user.id, [delete_event(task_id, seq)])
+
+    @query_budget(12) # 8, plus one UPDATE per further distinct set of updated fields
+    def bulk_apply(self, db: Session, user: User, operations: List[dict]) -> List[dict]:
+        """
+        Applies a batch of create / update / complete / delete operations in one transaction.
+
+        Work is set-based rather than per item: one ownership SELECT, one
+        change-sequence upsert, one multi-row INSERT ... RETURNING, one
+        executemany UPDATE (updates, then completes), one DELETE with its
+        tombstone INSERT and one SELECT for the final state. Operations are
+        therefore applied by kind in that order, not in list order. Returns one result dict per operation, in request order;
+        invalid or foreign/missing ids are reported per item and don't abort the batch.
+        """
+        now = datetime.datetime.utcnow()
+        results: List[Optional[dict]] = [None] * len(operations)
+        creates, updates, completes, deletes = [], [], [], []
+
+        def fail(index: int, op: str, status: int, error: str, task_id: Optional[int] = None):
+            results[index] = {"index": index, "op": op, "status": status, "id": task_id, "error": error}
+
+        for index, operation in enumerate(operations):
+            op, task_id = operation["op"], operation.get("id")
+            fields = {key: value for key, value in operation.items() if key in TASK_COLUMNS}
+            nulls = null_required_fields(fields)
+            if op == "create":
+                if not fields.get("title"):
+                    fail(index, op, 422, "title is required")
+                elif nulls:
+                    fail(index, op, 422, f"{', '.join(nulls)} can't be null")
+                else:
+                    creates.append((index, fields))
+            elif task_id is None:
+                fail(index, op, 422, "id is required")
+            elif op == "update":
+                if not fields:
+                    fail(index, op, 422, "No fields to update", task_id)
+                elif nulls:
+                    fail(index, op, 422, f"{', '.join(nulls)} can't be null", task_id)
+                else:
+                    updates.append((index, task_id, fields))
+            elif op == "complete":
+                completed = operation.get("completed")
+                completes.append((index, task_id, True if completed is None else completed))
+            else:
+                deletes.append((index, task_id))
+
+        target_ids = {item[1] for item in updates + completes + deletes}
+        owned_ids = set()
+        if target_ids:
+            owned_ids = set(db.exec(select(Task.id).where(Task.user_id == user.id, Task.id.in_(target_ids))).all())
+        for kind, items in (("update", updates), ("complete", completes), ("delete", deletes)):
+            for item in items:
+                if item[1] not in owned_ids:
+                    fail(item[0], kind, 404, "Task not found", item[1])
+        updates = [item for item in updates if item[1] in owned_ids]
+        completes = [item for item in completes if item[1] in owned_ids]
+        deletes = [item for item in deletes if item[1] in owned_ids]
+
+        # One sequence number per write, handed out in the order the writes are applied
+        change_count = len(creates) + len(updates) + len(completes) + len(deletes)
+        next_seq = itertools.count(self._next_change_seq(db, user, change_count)) if change_count else None
+
+        if creates:
+            rows = [
+                {
+                    "description": None,
+                    "completed": False,
+                    **fields,
+                    "user_id": user.id,
+                    "created_at": now,
+                    "updated_at": now,
+                    "change_seq": next(next_seq),
+                }
+                for _, fields in creates
+            ]
+            # Matched up by their unique change_seq: asking for RETURNING in parameter order
+            # makes SQLite fall back to one INSERT per row
+            created = {task.change_seq: task for task in db.scalars(insert(Task).returning(Task), rows)}
+            for (index, _), row in zip(creates, rows):
+                task = created[row["change_seq"]]
+                results[index] = {"index": index, "op": "create", "status": 201, "id": task.id, "task": task}
+
+        if updates or completes:
+            rows = [
+                {**fields, "id": task_id, "updated_at": now, "change_seq": next(next_seq)}
+                for _, task_id, fields in updates
+            ] + [
+                {"id": task_id, "completed": completed, "updated_at": now, "change_seq": next(next_seq)}
+                for _, task_id, completed in completes
+            ]
+            db.execute(update(Task), rows)
+
+        if deletes:
+            deleted_ids = list(dict.fromkeys(task_id for _, task_id in deletes))
+            db.execute(
+                delete(Task)
+                .where(Task.user_id == user.id, Task.id.in_(deleted_ids))
+                .execution_options(synchronize_session=False)
+            )
+            tombstones = [
+                {"user_id": user.id, "task_id": task_id, "change_seq": next(next_seq), "deleted_at": now}
+                for task_id in deleted_ids
+            ]
+            db.execute(insert(TaskTombstone), tombstones)
+            for index, task_id in deletes:
+                results[index] = {"index": index, "op": "delete", "status": 200, "id": task_id}
+
+        changed = updates + completes
+        if changed:
+            changed_ids = {item[1] for item in changed}
+            current = {
+                task.id: task
+                for task in db.exec(
+                    select(Task).where(Task.id.in_(changed_ids)).execution_options(populate_existing=True)
+                ).all()
+            }
+            for kind, items in (("update", updates), ("complete", completes)):
+                for item in items:
+                    task = current.get(item[1])
+                    if task is None:  # deleted later in the same batch
+                        results[item[0]] = {"index": item[0], "op": kind, "status": 200, "id": item[1]}
+                    else:
+                        results[item[0]] = {"index": item[0], "op": kind, "status": 200, "id": task.id, "task": task}
+
+        # Built before the commit, which expires the tasks; one event per task, at its latest state
+        changes = {
+            result["id"]: (result["task"].change_seq, upsert_event(result["task"]))
+            for result in results
+            if result.get("task") is not None
+        }
+        if deletes:
+            changes.update((row["task_id"], (row["change_seq"], delete_event(row["task_id"], row["change_seq"]))) for row in tombstones)
+
         db.commit()
+        if any(result["status"] < 400 for result in results):
+            task_versions.bump(user.id)
+        task_changes.publish(user.id, [event for _, event in sorted(changes.values(), key=lambda change: change[0])])
+        return results
 
 task_service = TaskService()
@@ -1,15 +1,62 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import datetime
 from sqlmodel import Session, select
-from fastapi import HTTPException
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+from core.config import settings
+from core.principal_cache import principal_cache
+from core.security import ALGORITHM
+from crud import user as user_crud
 from models import User
 
 class UserService:
+    def cached_principal(self, token: str) -> Optional[User]:
+        """
+        The user an access token was last resolved to, from the principal cache, or None.
+        """
+        if not settings.PRINCIPAL_CACHE_ENABLED:
+            return None
+        cached = principal_cache.get(token)
+        return cached[1] if cached is not None else None
+
+    def load_principal(self, db: Session, token: str) -> User:
+        """
+        Resolves an access token to its user without the cache: decodes the
+        JWT, looks up its subject and caches the result.
+
+        :raises HTTPException: 401 for an invalid token, 404 if its user is gone.
+        """
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
+        except JWTError:
+            payload = {}
+        if payload.get("sub") is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+        user = user_crud.get_user(db, user_id=int(payload["sub"]))
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        if settings.PRINCIPAL_CACHE_ENABLED:
+            principal_cache.put(token, payload, user)
+        return user
+
+    def authenticate(self, db: Session, token: str) -> User:
+        """
+        Resolves an access token to its user, from the principal cache if it can.
+        """
+        return self.cached_principal(token) or self.load_principal(db, token)
+
     def update_user(self, db: Session, user: User, user_data: Dict[str, Any]) -> User:
+        # `user` may be a detached snapshot from the principal cache, so update the session's row
+        db_user = db.get(User, user.id)
+        if not db_user:
+            raise HTTPException(status_code=404, detail="User not found")
         for key, value in user_data.items():
-            setattr(user, key, value)
-        db.add(user)
+            setattr(db_user, key, value)
+        db_user.updated_at = datetime.datetime.utcnow()
+        db.add(db_user)
         db.commit()
-        db.refresh(user)
-        return user
+        db.refresh(db_user)
+        principal_cache.invalidate_user(db_user.id)
+        return db_user
 
 user_service = UserService()
\ No newline at end of file
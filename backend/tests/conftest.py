@@ -0,0 +1,54 @@
+import os
+import tempfile
+import uuid
+
+# Settings are read when the app is imported: configure before any app module loads
+_tmp = tempfile.mkdtemp(prefix="todo-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'test.db')}")
+os.environ.setdefault("AI_AGENT_MODE", "mock")
+os.environ.setdefault("QUERY_BUDGET_MODE", "raise")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import httpx
+import pytest
+
+import main
+from core.database import engine
+from core.schema import create_schema
+
+create_schema(engine)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    # Requests run in the test's own task, so count_queries() sees their statements
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def sign_up(client: httpx.AsyncClient):
+    """
+    Registers a new user; returns the auth headers and the user's id.
+    """
+    r = await client.post("/api/v1/auth/register", json={"email": f"{uuid.uuid4().hex}@example.com", "password": "pw"})
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    user_id = (await client.get("/api/v1/auth/me", headers=headers)).json()["id"]
+    return headers, user_id
+
+
+@pytest.fixture
+async def user(client):
+    return await sign_up(client)
+
+
+@pytest.fixture
+async def other_user(client):
+    return await sign_up(client)
@@ -0,0 +1,24 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def turn(user, message: str) -> dict:
+    headers, user_id = user
+    token = headers["Authorization"].removeprefix("Bearer ")
+    return {"messages": [{"role": "user", "content": message}], "user_id": user_id, "token": token}
+
+
+async def test_stream_sends_reply_in_chunks(client, user):
+    r = await client.post("/api/v1/ai/ai/chat/stream", json=turn(user, "add task buy milk"))
+    assert r.status_code == 200
+    assert r.headers["x-accel-buffering"] == "no"
+    events = [block.split("\n")[0] for block in r.text.strip().split("\n\n")]
+    assert events.count("event: content") > 1 and events[-1] == "event: done"
+
+
+async def test_stream_reports_agent_errors_as_events(client, user):
+    request = {**turn(user, "show my tasks"), "token": "not-a-token"}
+    r = await client.post("/api/v1/ai/ai/chat/stream", json=request)
+    assert r.status_code == 200
+    assert r.text.startswith("event: error\n")
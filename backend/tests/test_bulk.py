@@ -0,0 +1,31 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_null_required_field_fails_only_its_item(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    task_id = (await client.post(base, json={"title": "a"}, headers=headers)).json()["id"]
+
+    r = await client.post(f"{base}/bulk", json={"operations": [
+        {"op": "update", "id": task_id, "title": None},
+        {"op": "update", "id": task_id, "completed": None},
+        {"op": "create", "title": "b", "completed": None},
+        {"op": "create", "title": "c"},
+        {"op": "update", "id": task_id, "description": None},
+    ]}, headers=headers)
+
+    assert r.status_code == 200
+    assert [result["status"] for result in r.json()["results"]] == [422, 422, 422, 201, 200]
+    assert r.json()["results"][0]["error"] == "title can't be null"
+    assert sorted(task["title"] for task in (await client.get(base, headers=headers)).json()) == ["a", "c"]
+
+
+async def test_put_null_title_is_422(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    task_id = (await client.post(base, json={"title": "a"}, headers=headers)).json()["id"]
+    r = await client.put(f"{base}/{task_id}", json={"title": None}, headers=headers)
+    assert r.status_code == 422
+    assert (await client.get(f"{base}/{task_id}", headers=headers)).json()["title"] == "a"
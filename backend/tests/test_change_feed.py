@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+
+from core.change_feed import ChangeHub, RedisBroker
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_resync_drops_local_subscribers():
+    hub = ChangeHub()
+    first, second = hub.subscribe(1, 10), hub.subscribe(2, 10)
+    hub.resync()
+    for subscription in (first, second):
+        with pytest.raises(OverflowError):
+            await subscription.next_batch(timeout=1)
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    pytest.importorskip("redis")
+    # Nothing listens on port 1: every Redis call fails
+    broker = RedisBroker("redis://127.0.0.1:1/0")
+    monkeypatch.setattr(broker, "RECONNECT_MIN", 0.01)
+    return broker
+
+
+async def test_listener_resubscribes_and_resyncs(broker, monkeypatch):
+    import redis
+
+    attempts = []
+    message = {"data": json.dumps({"user_id": 1, "events": [{"op": "delete", "id": 7}]})}
+
+    async def subscribe():
+        attempts.append(None)
+        if len(attempts) == 1:
+            raise redis.ConnectionError("down")
+        return FakePubSub([message])
+
+    monkeypatch.setattr(broker, "_subscribe", subscribe)
+    delivered, resyncs = [], []
+    await broker.start(lambda user_id, events: delivered.append((user_id, events)), lambda: resyncs.append(None))
+    try:
+        for _ in range(100):
+            if delivered:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await broker.stop()
+    assert len(attempts) == 2 and len(resyncs) == 1
+    assert delivered == [(1, [{"op": "delete", "id": 7}])]
+
+
+async def test_publish_doesnt_wait_for_redis(broker):
+    await broker.start(lambda user_id, events: None, lambda: None)
+    try:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(100):
+            broker.publish(1, [{"op": "delete", "id": 7}])
+        assert loop.time() - start < 0.1
+    finally:
+        await broker.stop()
@@ -0,0 +1,70 @@
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from core.config import settings
+from core.database import engine
+from models import User
+from schemas.task import TaskCreate
+from services.idempotency_service import idempotency_service, request_fingerprint
+from services.task_service import task_service
+
+pytestmark = pytest.mark.anyio
+
+
+async def task_titles(client, base: str, headers: dict) -> list:
+    return [task["title"] for task in (await client.get(base, headers=headers)).json()]
+
+
+async def test_retry_replays_the_first_response(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    keyed = {**headers, "Idempotency-Key": "create-1"}
+    first = await client.post(base, json={"title": "a"}, headers=keyed)
+    retry = await client.post(base, json={"title": "a"}, headers=keyed)
+    assert retry.status_code == 200 and retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert await task_titles(client, base, headers) == ["a"]
+
+
+async def test_key_reused_for_a_different_body_is_rejected(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    keyed = {**headers, "Idempotency-Key": "create-1"}
+    await client.post(base, json={"title": "a"}, headers=keyed)
+    r = await client.post(base, json={"title": "b"}, headers=keyed)
+    assert r.status_code == 422
+    assert await task_titles(client, base, headers) == ["a"]
+
+
+async def test_failed_request_releases_its_key(client, user, monkeypatch):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    keyed = {**headers, "Idempotency-Key": "create-1"}
+    create_task = task_service.create_task
+
+    def unavailable(*args, **kwargs):
+        raise HTTPException(status_code=503, detail="Try again")
+
+    monkeypatch.setattr(task_service, "create_task", unavailable)
+    assert (await client.post(base, json={"title": "a"}, headers=keyed)).status_code == 503
+
+    monkeypatch.setattr(task_service, "create_task", create_task)
+    retry = await client.post(base, json={"title": "a"}, headers=keyed)
+    assert retry.status_code == 200 and "idempotent-replayed" not in retry.headers
+    assert await task_titles(client, base, headers) == ["a"]
+
+
+async def test_retry_while_the_first_request_runs_gets_409(client, user, monkeypatch):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    keyed = {**headers, "Idempotency-Key": "create-1"}
+    # The first request holds the key, say on another worker, and hasn't finished
+    fingerprint = request_fingerprint(TaskCreate(title="a").model_dump(mode="json"))
+    with Session(engine) as db:
+        assert idempotency_service.claim(db, user=User(id=user_id), key="create-1", scope="create_task", fingerprint=fingerprint) is None
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_TIMEOUT", 0.1)
+
+    r = await client.post(base, json={"title": "a"}, headers=keyed)
+    assert r.status_code == 409 and r.headers["retry-after"] == "1"
+    assert await task_titles(client, base, headers) == []
@@ -0,0 +1,26 @@
+import pytest
+from fastapi.concurrency import run_in_threadpool
+
+from mcp_server.backends import BackendError
+from mcp_server.local_backend import LocalTaskBackend
+
+pytestmark = pytest.mark.anyio
+
+
+def token_of(headers: dict) -> str:
+    return headers["Authorization"].removeprefix("Bearer ")
+
+
+async def test_authenticates_like_the_api(client, user, other_user):
+    headers, user_id = user
+    await client.post(f"/api/v1/{user_id}/tasks", json={"title": "a"}, headers=headers)
+    backend = LocalTaskBackend()
+
+    tasks, _ = await run_in_threadpool(backend.list_tasks, user_id, token_of(headers), limit=10)
+    assert [task["title"] for task in tasks] == ["a"]
+
+    cases = [("not-a-token", user_id, 401), (token_of(other_user[0]), user_id, 403)]
+    for token, owner, status_code in cases:
+        with pytest.raises(BackendError) as e:
+            await run_in_threadpool(backend.list_tasks, owner, token, limit=10)
+        assert e.value.status_code == status_code
@@ -0,0 +1,26 @@
+import pytest
+
+from api import deps
+
+pytestmark = pytest.mark.anyio
+
+OPS_ENDPOINTS = ["/pool-stats", "/cache-stats", "/metrics", "/feed-stats"]
+
+
+@pytest.fixture
+def ops_token(monkeypatch):
+    monkeypatch.setattr(deps.settings, "OPS_TOKEN", "s3cret")
+    return {"Authorization": "Bearer s3cret"}
+
+
+@pytest.mark.parametrize("path", OPS_ENDPOINTS)
+async def test_hidden_without_ops_token_setting(client, monkeypatch, path):
+    monkeypatch.setattr(deps.settings, "OPS_TOKEN", "")
+    assert (await client.get(path, headers={"Authorization": "Bearer "})).status_code == 404
+
+
+@pytest.mark.parametrize("path", OPS_ENDPOINTS)
+async def test_need_the_ops_token(client, ops_token, path):
+    assert (await client.get(path)).status_code == 401
+    assert (await client.get(path, headers={"Authorization": "Bearer wrong"})).status_code == 401
+    assert (await client.get(path, headers=ops_token)).status_code == 200
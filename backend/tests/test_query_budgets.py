@@ -0,0 +1,117 @@
+import fastapi
+import httpx
+import pytest
+from sqlalchemy import text
+
+import main
+from core.database import engine
+from core.principal_cache import principal_cache
+from core.query_budget import QueryBudgetExceeded, query_budget, unbudgeted_routes
+
+pytestmark = pytest.mark.anyio
+
+
+def run_statements(count: int):
+    with engine.connect() as connection:
+        for _ in range(count):
+            connection.execute(text("SELECT 1"))
+
+
+def test_every_api_route_has_a_budget():
+    assert unbudgeted_routes(*main.BUDGETED_ROUTERS) == []
+
+
+def test_unbudgeted_route_is_reported():
+    router = fastapi.APIRouter()
+
+    @router.get("/budgeted")
+    @query_budget(0)
+    async def budgeted():
+        pass
+
+    @router.get("/plain")
+    async def plain():
+        pass
+
+    assert unbudgeted_routes(router) == ["GET /plain"]
+
+
+def test_block_over_budget_raises():
+    with query_budget(2) as queries:
+        run_statements(2)
+    assert queries.count == 2
+    with pytest.raises(QueryBudgetExceeded, match="ran 3 SQL statements, over its budget of 2"):
+        with query_budget(2):
+            run_statements(3)
+
+
+async def test_endpoint_over_budget_fails_the_request():
+    app = fastapi.FastAPI()
+
+    @app.get("/")
+    @query_budget(1)
+    async def endpoint():
+        await fastapi.concurrency.run_in_threadpool(run_statements, 2)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        with pytest.raises(QueryBudgetExceeded):
+            await client.get("/")
+
+
+async def test_endpoints_stay_within_budgets(client, user):
+    """
+    Every endpoint on an account with enough rows to expose per-row queries;
+    with QUERY_BUDGET_MODE=raise, a budget overrun fails the request.
+    """
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+
+    def ok(r: httpx.Response) -> httpx.Response:
+        assert r.status_code == 200, r.text
+        return r
+
+    ok(await client.post(base, json={"title": "single"}, headers=headers))
+    created = ok(await client.post(f"{base}/bulk", json={"operations": [
+        {"op": "create", "title": f"task {i}", "priority": "high" if i % 2 else "low"} for i in range(30)
+    ]}, headers=headers)).json()["results"]
+    ids = [result["id"] for result in created]
+
+    ok(await client.post(f"{base}/bulk", json={"operations": [
+        *({"op": "update", "id": task_id, "title": f"renamed {task_id}"} for task_id in ids[:10]),
+        *({"op": "complete", "id": task_id} for task_id in ids[10:20]),
+        *({"op": "delete", "id": task_id} for task_id in ids[20:25]),
+    ]}, headers=headers))
+
+    assert len(ok(await client.get(base, headers=headers)).json()) == 26
+    ok(await client.get(base, params={"limit": 10, "search": "task", "completed": False}, headers=headers))
+    ok(await client.get(f"{base}/summary", headers=headers))
+    ok(await client.get(f"{base}/changes", params={"limit": 50}, headers=headers))
+
+    task_id = ids[25]
+    ok(await client.get(f"{base}/{task_id}", headers=headers))
+    ok(await client.put(f"{base}/{task_id}", json={"title": "edited"}, headers=headers))
+    ok(await client.patch(f"{base}/{task_id}/complete", headers=headers))
+    ok(await client.delete(f"{base}/{task_id}", headers=headers))
+
+    ok(await client.get("/api/v1/auth/me", headers=headers))
+
+    # A conversation long enough to page its history, then a replayed turn and a streamed one
+    conversation_id = None
+    for message in ("add task buy milk", "show my tasks", "complete buy milk", "hello"):
+        r = ok(await client.post("/api/v1/chat", json={"conversation_id": conversation_id, "message": message}, headers=headers))
+        conversation_id = r.json()["conversation_id"]
+    turn = {"conversation_id": conversation_id, "message": "show my tasks"}
+    keyed = {**headers, "Idempotency-Key": "turn-1"}
+    first = ok(await client.post("/api/v1/chat", json=turn, headers=keyed))
+    assert ok(await client.post("/api/v1/chat", json=turn, headers=keyed)).json() == first.json()
+    r = ok(await client.post("/api/v1/chat/stream", json=turn, headers=headers))
+    assert "event: done" in r.text
+
+    # The AI agent's turns, each authenticating its token from a cold cache
+    token = headers["Authorization"].removeprefix("Bearer ")
+    for path in ("/api/v1/ai/ai/chat", "/api/v1/ai/ai/chat/stream"):
+        for message in ("add task buy bread", "complete buy bread", "delete buy bread"):
+            principal_cache.clear()
+            request = {"messages": [{"role": "user", "content": message}], "user_id": user_id, "token": token}
+            assert "error" not in ok(await client.post(path, json=request)).text
@@ -0,0 +1,48 @@
+import pytest
+
+from core.change_feed import ChangeBroker
+from core.rate_limit import AdmissionControl, InMemoryRateLimitBackend, Limit, RateLimitBackend, RateLimited
+from core.version_store import VersionStore
+
+pytestmark = pytest.mark.anyio
+
+
+def admission(burst: int, concurrency: int) -> AdmissionControl:
+    return AdmissionControl(InMemoryRateLimitBackend(), {"cheap": Limit(0.001, burst, concurrency)})
+
+
+async def test_concurrency_rejection_spends_no_token():
+    control = admission(burst=2, concurrency=1)
+    async with control.admit("user:1", "cheap"):
+        with pytest.raises(RateLimited):
+            async with control.admit("user:1", "cheap"):
+                pass
+    # The rejected request left the second token for this one
+    async with control.admit("user:1", "cheap"):
+        pass
+
+
+async def test_rate_rejection_frees_the_concurrency_slot():
+    control = admission(burst=1, concurrency=1)
+    async with control.admit("user:1", "cheap"):
+        pass
+    with pytest.raises(RateLimited) as rejected:
+        async with control.admit("user:1", "cheap"):
+            pass
+    assert rejected.value.retry_after > 1
+    assert control.concurrency.acquire("cheap:user:1", 1)
+
+
+async def test_redis_down_lets_requests_through():
+    pytest.importorskip("redis")
+    from core.rate_limit import RedisRateLimitBackend
+
+    # Nothing listens on port 1
+    backend = RedisRateLimitBackend("redis://127.0.0.1:1/0")
+    assert await backend.take("cheap:user:1", 1.0, 1) == 0.0
+
+
+@pytest.mark.parametrize("base", [RateLimitBackend, VersionStore, ChangeBroker])
+def test_bases_are_abstract(base):
+    with pytest.raises(TypeError):
+        base()
@@ -0,0 +1,35 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import Session
+
+from core.schema import create_schema
+from models import Task
+
+# The task table as the first release created it, before priority, due_date and change_seq
+BASELINE_DDL = [
+    "CREATE TABLE app_user (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL UNIQUE, password_hash VARCHAR NOT NULL, "
+    "full_name VARCHAR, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)",
+    "CREATE TABLE task (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES app_user (id), title VARCHAR NOT NULL, "
+    "description VARCHAR, completed BOOLEAN NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)",
+    "INSERT INTO app_user VALUES (1, 'old@example.com', 'x', NULL, '2024-01-01', '2024-01-01')",
+    "INSERT INTO task VALUES (1, 1, 'old task', NULL, 0, '2024-01-01', '2024-01-01')",
+]
+
+
+def test_upgrades_existing_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        for statement in BASELINE_DDL:
+            connection.execute(text(statement))
+
+    create_schema(engine)
+    create_schema(engine)  # and is a no-op once up to date
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("task")}
+    assert {"priority", "due_date", "change_seq"} <= columns
+    indexes = {index["name"] for index in inspector.get_indexes("task")}
+    assert "ix_task_user_id_change_seq" in indexes
+    assert "idempotency_keys" in inspector.get_table_names()
+    with Session(engine) as db:
+        task = db.get(Task, 1)
+        assert task.title == "old task" and task.change_seq == 0 and task.priority is None
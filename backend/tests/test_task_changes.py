@@ -0,0 +1,64 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def write_history(client, base: str, headers: dict) -> list:
+    """
+    Interleaves creates, updates and deletes; returns the changes a full sync
+    should deliver, in sequence order, as ("change", title) and ("deleted", id).
+    """
+    ids = {}
+    for title in "abcdef":
+        ids[title] = (await client.post(base, json={"title": title}, headers=headers)).json()["id"]
+    await client.put(f"{base}/{ids['b']}", json={"title": "b2"}, headers=headers)
+    await client.delete(f"{base}/{ids['c']}", headers=headers)
+    ids["g"] = (await client.post(base, json={"title": "g"}, headers=headers)).json()["id"]
+    await client.delete(f"{base}/{ids['a']}", headers=headers)
+    await client.put(f"{base}/{ids['e']}", json={"title": "e2"}, headers=headers)
+    await client.patch(f"{base}/{ids['e']}/complete", headers=headers)
+    await client.delete(f"{base}/{ids['g']}", headers=headers)
+    return [
+        ("change", "d"), ("change", "f"), ("change", "b2"),
+        ("deleted", ids["c"]), ("deleted", ids["a"]),
+        ("change", "e2"), ("deleted", ids["g"]),
+    ]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+async def test_paging_delivers_each_change_once(client, user, limit):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    expected = await write_history(client, base, headers)
+
+    since, delivered = None, 0
+    while True:
+        params = {"limit": limit} if since is None else {"limit": limit, "since": since}
+        page = (await client.get(f"{base}/changes", params=params, headers=headers)).json()
+        received = [("change", task["title"]) for task in page["changes"]] + [("deleted", i) for i in page["deleted"]]
+        assert sorted(received, key=str) == sorted(expected[delivered:delivered + limit], key=str)
+        delivered += len(received)
+        since = page["cursor"]
+        assert page["has_more"] == (delivered < len(expected))
+        if not page["has_more"]:
+            break
+    assert delivered == len(expected)
+
+    # Nothing new: an empty page that keeps the cursor
+    page = (await client.get(f"{base}/changes", params={"limit": limit, "since": since}, headers=headers)).json()
+    assert page == {"changes": [], "deleted": [], "cursor": since, "has_more": False}
+
+
+async def test_changes_after_the_cursor_arrive_on_the_next_call(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    task_id = (await client.post(base, json={"title": "a"}, headers=headers)).json()["id"]
+    since = (await client.get(f"{base}/changes", headers=headers)).json()["cursor"]
+
+    await client.put(f"{base}/{task_id}", json={"title": "a2"}, headers=headers)
+    page = (await client.get(f"{base}/changes", params={"since": since}, headers=headers)).json()
+    assert [task["title"] for task in page["changes"]] == ["a2"] and page["deleted"] == []
+
+    await client.delete(f"{base}/{task_id}", headers=headers)
+    page = (await client.get(f"{base}/changes", params={"since": page["cursor"]}, headers=headers)).json()
+    assert page["changes"] == [] and page["deleted"] == [task_id]
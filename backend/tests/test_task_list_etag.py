@@ -0,0 +1,112 @@
+import asyncio
+import re
+
+import pytest
+
+from core.query_budget import count_queries
+from core.version_store import create_version_store
+from api.endpoints import tasks as task_endpoints
+from services import task_service as task_service_module
+
+pytestmark = pytest.mark.anyio
+
+TASK_TABLE_RE = re.compile(r"\btask\b", re.IGNORECASE)
+
+
+async def test_revalidation_runs_no_task_queries(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    await client.post(base, json={"title": "a"}, headers=headers)
+    etag = (await client.get(base, headers=headers)).headers["etag"]
+
+    with count_queries() as queries:
+        r = await client.get(base, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert [s for s in queries.statements if TASK_TABLE_RE.search(s)] == []
+
+
+async def test_write_changes_etag(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    etag = (await client.get(base, headers=headers)).headers["etag"]
+    await client.post(base, json={"title": "a"}, headers=headers)
+    r = await client.get(base, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["etag"] != etag
+
+
+@pytest.fixture
+def unreachable_versions(monkeypatch):
+    pytest.importorskip("redis")
+    # Nothing listens on port 1: every Redis call fails
+    monkeypatch.setattr(task_endpoints.settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+    store = create_version_store("redis")
+    monkeypatch.setattr(task_endpoints, "task_versions", store)
+    monkeypatch.setattr(task_service_module, "task_versions", store)
+    return store
+
+
+async def test_version_store_down_serves_full_list(client, user, unreachable_versions):
+    headers, user_id = user
+    r = await client.get(f"/api/v1/{user_id}/tasks", headers={**headers, "If-None-Match": "*"})
+    assert r.status_code == 200 and "etag" not in r.headers
+
+
+async def test_version_store_down_keeps_committed_writes(client, user, unreachable_versions):
+    headers, user_id = user
+    r = await client.post(f"/api/v1/{user_id}/tasks", json={"title": "a"}, headers=headers)
+    assert r.status_code == 200
+    assert unreachable_versions._lost_bump
+
+
+class RecoveredRedis:
+    """
+    Stands in for Redis once it is reachable again.
+    """
+
+    def __init__(self, data):
+        self.data = dict(data)
+
+    async def set(self, key, value, nx=False):
+        if not (nx and key in self.data):
+            self.data[key] = value
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+
+async def test_lost_bump_renews_epoch(unreachable_versions):
+    store = unreachable_versions
+    store.bump(1)
+    store._redis = RecoveredRedis({store.EPOCH_KEY: "old", store._key(1): "3"})
+    tag = await store.etag(1)
+    assert tag is not None and not tag.startswith('"old-')
+    assert tag.endswith('-3"') and not store._lost_bump
+
+
+@pytest.fixture
+async def stalled_versions(monkeypatch):
+    pytest.importorskip("redis")
+    # Accepts connections and never answers, like a Redis that has stopped responding
+    writers = []
+    server = await asyncio.start_server(lambda reader, writer: writers.append(writer), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(task_endpoints.settings, "REDIS_URL", f"redis://127.0.0.1:{port}/0")
+    store = create_version_store("redis")
+    monkeypatch.setattr(task_endpoints, "task_versions", store)
+    yield store
+    server.close()
+
+
+async def test_stalled_version_store_doesnt_block_other_requests(client, user, stalled_versions):
+    headers, user_id = user
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    listing = asyncio.create_task(client.get(f"/api/v1/{user_id}/tasks", headers=headers))
+    await asyncio.sleep(0.05)
+    assert (await client.get("/healthz")).status_code == 200
+    assert loop.time() - start < 0.5
+    r = await listing
+    assert r.status_code == 200 and "etag" not in r.headers
@@ -0,0 +1,70 @@
+import re
+
+import pytest
+
+from core.query_budget import count_queries
+
+pytestmark = pytest.mark.anyio
+
+TASK_TABLE_RE = re.compile(r"\btask\b", re.IGNORECASE)
+
+
+def task_statements(queries) -> list:
+    return [s for s in queries.statements if TASK_TABLE_RE.search(s)]
+
+
+async def create(client, headers, user_id, title="a") -> int:
+    r = await client.post(f"/api/v1/{user_id}/tasks", json={"title": title}, headers=headers)
+    assert r.status_code == 200
+    return r.json()["id"]
+
+
+async def test_update_touches_task_table_once(client, user):
+    headers, user_id = user
+    task_id = await create(client, headers, user_id)
+
+    with count_queries() as queries:
+        r = await client.put(f"/api/v1/{user_id}/tasks/{task_id}", json={"title": "b"}, headers=headers)
+    assert r.status_code == 200 and r.json()["title"] == "b"
+    assert len(task_statements(queries)) == 1
+
+
+async def test_toggle_touches_task_table_once(client, user):
+    headers, user_id = user
+    task_id = await create(client, headers, user_id)
+
+    with count_queries() as queries:
+        r = await client.patch(f"/api/v1/{user_id}/tasks/{task_id}/complete", headers=headers)
+    assert r.status_code == 200 and r.json()["completed"] is True
+    assert len(task_statements(queries)) == 1
+
+    r = await client.patch(f"/api/v1/{user_id}/tasks/{task_id}/complete", headers=headers)
+    assert r.json()["completed"] is False
+
+
+async def test_delete_touches_task_table_once(client, user):
+    headers, user_id = user
+    task_id = await create(client, headers, user_id)
+
+    with count_queries() as queries:
+        r = await client.delete(f"/api/v1/{user_id}/tasks/{task_id}", headers=headers)
+    assert r.status_code == 200
+    assert len(task_statements(queries)) == 1
+
+    r = await client.get(f"/api/v1/{user_id}/tasks/{task_id}", headers=headers)
+    assert r.status_code == 404
+
+
+async def test_other_users_task_is_not_found(client, user, other_user):
+    headers, user_id = user
+    other_headers, other_id = other_user
+    task_id = await create(client, other_headers, other_id)
+    base = f"/api/v1/{user_id}/tasks/{task_id}"
+
+    assert (await client.put(base, json={"title": "b"}, headers=headers)).status_code == 404
+    assert (await client.patch(f"{base}/complete", headers=headers)).status_code == 404
+    assert (await client.delete(base, headers=headers)).status_code == 404
+
+    r = await client.get(f"/api/v1/{other_id}/tasks/{task_id}", headers=other_headers)
+    assert r.status_code == 200
+    assert (r.json()["title"], r.json()["completed"]) == ("a", False)
@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+from sqlalchemy import update
+from sqlmodel import Session
+
+from core.database import engine
+from models import Task
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cursor_walks_every_task_once(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    ids = [(await client.post(base, json={"title": f"task {i}"}, headers=headers)).json()["id"] for i in range(7)]
+    # Four tasks created in the same instant, before the others
+    with Session(engine) as db:
+        db.execute(update(Task).where(Task.id.in_(ids[1:5])).values(created_at=datetime.datetime(2020, 1, 1)))
+        db.commit()
+
+    pages, params = [], {"limit": 2}
+    while True:
+        r = await client.get(base, params=params, headers=headers)
+        assert r.status_code == 200
+        pages.append([task["id"] for task in r.json()])
+        cursor = r.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+        if len(pages) == 1:
+            # Rows created while paging come after the ones not seen yet
+            ids.append((await client.post(base, json={"title": "late"}, headers=headers)).json()["id"])
+        params = {"limit": 2, "cursor": cursor}
+    assert pages == [ids[1:3], ids[3:5], [ids[0], ids[5]], ids[6:8]]
+
+
+async def test_cursor_for_another_sort_is_rejected(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    for i in range(2):
+        await client.post(base, json={"title": f"task {i}"}, headers=headers)
+    cursor = (await client.get(base, params={"limit": 1}, headers=headers)).headers["x-next-cursor"]
+
+    r = await client.get(base, params={"limit": 1, "cursor": cursor, "sort": "updated_at"}, headers=headers)
+    assert r.status_code == 400
+    r = await client.get(base, params={"limit": 1, "cursor": "not-a-cursor"}, headers=headers)
+    assert r.status_code == 400
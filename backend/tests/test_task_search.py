@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel, select
+
+from core.schema import create_schema
+from models import Task
+from services.task_search import apply_search
+
+pytestmark = pytest.mark.anyio
+
+
+async def search(client, base: str, headers: dict, text: str) -> list:
+    r = await client.get(base, params={"search": text}, headers=headers)
+    assert r.status_code == 200
+    return sorted(task["title"] for task in r.json())
+
+
+async def test_matches_every_word_as_a_prefix(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    for title in ("buy milk", "buy bread", "call mom"):
+        await client.post(base, json={"title": title}, headers=headers)
+    await client.post(base, json={"title": "groceries", "description": "Bread and butter"}, headers=headers)
+
+    assert await search(client, base, headers, "bu") == ["buy bread", "buy milk", "groceries"]
+    assert await search(client, base, headers, "BREAD") == ["buy bread", "groceries"]
+    assert await search(client, base, headers, "bread buy") == ["buy bread"]
+    assert await search(client, base, headers, "buy mom") == []
+
+
+async def test_index_follows_renames_and_deletes(client, user):
+    headers, user_id = user
+    base = f"/api/v1/{user_id}/tasks"
+    task_id = (await client.post(base, json={"title": "buy milk"}, headers=headers)).json()["id"]
+
+    await client.put(f"{base}/{task_id}", json={"title": "call mom"}, headers=headers)
+    assert await search(client, base, headers, "milk") == []
+    assert await search(client, base, headers, "mom") == ["call mom"]
+
+    await client.delete(f"{base}/{task_id}", headers=headers)
+    assert await search(client, base, headers, "mom") == []
+
+
+def test_index_covers_rows_written_before_it(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    # The tables without the search index, as before it existed
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            table.create(connection)
+    with Session(engine) as db:
+        db.add_all([Task(user_id=1, title="old task"), Task(user_id=1, title="other")])
+        db.commit()
+
+    create_schema(engine)
+    with Session(engine) as db:
+        query, _ = apply_search(select(Task), "sqlite", "old")
+        assert [task.title for task in db.exec(query)] == ["old task"]